@@ -10,132 +10,49 @@ function populatePlayerOptions(playerName) {
         <button class="btn right_pane_items" onclick="showVsOtherTeamsStatsOptions('${playerName}')">Vs Other Teams</button>`;
 }
 
+// Stats API served by graph_generation/api.py; when the dashboard is opened as static files
+// instead, the same data is read from the files the generators wrote
+const apiBase = "api";
+
+async function fetchJson(path) {
+    const response = await fetch(path);
+    if (!response.ok) {
+        throw new Error(`${path}: ${response.status}`);
+    }
+    return response.json();
+}
+
+// Function to fetch from the API, or from the static file when the API is not there
+async function fetchApiJson(apiPath, staticPath) {
+    try {
+        return await fetchJson(`${apiBase}/${apiPath}`);
+    } catch (error) {
+        return fetchJson(staticPath);
+    }
+}
+
+// Optimal teams written by graph_generation/selection.py, fetched once
+let optimalTeamData = null;
+
+async function loadOptimalTeamData() {
+    if (optimalTeamData === null) {
+        optimalTeamData = (await fetchApiJson("teams", "optimal_team.json")).teams;
+    }
+    return optimalTeamData;
+}
+
 // Function to populate options for a selected team
-function populateTeamOptions(teamName) {
+async function populateTeamOptions(teamName) {
     const playerOptions = document.getElementById("playerOptions");
     playerOptions.innerHTML = ''; // Clear existing content
 
-    // JSON data obtained after EDA
-    const optimalTeamData = {
-        "Australia": [
-            "Rohit Sharma",
-            "Hardik Pandya",
-            "Shubman Gill",
-            "Virat Kohli",
-            "Shreyas Iyer",
-            "Ishan Kishan",
-            "KL Rahul",
-            "Suryakumar Yadav",
-            "Ravindra Jadeja",
-            "Axar Patel",
-            "Shardul Thakur"
-        ],
-        "England": [
-            "Rohit Sharma",
-            "Hardik Pandya",
-            "Shubman Gill",
-            "Virat Kohli",
-            "Shreyas Iyer",
-            "Ishan Kishan",
-            "KL Rahul",
-            "Suryakumar Yadav",
-            "Ravindra Jadeja",
-            "Axar Patel",
-            "Shardul Thakur"
-        ],
-        "Pakistan": [
-            "Rohit Sharma",
-            "Hardik Pandya",
-            "Shubman Gill",
-            "Virat Kohli",
-            "Shreyas Iyer",
-            "Ishan Kishan",
-            "KL Rahul",
-            "Suryakumar Yadav",
-            "Ravindra Jadeja",
-            "Axar Patel",
-            "Shardul Thakur"
-        ],
-        "New Zealand": [
-            "Rohit Sharma",
-            "Hardik Pandya",
-            "Shubman Gill",
-            "Virat Kohli",
-            "Shreyas Iyer",
-            "Ishan Kishan",
-            "KL Rahul",
-            "Suryakumar Yadav",
-            "Ravindra Jadeja",
-            "Axar Patel",
-            "Shardul Thakur"
-        ],
-        "South Africa": [
-            "Rohit Sharma",
-            "Hardik Pandya",
-            "Shubman Gill",
-            "Virat Kohli",
-            "Shreyas Iyer",
-            "Ishan Kishan",
-            "KL Rahul",
-            "Suryakumar Yadav",
-            "Ravindra Jadeja",
-            "Axar Patel",
-            "Shardul Thakur"
-        ],
-        "Sri Lanka": [
-            "Rohit Sharma",
-            "Hardik Pandya",
-            "Shubman Gill",
-            "Virat Kohli",
-            "Shreyas Iyer",
-            "Ishan Kishan",
-            "KL Rahul",
-            "Suryakumar Yadav",
-            "Ravindra Jadeja",
-            "Axar Patel",
-            "Shardul Thakur"
-        ],
-        "Bangladesh": [
-            "Rohit Sharma",
-            "Hardik Pandya",
-            "Shubman Gill",
-            "Virat Kohli",
-            "Shreyas Iyer",
-            "Ishan Kishan",
-            "KL Rahul",
-            "Suryakumar Yadav",
-            "Ravindra Jadeja",
-            "Axar Patel",
-            "Shardul Thakur"
-        ],
-        "West Indies": [
-            "Rohit Sharma",
-            "Hardik Pandya",
-            "Shubman Gill",
-            "Virat Kohli",
-            "Shreyas Iyer",
-            "Ishan Kishan",
-            "KL Rahul",
-            "Suryakumar Yadav",
-            "Ravindra Jadeja",
-            "Axar Patel",
-            "Shardul Thakur"
-        ],
-        "Afghanistan": [
-            "Rohit Sharma",
-            "Hardik Pandya",
-            "Shubman Gill",
-            "Virat Kohli",
-            "Shreyas Iyer",
-            "Ishan Kishan",
-            "KL Rahul",
-            "Suryakumar Yadav",
-            "Ravindra Jadeja",
-            "Axar Patel",
-            "Shardul Thakur"
-        ]
-    };
-    
+    let teams;
+    try {
+        teams = await loadOptimalTeamData();
+    } catch (error) {
+        playerOptions.innerHTML = `<p>Optimal teams are not available, generate them with selection.py.</p>`;
+        return;
+    }
     
 // Display team name
 let htmlContent = '';
@@ -145,7 +62,7 @@ htmlContent += `<h4 class="heading">Optimal team for India v/s ${teamName}</h4>`
 // Table for displaying images (4+4+3 format)
 htmlContent += '<table>';
 
-const playersForTeam = optimalTeamData[teamName];
+const playersForTeam = teams[teamName];
 
 // Display players 1 to 4 in the first row
 htmlContent += '<tr>';
@@ -305,106 +222,155 @@ function showVsOtherTeamsStatsOptions(playerName) {
     showVsOtherTeamsGraph(playerName)
 }
 
+// Figure specs written by graph.py --format bundle, one file per player plus the template they share
+const figureDirectory = "../graph_generation/Figures";
+const figureBundles = {};
+let figureTemplate = null;
+
+// Function to load a player's figure bundle, fetched once and kept for the next chart
+async function loadFigureBundle(imageName) {
+    if (figureTemplate === null) {
+        figureTemplate = await fetchApiJson("figures/template", `${figureDirectory}/template.json`);
+    }
+    if (!(imageName in figureBundles)) {
+        figureBundles[imageName] = await fetchApiJson(`players/${imageName}/figures`, `${figureDirectory}/${imageName}.json`);
+    }
+    return figureBundles[imageName];
+}
+
+// Function to draw the selected graph in the browser, falling back to the pre-rendered image
+// when there is no figure bundle for the player or Plotly.js did not load
+async function displayGraph(playerName, selectedOption, chartName, imagePath) {
+    const graphContainer = document.getElementById("statsContainer");
+    graphContainer.innerHTML = `<h5>${playerName} - ${selectedOption}</h5>
+    <div id="graph" style="width: 800px; height: 600px;"></div>`;
+
+    try {
+        const bundle = await loadFigureBundle(playerName.replace(' ', '_').toLowerCase());
+        const spec = bundle[chartName];
+        if (spec && window.Plotly) {
+            const layout = { ...spec.layout, template: figureTemplate };
+            Plotly.newPlot("graph", spec.data, layout, { responsive: true });
+            return;
+        }
+    } catch (error) {
+        console.warn(`No figure spec for ${playerName}, showing the image instead`, error);
+    }
+    document.getElementById("graph").innerHTML = `<img src="${imagePath}" alt="${selectedOption} Graph" width="800" height="600">`;
+}
+
 // Function to display batting graphs
 function showBattingGraph(playerName) {
     const selectedOption = document.getElementById("battingStatsOptions").value;
-    const graphContainer = document.getElementById("statsContainer");
     const imageName = playerName.replace(' ', '_').toLowerCase(); // Convert player name to lowercase and replace spaces with underscores
 
+    let chartName;
     let imagePath;
 
     switch (selectedOption) {
         case "Batting Average":
+            chartName = "batting_average";
             imagePath = `../graph_generation/Overall_Player_Stats/Batting_Stats/Batting_Averages/${imageName}_average.png`;
             break;
         case "Batting Strike Rate":
+            chartName = "batting_strike_rate";
             imagePath = `../graph_generation/Overall_Player_Stats/Batting_Stats/Batting_Strike_Rates/${imageName}_strike_rate.png`;
             break;
         case "Runs Scored":
+            chartName = "runs_scored";
             imagePath = `../graph_generation/Overall_Player_Stats/Batting_Stats/Runs_Scored/${imageName}_runs.png`;
             break;
         case "Fifties v/s Hundreds":
+            chartName = "fifties_vs_hundreds";
             imagePath = `../graph_generation/Overall_Player_Stats/Batting_Stats/Fifties_vs_Hundreds/${imageName}_fifties_vs_hundreds.png`;
             break;
         case "Not Out Percentage":
+            chartName = "not_out_percentages";
             imagePath = `../graph_generation/Overall_Player_Stats/Batting_Stats/Not_Out_Percentages/${imageName}_not_out_percentages.png`;
             break;
         case "Runs Scored at Batting Position":
+            chartName = "runs_scored_vs_batting_position";
             imagePath = `../graph_generation/Overall_Player_Stats/Batting_Stats/Runs_Scored_vs_Batting_Position/${imageName}_runs_scored.png`;
             break;
         case "Batting Strike Rate at Batting Position":
+            chartName = "batting_strike_rate_vs_batting_position";
             imagePath = `../graph_generation/Overall_Player_Stats/Batting_Stats/Batting_Strike_Rate_vs_Batting_Position/${imageName}_strike_rate.png`;
             break;
     }
 
-    // Display the selected graph image
-    graphContainer.innerHTML = `<h5>${playerName} - ${selectedOption}</h5>
-    <img src="${imagePath}" alt="${selectedOption} Graph" width="800" height="600">`;
+    displayGraph(playerName, selectedOption, chartName, imagePath);
 }
 
 // Function to display bowling graphs
 function showBowlingGraph(playerName) {
     const selectedOption = document.getElementById("bowlingStatsOptions").value;
-    const graphContainer = document.getElementById("statsContainer");
     const imageName = playerName.replace(' ', '_').toLowerCase(); // Convert player name to lowercase and replace spaces with underscores
 
+    let chartName;
     let imagePath;
 
     switch (selectedOption) {
         case "Average Economy":
+            chartName = "average_economy";
             imagePath = `../graph_generation/Overall_Player_Stats/Bowling_Stats/Average_Economy/${imageName}_average_economy.png`;
             break;
         case "Wickets Taken":
+            chartName = "wickets_taken";
             imagePath = `../graph_generation/Overall_Player_Stats/Bowling_Stats/Wickets_Taken/${imageName}_wickets.png`;
             break;
         case "Maiden Overs":
+            chartName = "maiden_overs";
             imagePath = `../graph_generation/Overall_Player_Stats/Bowling_Stats/Maiden_Overs/${imageName}_maiden_overs.png`;
             break;
         case "Bowling Strike Rate":
+            chartName = "bowling_strike_rate";
             imagePath = `../graph_generation/Overall_Player_Stats/Bowling_Stats/Bowling_Strike_Rate/${imageName}_bowling_strike_rate.png`;
             break;
         case "Overs Bowled":
+            chartName = "overs_bowled";
             imagePath = `../graph_generation/Overall_Player_Stats/Bowling_Stats/Overs_Bowled/${imageName}_overs_bowled.png`;
             break;
     }
 
-    // Display the selected graph image
-    graphContainer.innerHTML = `<h5>${playerName} - ${selectedOption}</h5>
-    <img src="${imagePath}" alt="${selectedOption} Graph" width="800" height="600">`;
+    displayGraph(playerName, selectedOption, chartName, imagePath);
 }
 
 // Function to display stats vs other teams 
 function showVsOtherTeamsGraph(playerName) {
     const selectedOption = document.getElementById("VsOtherTeamsOptions").value;
-    const graphContainer = document.getElementById("statsContainer");
     const imageName = playerName.replace(' ', '_').toLowerCase(); // Convert player name to lowercase and replace spaces with underscores
 
+    let chartName;
     let imagePath;
 
     switch (selectedOption) {
         case "Total Runs":
+            chartName = "runs_scored_against_individual_teams";
             imagePath = `../graph_generation/Vs_Other_Teams/Runs_Scored_Against_Individual_Teams/${imageName}_runs_scored_against_individual_teams.png`;
             break;
         case "Batting Strike Rate":
+            chartName = "batting_strike_rate_against_individual_teams";
             imagePath = `../graph_generation/Vs_Other_Teams/Batting_Strike_Rate_Against_Individual_Teams/${imageName}_batting_strike_rate_against_individual_teams.png`;
             break;
         case "Not Out Percentages":
+            chartName = "not_out_percentages_against_individual_teams";
             imagePath = `../graph_generation/Vs_Other_Teams/Not_Out_Percentages_Against_Individual_Teams/${imageName}_not_out_percentages_against_individual_teams.png`;
             break;
         case "Wickets Taken":
+            chartName = "wickets_taken_against_individual_teams";
             imagePath = `../graph_generation/Vs_Other_Teams/Wickets_Taken_Against_Individual_Teams/${imageName}_wickets_taken_against_individual_teams.png`;
             break;
         case "Average Economy":
+            chartName = "average_economy_against_individual_teams";
             imagePath = `../graph_generation/Vs_Other_Teams/Average_Economy_Against_Individual_Teams/${imageName}_average_economy_against_individual_teams.png`;
             break;
         case "Bowling Strike Rate":
+            chartName = "bowling_strike_rate_against_individual_teams";
             imagePath = `../graph_generation/Vs_Other_Teams/Bowling_Strike_Rate_Against_Individual_Teams/${imageName}_bowling_strike_rate_against_individual_teams.png`;
             break;
     }
 
-    // Display the selected graph image
-    graphContainer.innerHTML = `<h5>${playerName} - ${selectedOption}</h5>
-    <img src="${imagePath}" alt="${selectedOption} Graph" width="800" height="600">`;
+    displayGraph(playerName, selectedOption, chartName, imagePath);
 }
 
 // Initialize the "Players" dropdown with player names
@@ -0,0 +1,381 @@
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import re
+import sys
+from collections import OrderedDict, namedtuple
+from urllib.parse import unquote, urlsplit
+
+import form
+import stats_frame
+from figures import FIGURE_DIRECTORY, TEMPLATE_FILE, get_bundle_path
+from selection import (
+    DATA_DIRECTORY,
+    GRAPH_DIRECTORY,
+    OPTIMAL_TEAM_FILE,
+    SCRAPER_DIRECTORY,
+    get_player_file_name,
+    load_roster,
+)
+
+DASHBOARD_DIRECTORY = os.path.join(GRAPH_DIRECTORY, "..", "dashboard")
+DEFAULT_PORT = 8000
+CACHE_SIZE = 512
+# bytes of an unused request body read off a kept alive connection, a bigger one closes it
+MAX_DISCARDED_BODY = 64 * 1024
+
+# stats are parsed once at start up and never change while serving, clients may reuse
+# them for a while; files can be rebuilt at any time, so clients revalidate them by ETag
+DATA_CACHE_CONTROL = "public, max-age=300"
+FILE_CACHE_CONTROL = "no-cache"
+
+CONTENT_TYPES = {
+    ".html": "text/html; charset=utf-8",
+    ".js": "text/javascript; charset=utf-8",
+    ".css": "text/css; charset=utf-8",
+    ".json": "application/json",
+    ".png": "image/png",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".svg": "image/svg+xml",
+}
+STATUS_REASONS = {
+    200: "OK",
+    304: "Not Modified",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    500: "Internal Server Error",
+}
+
+PLAYER_ROUTE = re.compile(r"^/api/players/([^/]+)/(summary|oppositions|figures)$")
+
+Response = namedtuple(
+    "Response", ["status", "body", "content_type", "etag", "cache_control"]
+)
+
+
+def get_etag(body):
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def json_response(value, cache_control=DATA_CACHE_CONTROL):
+    body = json.dumps(value, separators=(",", ":")).encode()
+    return Response(200, body, CONTENT_TYPES[".json"], get_etag(body), cache_control)
+
+
+def empty_response(status):
+    return Response(status, b"", None, None, None)
+
+
+def to_records(frame):
+    # rows as dicts with None for NaN, which json has no spelling for
+    return frame.astype(object).where(frame.notna(), None).to_dict("records")
+
+
+class LRUCache:
+    # the most recently used responses, oldest dropped first once full
+    def __init__(self, size=CACHE_SIZE):
+        self.size = size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        response = self.entries.get(key)
+        if response is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return response
+
+    def put(self, key, response):
+        self.entries[key] = response
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.size:
+            self.entries.popitem(last=False)
+
+
+class StatsApi:
+    # answers the dashboard from stats parsed once at start up: the roster, each player's
+    # stats summary and splits by opposition, the figure bundles and templates written by
+    # graph.py, the optimal elevens written by selection.py, and the dashboard itself.
+    # Responses are built off the event loop and kept in an LRU cache, concurrent requests
+    # for the same uncached response share one build
+    def __init__(
+        self,
+        data_directory=DATA_DIRECTORY,
+        output_directory=GRAPH_DIRECTORY,
+        dataset_directory=None,
+        teams_file=OPTIMAL_TEAM_FILE,
+        dashboard_directory=DASHBOARD_DIRECTORY,
+        cache_size=CACHE_SIZE,
+    ):
+        names, roles = load_roster(data_directory)
+        self.players = [get_player_file_name(name) for name in names]
+        self.known_players = set(self.players)
+        self.roster = [
+            {"name": name, "player": player_name, "role": role}
+            for name, player_name, role in zip(names, self.players, roles)
+        ]
+        if dataset_directory:
+            self.stats = stats_frame.read_stats_frame(self.players, dataset_directory)
+            history = form.read_match_history(self.players, dataset_directory)
+        else:
+            player_data = stats_frame.load_player_data(self.players, data_directory)
+            self.stats = stats_frame.build_stats_frame(player_data)
+            history = form.build_match_history(player_data)
+        self.oppositions = form.get_splits(history, "opposition")
+        self.opposition_rows = self.oppositions.groupby(
+            "player", observed=True, sort=False
+        ).indices
+        self.output_directory = output_directory
+        self.teams_file = teams_file
+        self.dashboard_directory = dashboard_directory
+        self.cache = LRUCache(cache_size)
+        self.pending = {}
+
+    def get_player_summary(self, player_name):
+        # discipline -> group type -> rows of key and metrics
+        summaries = self.stats.summaries.drop(
+            columns=["player", "discipline", "group_type"]
+        )
+        summary = {}
+        for discipline in stats_frame.DISCIPLINES:
+            for group_type in stats_frame.GROUP_TYPES:
+                positions = self.stats.summary_rows.get(
+                    (player_name, discipline, group_type)
+                )
+                if positions is not None:
+                    summary.setdefault(discipline, {})[group_type] = to_records(
+                        summaries.take(positions)
+                    )
+        return summary
+
+    def get_player_oppositions(self, player_name):
+        rows = self.oppositions.take(self.opposition_rows.get(player_name, [])).drop(
+            columns="player"
+        )
+        return to_records(rows)
+
+    def get_file(self, path):
+        # (cache key, builder) for a file, keyed on its size and mtime so a rebuilt file is
+        # never served stale; None if there is no such file
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        if not os.path.isfile(path):
+            return None
+
+        def build():
+            with open(path, "rb") as fp:
+                body = fp.read()
+            content_type = CONTENT_TYPES.get(
+                os.path.splitext(path)[1].lower(), "application/octet-stream"
+            )
+            return Response(200, body, content_type, get_etag(body), FILE_CACHE_CONTROL)
+
+        return ("file", path, stat.st_mtime_ns, stat.st_size), build
+
+    def get_static_file(self, root, relative_path):
+        # a file under root with a type the dashboard uses, never anything outside it
+        root = os.path.realpath(root)
+        path = os.path.realpath(os.path.join(root, relative_path.lstrip("/")))
+        if (
+            os.path.commonpath([root, path]) != root
+            or os.path.splitext(path)[1].lower() not in CONTENT_TYPES
+        ):
+            return None
+        return self.get_file(path)
+
+    def route(self, path):
+        # (cache key, builder) answering a path, None for a 404
+        if path == "/api/players":
+            return ("data", path), lambda: json_response(self.roster)
+        if path == "/api/teams":
+            return self.get_file(self.teams_file)
+        if path == "/api/figures/template":
+            return self.get_file(
+                os.path.join(self.output_directory, FIGURE_DIRECTORY, TEMPLATE_FILE)
+            )
+        match = PLAYER_ROUTE.match(path)
+        if match:
+            player_name = get_player_file_name(match.group(1))
+            if player_name not in self.known_players:
+                return None
+            resource = match.group(2)
+            if resource == "figures":
+                return self.get_file(
+                    get_bundle_path(self.output_directory, player_name)
+                )
+            if resource == "summary":
+                return ("data", resource, player_name), lambda: json_response(
+                    self.get_player_summary(player_name)
+                )
+            return ("data", resource, player_name), lambda: json_response(
+                self.get_player_oppositions(player_name)
+            )
+        if path.startswith("/api/"):
+            return None
+        # the dashboard at the root and the rendered charts at the path its image fallback
+        # points to, ../graph_generation/ from the dashboard
+        if path.startswith("/graph_generation/"):
+            return self.get_static_file(
+                self.output_directory, path[len("/graph_generation/") :]
+            )
+        return self.get_static_file(
+            self.dashboard_directory, "index.html" if path == "/" else path
+        )
+
+    async def get_response(self, path):
+        routed = self.route(path)
+        if routed is None:
+            return empty_response(404)
+        key, build = routed
+        response = self.cache.get(key)
+        if response is not None:
+            return response
+        pending = self.pending.get(key)
+        if pending is None:
+            pending = asyncio.get_running_loop().run_in_executor(None, build)
+            self.pending[key] = pending
+            try:
+                response = await pending
+                self.cache.put(key, response)
+            finally:
+                del self.pending[key]
+            return response
+        return await pending
+
+    async def handle_connection(self, reader, writer):
+        # HTTP/1.1 with keep alive, GET and HEAD only
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if not line.strip():
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    await self.send(writer, empty_response(400), False, False)
+                    break
+                keep_alive = (
+                    version == "HTTP/1.1"
+                    and headers.get("connection", "").lower() != "close"
+                )
+                # no request body is ever used, but one left on the socket would be read as the
+                # next request line; a small one is read and dropped, otherwise the connection
+                # is closed after the response
+                content_length = headers.get("content-length", "0")
+                if (
+                    "transfer-encoding" in headers
+                    or not content_length.isdigit()
+                    or int(content_length) > MAX_DISCARDED_BODY
+                ):
+                    keep_alive = False
+                elif int(content_length):
+                    await reader.readexactly(int(content_length))
+
+                if method not in ("GET", "HEAD"):
+                    response = empty_response(405)
+                else:
+                    try:
+                        response = await self.get_response(
+                            unquote(urlsplit(target).path)
+                        )
+                    except Exception as error:
+                        print(f"Failed to answer {target}: {error}")
+                        response = empty_response(500)
+                await self.send(
+                    writer,
+                    response,
+                    method == "HEAD",
+                    keep_alive,
+                    headers.get("if-none-match"),
+                )
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def send(self, writer, response, head_only, keep_alive, if_none_match=None):
+        status, body = response.status, response.body
+        if response.etag is not None and if_none_match == response.etag:
+            status, body = 304, b""
+        lines = [f"HTTP/1.1 {status} {STATUS_REASONS[status]}"]
+        if response.content_type and status == 200:
+            lines.append(f"Content-Type: {response.content_type}")
+        if response.etag:
+            lines.append(f"ETag: {response.etag}")
+        if response.cache_control:
+            lines.append(f"Cache-Control: {response.cache_control}")
+        lines.append(f"Content-Length: {len(body)}")
+        lines.append(f"Connection: {'keep-alive' if keep_alive else 'close'}")
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+        if not head_only:
+            writer.write(body)
+        await writer.drain()
+
+
+async def serve(api, host, port):
+    server = await asyncio.start_server(api.handle_connection, host, port)
+    print(f"Serving the dashboard on http://{host}:{port}/")
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Serve the dashboard and the stats it shows."
+    )
+    parser.add_argument(
+        "--data-dir",
+        default=DATA_DIRECTORY,
+        help="directory holding players.json and players/",
+    )
+    parser.add_argument(
+        "--dataset-dir",
+        help="read stats from the parquet dataset exported by scraper/dataset.py instead of the player files",
+    )
+    parser.add_argument(
+        "--output-dir",
+        default=GRAPH_DIRECTORY,
+        help="directory graph.py rendered the charts and figures into",
+    )
+    parser.add_argument(
+        "--teams", default=OPTIMAL_TEAM_FILE, help="optimal team json from selection.py"
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument(
+        "--cache-size", type=int, default=CACHE_SIZE, help="responses kept in memory"
+    )
+    args = parser.parse_args()
+    # player files are decoded, and the parquet dataset read, with the scraper's modules
+    sys.path.append(SCRAPER_DIRECTORY)
+
+    api = StatsApi(
+        args.data_dir,
+        args.output_dir,
+        args.dataset_dir,
+        args.teams,
+        DASHBOARD_DIRECTORY,
+        args.cache_size,
+    )
+    try:
+        asyncio.run(serve(api, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
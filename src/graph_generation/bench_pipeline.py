@@ -0,0 +1,300 @@
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import re
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+import graph
+import stats_frame
+import synthetic
+from export import BatchExporter
+from figures import (
+    FIGURE_DIRECTORY,
+    OUTPUT_FORMATS,
+    get_bundle_path,
+    get_figure_spec,
+    get_spec_path,
+    write_bundle,
+    write_json,
+    write_template,
+)
+
+SIZES = [10, 100, 1000, 10000]
+STAGES = ["load", "extract", "frame", "figures", "export"]
+# figures are built and exported for this many players at most; each chart reads its own
+# view of the frame, so the per figure cost is the same for any roster size
+FIGURE_PLAYERS = 100
+RESULTS_FILE = "pipeline_benchmark.json"
+
+
+def reset_peak_rss():
+    # linux lets a process reset its high water mark, so each stage gets its own peak;
+    # elsewhere the peak is the process's so far
+    try:
+        with open("/proc/self/clear_refs", "w") as clear_refs:
+            clear_refs.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def get_peak_rss():
+    # in bytes
+    try:
+        with open("/proc/self/status", "r") as status:
+            return int(re.search(r"VmHWM:\s+(\d+) kB", status.read()).group(1)) * 1024
+    except (OSError, AttributeError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def measure(function, *args):
+    # the result, and the seconds and peak rss of one call
+    stage_peak = reset_peak_rss()
+    start = time.perf_counter()
+    result = function(*args)
+    seconds = time.perf_counter() - start
+    return result, {
+        "seconds": seconds,
+        "peak_rss": get_peak_rss(),
+        "peak_rss_scope": "stage" if stage_peak else "process",
+    }
+
+
+def extract(player_data):
+    return stats_frame.extract_summary_columns(
+        player_data
+    ), stats_frame.extract_match_columns(player_data)
+
+
+def build_frame(columns):
+    summary_columns, history = columns
+    return stats_frame.StatsFrame(
+        stats_frame.make_summary_frame(*summary_columns),
+        stats_frame.make_match_frame(history),
+    )
+
+
+def build_figures(tasks, output_root):
+    return [
+        (player_name, chart_name)
+        + graph.build_chart(player_name, chart_name, output_root)
+        for player_name, chart_name in tasks
+    ]
+
+
+def export_figures(figures, output_root, output_format):
+    # the same writes graph.py makes for each format
+    if output_format == "png":
+        exporter = BatchExporter()
+        for _, _, fig, image_file_path in figures:
+            exporter.add(fig, image_file_path)
+        exporter.flush()
+    elif output_format == "json":
+        for _, _, fig, image_file_path in figures:
+            write_json(get_spec_path(image_file_path), get_figure_spec(fig))
+    else:
+        bundles = {}
+        for player_name, chart_name, fig, _ in figures:
+            bundles.setdefault(get_bundle_path(output_root, player_name), {})[
+                chart_name
+            ] = get_figure_spec(fig)
+        for bundle_path, specs in bundles.items():
+            write_bundle(bundle_path, specs)
+
+
+def run_pipeline(
+    data_directory, players, output_root, chart_names, output_format, figure_players
+):
+    # every stage of graph.py's render for one roster, each timed on its own; run in a
+    # fresh process so one roster's memory does not show up in the next one's peaks
+    stages = {}
+    player_data, stages["load"] = measure(
+        stats_frame.load_player_data, players, data_directory
+    )
+    columns, stages["extract"] = measure(extract, player_data)
+    stats, stages["frame"] = measure(build_frame, columns)
+    del player_data, columns
+
+    for chart_name in chart_names:
+        os.makedirs(
+            os.path.join(output_root, graph.charts[chart_name][1]), exist_ok=True
+        )
+    os.makedirs(os.path.join(output_root, FIGURE_DIRECTORY), exist_ok=True)
+    if output_format != "png":
+        write_template(output_root)
+    graph.set_roster_stats(stats)
+    # the first figure pays for importing plotly, kept out of the per figure times
+    _, warm_up = measure(build_figures, [(players[0], chart_names[0])], output_root)
+    tasks = [
+        (player_name, chart_name)
+        for player_name in players[:figure_players]
+        for chart_name in chart_names
+    ]
+    figures, stages["figures"] = measure(build_figures, tasks, output_root)
+    _, stages["export"] = measure(export_figures, figures, output_root, output_format)
+
+    # figures are only built for a sample, their totals are projected to the whole roster
+    total_figures = len(players) * len(chart_names)
+    for stage in ["figures", "export"]:
+        stages[stage]["figures"] = len(figures)
+        stages[stage]["seconds_per_figure"] = stages[stage]["seconds"] / max(
+            len(figures), 1
+        )
+        stages[stage]["projected_seconds"] = (
+            stages[stage]["seconds_per_figure"] * total_figures
+        )
+    return {
+        "players": len(players),
+        "summary_rows": len(stats.summaries),
+        "match_rows": len(stats.matches),
+        "figure_players": min(figure_players, len(players)),
+        "warm_up": warm_up,
+        "stages": stages,
+        "projected_total_seconds": sum(
+            stages[stage].get("projected_seconds", stages[stage]["seconds"])
+            for stage in STAGES
+        ),
+    }
+
+
+def get_environment():
+    import msgspec
+    import numpy
+    import pandas
+    import plotly
+
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "numpy": numpy.__version__,
+        "pandas": pandas.__version__,
+        "plotly": plotly.__version__,
+        "msgspec": msgspec.__version__,
+    }
+
+
+def compare(results, baseline):
+    # each stage's time against the same roster size and stage of an earlier run
+    baseline_runs = {run["players"]: run for run in baseline["runs"]}
+    lines = []
+    for run in results["runs"]:
+        baseline_run = baseline_runs.get(run["players"])
+        if baseline_run is None:
+            continue
+        for stage in STAGES:
+            seconds = run["stages"][stage]["seconds"]
+            baseline_seconds = baseline_run["stages"][stage]["seconds"]
+            lines.append(
+                f"{run['players']} players, {stage}: {baseline_seconds:.3f}s -> {seconds:.3f}s ({seconds / baseline_seconds:.2f}x)"
+            )
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Time each stage of the graph pipeline over synthetic rosters of growing size."
+    )
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=SIZES, help="roster sizes to run"
+    )
+    parser.add_argument(
+        "--charts",
+        nargs="+",
+        choices=list(graph.charts),
+        help="charts to build, defaults to all of them",
+    )
+    parser.add_argument(
+        "--format",
+        choices=OUTPUT_FORMATS,
+        default="json",
+        help="what the export stage writes, as graph.py --format",
+    )
+    parser.add_argument(
+        "--figure-players",
+        type=int,
+        default=FIGURE_PLAYERS,
+        help="players figures are built and exported for, the rest are projected",
+    )
+    parser.add_argument(
+        "--data-root",
+        help="keep generated rosters here and reuse them on later runs, instead of a temporary directory",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--output", default=RESULTS_FILE, help="json file the results are written to"
+    )
+    parser.add_argument(
+        "--compare",
+        help="results json of an earlier run to compare stage times against",
+    )
+    args = parser.parse_args()
+    # player files are decoded with the scraper's schema, in the spawned processes too
+    # since they start with this process's sys.path
+    sys.path.append(graph.SCRAPER_DIRECTORY)
+
+    chart_names = list(graph.charts) if args.charts is None else args.charts
+    results = {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "environment": get_environment(),
+        "settings": {
+            "charts": chart_names,
+            "format": args.format,
+            "figure_players": args.figure_players,
+            "seed": args.seed,
+        },
+        "runs": [],
+    }
+    with tempfile.TemporaryDirectory() as tmp_directory:
+        data_root = args.data_root or tmp_directory
+        for size in args.sizes:
+            data_directory = os.path.join(data_root, f"roster_{size}_seed_{args.seed}")
+            if os.path.exists(os.path.join(data_directory, "players.json")):
+                with open(
+                    os.path.join(data_directory, "players.json"), "r"
+                ) as json_file:
+                    players = [
+                        graph.get_player_file_name(player_name)
+                        for player_name in json.load(json_file)
+                    ]
+            else:
+                start = time.perf_counter()
+                players = synthetic.write_roster(data_directory, size, args.seed)
+                print(f"Generated {size} players in {time.perf_counter() - start:.1f}s")
+
+            output_root = os.path.join(tmp_directory, f"output_{size}")
+            with ProcessPoolExecutor(
+                max_workers=1, mp_context=multiprocessing.get_context("spawn")
+            ) as executor:
+                run = executor.submit(
+                    run_pipeline,
+                    data_directory,
+                    players,
+                    output_root,
+                    chart_names,
+                    args.format,
+                    args.figure_players,
+                ).result()
+            results["runs"].append(run)
+            print(
+                f"{size} players: "
+                + ", ".join(
+                    f"{stage} {run['stages'][stage]['seconds']:.3f}s/{run['stages'][stage]['peak_rss'] / 1024 ** 2:.0f} MiB"
+                    for stage in STAGES
+                )
+            )
+
+    with open(args.output, "w") as json_file:
+        json.dump(results, json_file, indent=4)
+    print(f"Results written to {args.output}")
+    if args.compare:
+        with open(args.compare, "r") as json_file:
+            print(compare(results, json.load(json_file)))
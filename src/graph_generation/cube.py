@@ -0,0 +1,338 @@
+import argparse
+import itertools
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+import form
+from selection import (
+    DATA_DIRECTORY,
+    SCRAPER_DIRECTORY,
+    get_player_file_name,
+    load_roster,
+)
+
+CUBE_FILE = os.path.join(DATA_DIRECTORY, "cube.npz")
+
+DIMENSIONS = ["player", "opposition", "year", "ground"]
+# sums that add up across any slice, every other number is derived from them
+MEASURES = [
+    "matches",
+    "innings",
+    "runs",
+    "not_outs",
+    "matches_bowled",
+    "wickets",
+    "runs_conceded",
+    "catches",
+]
+# code of a dimension rolled up over all its values
+ALL = -1
+# year of a match with no date, counted in the roll ups over years but in no year of its own
+NO_YEAR = -2
+
+
+def get_measures(history):
+    # the dimension codes and measures of each match, one row per match
+    batted = ~np.isnan(history.runs)
+    bowled = ~np.isnan(history.wickets)
+    years = history.date.astype("datetime64[Y]")
+    return pd.DataFrame(
+        {
+            "player": history.player.astype("int64"),
+            "opposition": history.opposition.astype("int64"),
+            "year": np.where(np.isnat(years), NO_YEAR, years.astype("int64") + 1970),
+            "ground": history.ground.astype("int64"),
+            "matches": 1.0,
+            "innings": batted.astype("float64"),
+            "runs": np.nan_to_num(history.runs),
+            "not_outs": (batted & history.not_out).astype("float64"),
+            "matches_bowled": bowled.astype("float64"),
+            "wickets": np.nan_to_num(history.wickets),
+            "runs_conceded": np.where(
+                bowled, np.nan_to_num(history.runs_conceded), 0.0
+            ),
+            "catches": history.catches,
+        }
+    )
+
+
+def aggregate(measures):
+    # measures summed for every combination of dimension values, including each
+    # dimension rolled up to ALL: the 16 group-bys of the four dimensions stacked together
+    cells = []
+    for kept in itertools.product([True, False], repeat=len(DIMENSIONS)):
+        by = [dimension for dimension, keep in zip(DIMENSIONS, kept) if keep]
+        if by:
+            cell = measures.groupby(by, sort=False)[MEASURES].sum().reset_index()
+        else:
+            cell = measures[MEASURES].sum().to_frame().T
+        for dimension, keep in zip(DIMENSIONS, kept):
+            if not keep:
+                cell[dimension] = ALL
+        cells.append(cell[DIMENSIONS + MEASURES])
+    return pd.concat(cells, ignore_index=True)
+
+
+def derive(totals):
+    # averages and rates of a slice from its sums
+    dismissals = totals["innings"] - totals["not_outs"]
+    return dict(
+        totals,
+        batting_average=totals["runs"] / dismissals if dismissals > 0 else None,
+        runs_per_innings=(
+            totals["runs"] / totals["innings"] if totals["innings"] > 0 else None
+        ),
+        bowling_average=(
+            totals["runs_conceded"] / totals["wickets"]
+            if totals["wickets"] > 0
+            else None
+        ),
+        wickets_per_match=(
+            totals["wickets"] / totals["matches_bowled"]
+            if totals["matches_bowled"] > 0
+            else None
+        ),
+    )
+
+
+class StatsCube:
+    # per match sums over player x opposition x year x ground and all their roll ups, one
+    # row of measures per cell with a dict from (player, opposition, year, ground) to the
+    # row; names are stored as codes into the name lists, years as themselves and a rolled
+    # up dimension as ALL. The matches already counted are kept so an update only adds
+    # the ones that are new
+    __slots__ = ("names", "codes", "keys", "measures", "index", "seen")
+
+    def __init__(
+        self, players=(), oppositions=(), grounds=(), keys=None, measures=None, seen=()
+    ):
+        self.names = {
+            "player": list(players),
+            "opposition": list(oppositions),
+            "ground": list(grounds),
+        }
+        self.codes = {
+            dimension: {name: code for code, name in enumerate(names)}
+            for dimension, names in self.names.items()
+        }
+        self.keys = (
+            np.empty((0, len(DIMENSIONS)), dtype="int64")
+            if keys is None
+            else np.asarray(keys, dtype="int64")
+        )
+        self.measures = (
+            np.empty((0, len(MEASURES)))
+            if measures is None
+            else np.asarray(measures, dtype="float64")
+        )
+        self.index = {
+            key: row for row, key in enumerate(map(tuple, self.keys.tolist()))
+        }
+        self.seen = set(seen)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def get_codes(self, dimension, new_names):
+        # codes of new_names, giving the ones not seen yet the next free codes
+        names, codes = self.names[dimension], self.codes[dimension]
+        for name in new_names:
+            if name not in codes:
+                codes[name] = len(names)
+                names.append(name)
+        return np.array([codes[name] for name in new_names], dtype="int64")
+
+    def add(self, history):
+        # folds in the matches of a form.MatchHistory not counted yet, returns how many
+        matches = [
+            (history.players[player], str(match_id))
+            for player, match_id in zip(history.player, history.match_id)
+        ]
+        new = np.array([match not in self.seen for match in matches], dtype=bool)
+        if not new.any():
+            return 0
+        measures = get_measures(history)[new]
+        # the history's codes, translated to this cube's
+        for dimension, history_names in [
+            ("player", history.players),
+            ("opposition", history.oppositions),
+            ("ground", history.grounds),
+        ]:
+            measures[dimension] = self.get_codes(dimension, list(history_names))[
+                measures[dimension].to_numpy()
+            ]
+        cells = aggregate(measures)
+
+        keys = cells[DIMENSIONS].to_numpy(dtype="int64")
+        values = cells[MEASURES].to_numpy(dtype="float64")
+        rows = np.array(
+            [self.index.get(key, -1) for key in map(tuple, keys.tolist())],
+            dtype="int64",
+        )
+        existing = rows >= 0
+        self.measures[rows[existing]] += values[existing]
+        added = keys[~existing]
+        self.index.update(
+            (tuple(key), len(self.keys) + i) for i, key in enumerate(added.tolist())
+        )
+        self.keys = np.concatenate([self.keys, added])
+        self.measures = np.concatenate([self.measures, values[~existing]])
+        self.seen.update(match for match, is_new in zip(matches, new) if is_new)
+        return int(new.sum())
+
+    def get_code(self, dimension, name):
+        return ALL if name is None else self.codes[dimension].get(name)
+
+    def lookup(self, player=None, opposition=None, year=None, ground=None):
+        # the sums of one cell, None for any dimension meaning all of it; zeros for a
+        # combination that never happened
+        key = (
+            self.get_code("player", player),
+            self.get_code("opposition", opposition),
+            ALL if year is None else int(year),
+            self.get_code("ground", ground),
+        )
+        row = None if None in key else self.index.get(key)
+        if row is None:
+            return dict.fromkeys(MEASURES, 0.0)
+        return dict(zip(MEASURES, self.measures[row].tolist()))
+
+    def query(self, player=None, opposition=None, years=None, ground=None):
+        # derived stats of a slice, years being any iterable of years to add up, e.g.
+        # range(2020, 2024), or None for all of them
+        if years is None:
+            return derive(self.lookup(player, opposition, None, ground))
+        totals = dict.fromkeys(MEASURES, 0.0)
+        for year in years:
+            for measure, value in self.lookup(player, opposition, year, ground).items():
+                totals[measure] += value
+        return derive(totals)
+
+    def get_years(self):
+        years = self.keys[:, DIMENSIONS.index("year")]
+        return sorted(set(years[(years != ALL) & (years != NO_YEAR)].tolist()))
+
+    def save(self, path):
+        # a missing opposition or ground name is stored as "" with its mask set, since
+        # np.array(..., dtype=str) would turn None into "None"
+        seen = sorted(self.seen)
+        names = {
+            dimension: (
+                np.array(["" if name is None else name for name in names], dtype=str),
+                np.array([name is None for name in names], dtype=bool),
+            )
+            for dimension, names in self.names.items()
+        }
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as cube_file:
+            np.savez(
+                cube_file,
+                players=names["player"][0],
+                players_missing=names["player"][1],
+                oppositions=names["opposition"][0],
+                oppositions_missing=names["opposition"][1],
+                grounds=names["ground"][0],
+                grounds_missing=names["ground"][1],
+                keys=self.keys,
+                measures=self.measures,
+                seen_players=np.array([player for player, _ in seen], dtype=str),
+                seen_matches=np.array([match_id for _, match_id in seen], dtype=str),
+            )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as arrays:
+            names = {
+                key: [
+                    None if missing else name
+                    for name, missing in zip(
+                        arrays[key].tolist(), arrays[f"{key}_missing"].tolist()
+                    )
+                ]
+                for key in ["players", "oppositions", "grounds"]
+            }
+            return cls(
+                names["players"],
+                names["oppositions"],
+                names["grounds"],
+                arrays["keys"],
+                arrays["measures"],
+                zip(arrays["seen_players"].tolist(), arrays["seen_matches"].tolist()),
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Build or update the stats cube and look up a slice of it."
+    )
+    parser.add_argument(
+        "--data-dir",
+        default=DATA_DIRECTORY,
+        help="directory holding players.json and players/",
+    )
+    parser.add_argument(
+        "--dataset-dir",
+        help="read matches from the parquet dataset exported by scraper/dataset.py instead of the player files",
+    )
+    parser.add_argument(
+        "--cube",
+        default=CUBE_FILE,
+        help="file the cube is kept in, updated with any matches it has not counted yet",
+    )
+    parser.add_argument(
+        "--rebuild",
+        action="store_true",
+        help="build the cube from scratch instead of updating it",
+    )
+    parser.add_argument("--player", help="e.g. Shubman Gill")
+    parser.add_argument("--opposition", help="e.g. Australia")
+    parser.add_argument("--since", type=int, help="first year of the slice")
+    parser.add_argument("--until", type=int, help="last year of the slice")
+    parser.add_argument("--ground", help="e.g. Wankhede")
+    args = parser.parse_args()
+    # player files are decoded, and the parquet dataset read, with the scraper's modules
+    sys.path.append(SCRAPER_DIRECTORY)
+
+    names, _ = load_roster(args.data_dir)
+    players = [get_player_file_name(name) for name in names]
+    if args.dataset_dir:
+        history = form.read_match_history(players, args.dataset_dir)
+    else:
+        history = form.load_match_history(players, args.data_dir)
+
+    cube = (
+        StatsCube()
+        if args.rebuild or not os.path.exists(args.cube)
+        else StatsCube.load(args.cube)
+    )
+    added = cube.add(history)
+    if added:
+        cube.save(args.cube)
+    print(f"{added} new matches counted, {len(cube)} cells in {args.cube}")
+
+    if any(
+        value is not None
+        for value in (args.player, args.opposition, args.since, args.until, args.ground)
+    ):
+        years = None
+        if args.since is not None or args.until is not None:
+            cube_years = cube.get_years()
+            if not cube_years and (args.since is None or args.until is None):
+                raise SystemExit(
+                    f"No dated matches in {args.cube}, give both --since and --until"
+                )
+            since = cube_years[0] if args.since is None else args.since
+            until = cube_years[-1] if args.until is None else args.until
+            years = range(since, until + 1)
+        stats = cube.query(
+            get_player_file_name(args.player) if args.player else None,
+            f"v {args.opposition}" if args.opposition else None,
+            years,
+            args.ground,
+        )
+        for name, value in stats.items():
+            print(f"{name:<18}{'-' if value is None else round(value, 2)}")
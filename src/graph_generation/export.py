@@ -0,0 +1,70 @@
+import time
+
+DEFAULT_BATCH_SIZE = 32
+
+
+# collects figures and exports them through one long-lived renderer instead of paying
+# write_image's per call setup for every image; with kaleido 1.x each flush is one call for
+# the whole batch, kaleido 0.2 has no such call so its images are still sent one by one
+class BatchExporter:
+    def __init__(self, batch_size=DEFAULT_BATCH_SIZE):
+        self.batch_size = batch_size
+        self.pending = []
+        # (image file path, seconds) and (images in batch, seconds)
+        self.image_timings = []
+        self.batch_timings = []
+
+    def add(self, figure, image_file_path):
+        self.pending.append((figure, image_file_path))
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self.pending:
+            return
+        import plotly.io as pio
+
+        batch_start = time.perf_counter()
+        if hasattr(pio, "write_images"):
+            # kaleido 1.x: one browser session renders the whole batch
+            figures = [figure for figure, _ in self.pending]
+            image_file_paths = [image_file_path for _, image_file_path in self.pending]
+            pio.write_images(figures, image_file_paths)
+            image_time = (time.perf_counter() - batch_start) / len(self.pending)
+            self.image_timings.extend(
+                (image_file_path, image_time) for image_file_path in image_file_paths
+            )
+        else:
+            # kaleido 0.2: one transform per image, nothing is batched, but its renderer
+            # subprocess stays up between calls, so send figure dicts to it directly and
+            # skip plotly's per call validation
+            scope = pio.kaleido.scope
+            for figure, image_file_path in self.pending:
+                image_start = time.perf_counter()
+                if not isinstance(figure, dict):
+                    figure = figure.to_dict()
+                image = scope.transform(figure, format="png")
+                with open(image_file_path, "wb") as image_file:
+                    image_file.write(image)
+                self.image_timings.append(
+                    (image_file_path, time.perf_counter() - image_start)
+                )
+        self.batch_timings.append(
+            (len(self.pending), time.perf_counter() - batch_start)
+        )
+        self.pending = []
+
+    def report(self):
+        if not self.batch_timings:
+            return "No images exported."
+        total_time = sum(seconds for _, seconds in self.batch_timings)
+        slowest_path, slowest_time = max(
+            self.image_timings, key=lambda timing: timing[1]
+        )
+        lines = [
+            f"Exported {len(self.image_timings)} images in {len(self.batch_timings)} batches, {total_time:.2f}s total",
+            f"Per image: {1000 * total_time / len(self.image_timings):.1f}ms mean, {1000 * slowest_time:.1f}ms slowest ({slowest_path})",
+        ]
+        for batch_number, (images, seconds) in enumerate(self.batch_timings, start=1):
+            lines.append(f"Batch {batch_number}: {images} images in {seconds:.2f}s")
+        return "\n".join(lines)
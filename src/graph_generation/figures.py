@@ -0,0 +1,60 @@
+import json
+import os
+
+# per player bundles and the shared template, relative to the graph output directory
+FIGURE_DIRECTORY = "./Figures"
+TEMPLATE_FILE = "template.json"
+
+OUTPUT_FORMATS = ["png", "json", "bundle"]
+
+
+def get_figure_spec(figure):
+    # the figure as plotly.js takes it, without the template every figure carries; that is
+    # written once to template.json and put back by the dashboard
+    spec = figure.to_plotly_json()
+    spec["layout"].pop("template", None)
+    return spec
+
+
+def to_json(value):
+    # plotly's encoder handles the numpy arrays in figures, and compact separators keep
+    # the files small
+    import plotly.io as pio
+
+    return pio.json.to_json_plotly(value, pretty=False)
+
+
+def write_json(path, value):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as json_file:
+        json_file.write(to_json(value))
+    os.replace(tmp_path, path)
+
+
+def get_spec_path(image_file_path):
+    return os.path.splitext(image_file_path)[0] + ".json"
+
+
+def get_bundle_path(output_root, player_name):
+    return os.path.join(output_root, FIGURE_DIRECTORY, f"{player_name}.json")
+
+
+def write_bundle(bundle_path, specs):
+    # chart name -> spec for one player, merged into the bundle already there so an
+    # incremental or partial run only replaces the charts it rendered
+    bundle = {}
+    if os.path.exists(bundle_path):
+        with open(bundle_path, "r") as bundle_file:
+            bundle = json.load(bundle_file)
+    bundle.update(specs)
+    write_json(bundle_path, bundle)
+
+
+def write_template(output_root):
+    import plotly.io as pio
+
+    template = pio.templates[pio.templates.default]
+    write_json(
+        os.path.join(output_root, FIGURE_DIRECTORY, TEMPLATE_FILE),
+        template.to_plotly_json(),
+    )
@@ -0,0 +1,350 @@
+import argparse
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+import stats_frame
+from selection import (
+    DATA_DIRECTORY,
+    SCRAPER_DIRECTORY,
+    get_player_file_name,
+    load_roster,
+)
+
+DEFAULT_WINDOW = 10
+SPLITS = ["ground", "opposition"]
+
+
+class MatchHistory:
+    # every match of a roster as one typed array per field, sorted by player and then date
+    # so each player's career is a contiguous run of rows. player, opposition and ground
+    # are codes into the name lists; runs, wickets and runs_conceded are NaN when the
+    # player did not bat or bowl; position is where each match came in the rows given
+    __slots__ = (
+        "players",
+        "oppositions",
+        "grounds",
+        "position",
+        "player",
+        "match_id",
+        "date",
+        "runs",
+        "not_out",
+        "wickets",
+        "runs_conceded",
+        "catches",
+        "opposition",
+        "ground",
+    )
+
+    def __init__(
+        self,
+        players,
+        player_names,
+        match_ids,
+        dates,
+        runs,
+        not_outs,
+        wickets,
+        runs_conceded,
+        catches,
+        oppositions,
+        grounds,
+    ):
+        self.players = list(players)
+        player = pd.Categorical(player_names, categories=self.players).codes.astype(
+            "int32"
+        )
+        opposition, self.oppositions = pd.factorize(
+            np.asarray(oppositions, dtype=object), use_na_sentinel=False
+        )
+        ground, self.grounds = pd.factorize(
+            np.asarray(grounds, dtype=object), use_na_sentinel=False
+        )
+        date = np.asarray(dates, dtype="datetime64[D]")
+        order = np.lexsort((date, player))
+        self.position = order
+        self.player = player[order]
+        self.match_id = np.asarray(match_ids, dtype=object)[order]
+        self.date = date[order]
+        self.runs = np.asarray(runs, dtype="float64")[order]
+        self.not_out = np.asarray(not_outs, dtype="bool")[order]
+        self.wickets = np.asarray(wickets, dtype="float64")[order]
+        self.runs_conceded = np.asarray(runs_conceded, dtype="float64")[order]
+        self.catches = np.nan_to_num(np.asarray(catches, dtype="float64"))[order]
+        self.opposition = opposition.astype("int32")[order]
+        self.ground = ground.astype("int32")[order]
+
+    def __len__(self):
+        return len(self.player)
+
+
+def build_match_history(player_data):
+    (
+        player_names,
+        match_ids,
+        dates,
+        runs,
+        not_outs,
+        wickets,
+        runs_conceded,
+        catches,
+        oppositions,
+        grounds,
+    ) = ([], [], [], [], [], [], [], [], [], [])
+    for player_name, data in player_data.items():
+        for match in data.odi_matches:
+            player_names.append(player_name)
+            match_ids.append(match.match_id)
+            dates.append(match.date)
+            runs.append(match.runs)
+            not_outs.append(match.not_out)
+            wickets.append(match.wickets)
+            runs_conceded.append(match.runs_conceded)
+            catches.append(match.catches_taken)
+            oppositions.append(match.opposition)
+            grounds.append(match.ground)
+    return MatchHistory(
+        list(player_data),
+        player_names,
+        match_ids,
+        # "20 Oct 2021", parsed in one pass rather than split match by match
+        pd.to_datetime(
+            pd.Series(dates, dtype=object), format="%d %b %Y", errors="coerce"
+        ).to_numpy(),
+        stats_frame.decode_numbers(runs),
+        not_outs,
+        stats_frame.decode_numbers(wickets),
+        stats_frame.decode_numbers(runs_conceded),
+        stats_frame.decode_numbers(catches),
+        oppositions,
+        grounds,
+    )
+
+
+def load_match_history(players, data_directory):
+    return build_match_history(stats_frame.load_player_data(players, data_directory))
+
+
+def read_match_history(players, dataset_directory):
+    # the same history from the player_matches table written by scraper/dataset.py
+    from dataset import read_table
+
+    players = list(players)
+    matches = read_table(
+        "player_matches",
+        columns=[
+            "player",
+            "match_id",
+            "date",
+            "runs",
+            "not_out",
+            "wickets",
+            "runs_conceded",
+            "catches_taken",
+            "opposition",
+            "ground",
+        ],
+        filters=[("player", "in", players)],
+        dataset_dir=dataset_directory,
+    )
+    return MatchHistory(
+        players,
+        matches["player"].to_numpy(),
+        matches["match_id"].to_numpy(zero_copy_only=False),
+        matches["date"].to_numpy(zero_copy_only=False),
+        matches["runs"].to_numpy(zero_copy_only=False),
+        matches["not_out"].to_numpy(zero_copy_only=False),
+        matches["wickets"].to_numpy(zero_copy_only=False),
+        matches["runs_conceded"].to_numpy(zero_copy_only=False),
+        matches["catches_taken"].to_numpy(zero_copy_only=False),
+        matches["opposition"].to_numpy(zero_copy_only=False),
+        matches["ground"].to_numpy(zero_copy_only=False),
+    )
+
+
+def get_window_starts(groups, window):
+    # index of the first row of the window ending at each row, never reaching back into
+    # the previous group; groups must be sorted
+    index = np.arange(len(groups))
+    group_starts = (
+        np.flatnonzero(np.r_[True, groups[1:] != groups[:-1]]) if len(groups) else index
+    )
+    starts = np.repeat(group_starts, np.diff(np.r_[group_starts, len(groups)]))
+    return np.maximum(index - window + 1, starts)
+
+
+def rolling_sum(values, starts):
+    # sum over each row's window as a difference of two running totals
+    totals = np.r_[0, np.cumsum(values)]
+    return totals[np.arange(1, len(values) + 1)] - totals[starts]
+
+
+def divide(numerator, denominator):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(denominator > 0, numerator / denominator, np.nan)
+
+
+def get_batting_form(history, window=DEFAULT_WINDOW):
+    # one row per innings batted with the player's numbers over their last window innings
+    batted = ~np.isnan(history.runs)
+    player = history.player[batted]
+    starts = get_window_starts(player, window)
+    runs = rolling_sum(history.runs[batted], starts)
+    dismissals = rolling_sum(~history.not_out[batted], starts)
+    innings = np.arange(len(player)) - starts + 1
+    return pd.DataFrame(
+        {
+            "player": pd.Categorical.from_codes(player, categories=history.players),
+            "date": history.date[batted],
+            "innings": innings,
+            "runs": runs,
+            "batting_average": divide(runs, dismissals),
+            "runs_per_innings": runs / innings,
+        }
+    )
+
+
+def get_bowling_form(history, window=DEFAULT_WINDOW):
+    # one row per match bowled in with the player's numbers over their last window of them
+    bowled = ~np.isnan(history.wickets)
+    player = history.player[bowled]
+    starts = get_window_starts(player, window)
+    wickets = rolling_sum(history.wickets[bowled], starts)
+    runs_conceded = rolling_sum(np.nan_to_num(history.runs_conceded[bowled]), starts)
+    matches = np.arange(len(player)) - starts + 1
+    return pd.DataFrame(
+        {
+            "player": pd.Categorical.from_codes(player, categories=history.players),
+            "date": history.date[bowled],
+            "matches": matches,
+            "wickets": wickets,
+            "bowling_average": divide(runs_conceded, wickets),
+            "wickets_per_match": wickets / matches,
+        }
+    )
+
+
+def get_current_form(history, window=DEFAULT_WINDOW):
+    # each player's rolling numbers as of their latest innings and latest bowling match
+    batting = (
+        get_batting_form(history, window)
+        .groupby("player", observed=True)
+        .tail(1)
+        .set_index("player")
+    )
+    bowling = (
+        get_bowling_form(history, window)
+        .groupby("player", observed=True)
+        .tail(1)
+        .set_index("player")
+    )
+    form = batting.drop(columns="date").join(
+        bowling.drop(columns="date"),
+        how="outer",
+        lsuffix="_batting",
+        rsuffix="_bowling",
+    )
+    return form.reindex(history.players)
+
+
+def get_splits(history, by="ground"):
+    # career batting and bowling per player and ground or opposition, one bincount per sum
+    codes = getattr(history, by)
+    names = getattr(history, f"{by}s")
+    pairs = history.player.astype("int64") * len(names) + codes
+    size = len(history.players) * len(names)
+    batted = ~np.isnan(history.runs)
+    bowled = ~np.isnan(history.wickets)
+
+    def total(weights):
+        return np.bincount(pairs, weights=weights, minlength=size)
+
+    innings = total(batted)
+    runs = total(np.nan_to_num(history.runs))
+    dismissals = total(batted & ~history.not_out)
+    matches = total(bowled)
+    wickets = total(np.nan_to_num(history.wickets))
+    runs_conceded = total(np.where(bowled, np.nan_to_num(history.runs_conceded), 0))
+    played = np.flatnonzero(total(None))
+    return pd.DataFrame(
+        {
+            "player": pd.Categorical.from_codes(
+                played // len(names), categories=history.players
+            ),
+            by: np.asarray(names, dtype=object)[played % len(names)],
+            "innings": innings[played].astype("int64"),
+            "runs": runs[played],
+            "batting_average": divide(runs, dismissals)[played],
+            "matches_bowled": matches[played].astype("int64"),
+            "wickets": wickets[played],
+            "bowling_average": divide(runs_conceded, wickets)[played],
+        }
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Rolling form and venue splits from every player's match history."
+    )
+    parser.add_argument(
+        "--data-dir",
+        default=DATA_DIRECTORY,
+        help="directory holding players.json and players/",
+    )
+    parser.add_argument(
+        "--dataset-dir",
+        help="read matches from the parquet dataset exported by scraper/dataset.py instead of the player files",
+    )
+    parser.add_argument(
+        "--players",
+        nargs="+",
+        help="only these players, all of players.json by default",
+    )
+    parser.add_argument(
+        "--window",
+        type=int,
+        default=DEFAULT_WINDOW,
+        help="innings in the rolling window",
+    )
+    parser.add_argument(
+        "--split",
+        choices=SPLITS,
+        help="print career splits by ground or opposition instead of current form",
+    )
+    args = parser.parse_args()
+    # player files are decoded, and the parquet dataset read, with the scraper's modules
+    sys.path.append(SCRAPER_DIRECTORY)
+
+    if args.players:
+        names = args.players
+    else:
+        names, _ = load_roster(args.data_dir)
+    players = [get_player_file_name(name) for name in names]
+
+    start = time.perf_counter()
+    if args.dataset_dir:
+        history = read_match_history(players, args.dataset_dir)
+    else:
+        history = load_match_history(players, args.data_dir)
+    loaded = time.perf_counter()
+    if args.split:
+        result = get_splits(history, args.split)
+    else:
+        result = get_current_form(history, args.window)
+    computed = time.perf_counter()
+
+    with pd.option_context(
+        "display.max_rows",
+        None,
+        "display.width",
+        200,
+        "display.float_format",
+        "{:.2f}".format,
+    ):
+        print(result)
+    print(
+        f"Loaded {len(history)} matches in {(loaded - start) * 1000:.1f} ms, computed in {(computed - loaded) * 1000:.1f} ms"
+    )
@@ -1,256 +1,138 @@
+import argparse
+import importlib
 import json
 import os
-import plotly.express as px
-import plotly.graph_objects as go
-import pandas as pd
+import sys
+import traceback
 from collections import defaultdict
-
-# terminolofy mapping for extracting data from json files
-terminology_mapping = {
-    "tt": "type",
-    "sp": "span",
-    "mt": "matches",
-    "in": "innings",
-    "pr": None,
-    "rn": "runs",
-    "fo": "fours",
-    "si": "sixes",
-    "ft": "fifties",
-    "hn": "hundreds",
-    "bf": "balls_faced",
-    "dk": "ducks",
-    "no": "not_outs",
-    "hs": "high_score",
-    "bta": "batting_average",
-    "btsr": "batting_strike_rate",
-    "wk": "wickets_taken",
-    "bwe": "average_economy",
-    "md": "maiden_overs",
-    "bwsr": "bowling_strike_rate",
-    "ov": "overs_bowled"
-}
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import stats_model
+from export import DEFAULT_BATCH_SIZE, BatchExporter
+from figures import FIGURE_DIRECTORY, OUTPUT_FORMATS, get_bundle_path, get_figure_spec, get_spec_path, write_bundle, write_json, write_template
+from manifest import MANIFEST_FILE, BuildManifest, get_definition_hash, get_input_hash
+from stats_model import world_cup_oppositions
+
+GRAPH_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+DATA_DIRECTORY = os.path.join(GRAPH_DIRECTORY, "..", "..", "data")
+SCRAPER_DIRECTORY = os.path.join(GRAPH_DIRECTORY, "..", "scraper")
+
+# stands in for a module until one of its attributes is used, so importing graph.py, or
+# rendering only a few charts, does not pay for pandas and plotly up front
+class LazyModule:
+    def __init__(self, name):
+        self.name = name
+        self.module = None
+
+    def __getattr__(self, attribute):
+        if self.module is None:
+            self.module = importlib.import_module(self.name)
+        return getattr(self.module, attribute)
+
+px = LazyModule("plotly.express")
+go = LazyModule("plotly.graph_objects")
+pd = LazyModule("pandas")
+stats_frame = LazyModule("stats_frame")
 
 # function for batting strike rate vs batting position graph
-def generate_batting_strike_rate_vs_batting_position_graph(data, output_directory, player_name):
-    batting_positions = []
-    batting_strike_rates = []
-
-    for stats_group in data["BATTING"]["summary"]["groups"]:
-        if stats_group["type"] == "BATTING_POSITION":
-            for stat in stats_group["stats"]:
-                position = stat["tt"] 
-                batting_positions.append(position)
-                batting_strike_rates.append(float(stat["btsr"]))
+def generate_batting_strike_rate_vs_batting_position_graph(stats, output_directory, player_name):
+    df = stats.select(player_name, "BATTING", "BATTING_POSITION", ["batting_strike_rate"])
 
     custom_order = ["1st position", "2nd position", "3rd position", "4th position", "5th position", "6th position", "7th position", "8th position", "9th position", "10th position", "11th position"]
 
     player_title = player_name.replace('_', ' ').title()
-    df = pd.DataFrame({
-        "Batting Position": batting_positions,
-        "Batting Strike Rate": batting_strike_rates
-    })
+    df = df.assign(key=pd.Categorical(df["key"], categories=custom_order, ordered=True)).sort_values("key")
 
-    df["Batting Position"] = pd.Categorical(df["Batting Position"], categories=custom_order, ordered=True)
-    df = df.sort_values("Batting Position")
-
-    fig = px.bar(df, x="Batting Position", y="Batting Strike Rate", color="Batting Strike Rate", title=f"{player_title}'s Batting Strike Rate at Batting Position")
+    fig = px.bar(df, x="key", y="batting_strike_rate", color="batting_strike_rate", labels={"key": "Batting Position", "batting_strike_rate": "Batting Strike Rate"}, title=f"{player_title}'s Batting Strike Rate at Batting Position")
     image_file_path = os.path.join(output_directory, f"{player_name}_strike_rate.png")
-    fig.write_image(image_file_path)
+    return fig, image_file_path
 
 # function for runs scored vs batting position graph
-def generate_runs_scored_vs_batting_position_graph(data, output_directory, player_name):
-    batting_positions = []
-    runs_scored = []
-
-    for stats_group in data["BATTING"]["summary"]["groups"]:
-        if stats_group["type"] == "BATTING_POSITION":
-            for stat in stats_group["stats"]:
-                position = stat["tt"]  
-                batting_positions.append(position)
-                runs_scored.append(int(stat["rn"])) 
+def generate_runs_scored_vs_batting_position_graph(stats, output_directory, player_name):
+    df = stats.select(player_name, "BATTING", "BATTING_POSITION", ["runs"]).astype({"runs": "int64"})
 
     custom_order = ["1st position", "2nd position", "3rd position", "4th position", "5th position", "6th position", "7th position", "8th position", "9th position", "10th position", "11th position"]
 
     player_title = player_name.replace('_', ' ').title()
-    df = pd.DataFrame({
-        "Batting Position": batting_positions,
-        "Runs Scored": runs_scored
-    })
-
-    df["Batting Position"] = pd.Categorical(df["Batting Position"], categories=custom_order, ordered=True)
-    df = df.sort_values("Batting Position")
+    df = df.assign(key=pd.Categorical(df["key"], categories=custom_order, ordered=True)).sort_values("key")
 
-    fig = px.bar(df, x="Batting Position", y="Runs Scored", color="Runs Scored", title=f"{player_title}'s Runs Scored at Batting Position")
+    fig = px.bar(df, x="key", y="runs", color="runs", labels={"key": "Batting Position", "runs": "Runs Scored"}, title=f"{player_title}'s Runs Scored at Batting Position")
     image_file_path = os.path.join(output_directory, f"{player_name}_runs_scored.png")
-    fig.write_image(image_file_path)
+    return fig, image_file_path
 
 # function for generating not out percentages
-def generate_not_out_percentages_graph(player_data, output_directory, player_name):
-    odi_matches = player_data.get("odi_matches", [])
-    not_out_counts = defaultdict(int)
-    match_counts = defaultdict(int)
-
-    for match in odi_matches:
-        match_date = match["date"]
-        match_year = int(match_date.split()[-1])
-        if 2017 <= match_year:
-            not_out_counts[match_year] += int(match["not_out"])
-            match_counts[match_year] += 1
-
-    years = list(not_out_counts.keys())
-    not_out_percentages = [100 * not_out_counts[year] / match_counts[year] if match_counts[year] > 0 else 0 for year in years]
+def generate_not_out_percentages_graph(stats, output_directory, player_name):
+    df = stats.select_matches(player_name, since=2017).groupby("year", sort=False)["not_out"].agg(["sum", "count"]).reset_index()
+    df["not_out_percentage"] = 100 * df["sum"] / df["count"]
+    years = df["year"].tolist()
 
     player_title = player_name.replace('_', ' ').title()
-    df = pd.DataFrame({
-        "Year": years,
-        "Not Out Percentage": not_out_percentages
-    })
-
-    fig = px.bar(df, x="Year", y="Not Out Percentage", labels={"x": "Year", "y": "Not Out Percentage"})
+    fig = px.bar(df, x="year", y="not_out_percentage", labels={"year": "Year", "not_out_percentage": "Not Out Percentage"})
     fig.update_layout(title=f"{player_title}'s Not Out Percentage Over the Years (2017 and Beyond)")
     fig.update_yaxes(range=[0, 100])
     fig.update_xaxes(tickvals=years)
     image_file_path_not_out_percentages = os.path.join(output_directory, f"{player_name}_not_out_percentages.png")
-    fig.write_image(image_file_path_not_out_percentages)
+    return fig, image_file_path_not_out_percentages
 
 # function for generating batting strike rate graph
-def generate_batting_strike_rate_graph(data, output_directory, player_name):
-    years = []
-    batting_strike_rates = []
-
-    for stats_group in data["BATTING"]["summary"]["groups"]:
-        if stats_group["type"] == "YEAR":
-            for stat in stats_group["stats"]:
-                year = int(stat["tt"].split()[-1])
-                year_data = {terminology_mapping[key]: value for key, value in stat.items() if key in terminology_mapping}
-                year_data["Year"] = year
-                if year >= 2017 and year_data["batting_strike_rate"] is not None:
-                    years.append(year)
-                    batting_strike_rates.append(float(year_data["batting_strike_rate"]))
+def generate_batting_strike_rate_graph(stats, output_directory, player_name):
+    df_strike_rate = stats.select(player_name, "BATTING", "YEAR", ["batting_strike_rate"], since=2017)
+    years = df_strike_rate["key"].tolist()
 
     player_title = player_name.replace('_', ' ').title()
-    df_strike_rate = pd.DataFrame({
-        "Year": years,
-        "Batting Strike Rate": batting_strike_rates
-    })
-
-    fig_strike_rate = px.line(df_strike_rate, x="Year", y="Batting Strike Rate", labels={"x": "Year", "y": "Batting Strike Rate"})
+    fig_strike_rate = px.line(df_strike_rate, x="key", y="batting_strike_rate", labels={"key": "Year", "batting_strike_rate": "Batting Strike Rate"})
     fig_strike_rate.update_layout(title=f"{player_title}'s Batting Strike Rate Over the Years (2017 and Beyond)")
     fig_strike_rate.update_xaxes(tickvals=years)
     image_file_path_strike_rate = os.path.join(output_directory, f"{player_name}_strike_rate.png")
-    fig_strike_rate.write_image(image_file_path_strike_rate)
+    return fig_strike_rate, image_file_path_strike_rate
 
 # function for generating batting average graph
-def generate_batting_average_graph(data, output_directory, player_name):
-    years = []
-    batting_averages = []
-
-    for stats_group in data["BATTING"]["summary"]["groups"]:
-        if stats_group["type"] == "YEAR":
-            for stat in stats_group["stats"]:
-                year = int(stat["tt"].split()[-1])
-                year_data = {terminology_mapping[key]: value for key, value in stat.items() if key in terminology_mapping}
-                year_data["Year"] = year
-                if year >= 2017 and year_data["batting_average"] is not None:
-                    years.append(year)
-                    batting_averages.append(float(year_data["batting_average"]))
+def generate_batting_average_graph(stats, output_directory, player_name):
+    df_average = stats.select(player_name, "BATTING", "YEAR", ["batting_average"], since=2017)
+    years = df_average["key"].tolist()
 
     player_title = player_name.replace('_', ' ').title()
-    df_average = pd.DataFrame({
-        "Year": years,
-        "Batting Average": batting_averages
-    })
-
-    fig_average = px.line(df_average, x="Year", y="Batting Average", labels={"x": "Year", "y": "Batting Average"})
+    fig_average = px.line(df_average, x="key", y="batting_average", labels={"key": "Year", "batting_average": "Batting Average"})
     fig_average.update_layout(title=f"{player_title}'s Batting Average Over the Years (2017 and Beyond)")
     fig_average.update_xaxes(tickvals=years)
     image_file_path_average = os.path.join(output_directory, f"{player_name}_average.png")
-    fig_average.write_image(image_file_path_average)
+    return fig_average, image_file_path_average
 
 # function for generating runs scored graph
-def generate_runs_scored_graph(data, output_directory, player_name):
-    years = []
-    runs_scored = []
-
-    for stats_group in data["BATTING"]["summary"]["groups"]:
-        if stats_group["type"] == "YEAR":
-            for stat in stats_group["stats"]:
-                year = int(stat["tt"].split()[-1])
-                year_data = {terminology_mapping[key]: value for key, value in stat.items() if key in terminology_mapping}
-                year_data["Year"] = year
-                if year >= 2017 and year_data["runs"] is not None:
-                    years.append(year)
-                    runs_scored.append(int(year_data["runs"]))
+def generate_runs_scored_graph(stats, output_directory, player_name):
+    df_runs = stats.select(player_name, "BATTING", "YEAR", ["runs"], since=2017).astype({"runs": "int64"})
+    years = df_runs["key"].tolist()
 
     player_title = player_name.replace('_', ' ').title()
-    df_runs = pd.DataFrame({
-        "Year": years,
-        "Runs Scored": runs_scored
-    })
-
-    fig_runs = px.scatter(df_runs, x="Year", y="Runs Scored", size="Runs Scored", color="Runs Scored", labels={"x": "Year", "y": "Runs Scored"})
+    fig_runs = px.scatter(df_runs, x="key", y="runs", size="runs", color="runs", labels={"key": "Year", "runs": "Runs Scored"})
     fig_runs.update_layout(title=f"{player_title}'s Runs Scored Over the Years (2017 and Beyond)")
     fig_runs.update_xaxes(tickvals=years)
     image_file_path_runs = os.path.join(output_directory, f"{player_name}_runs.png")
-    fig_runs.write_image(image_file_path_runs)
+    return fig_runs, image_file_path_runs
 
 # functions for generating fifties vs hundreds graph
-def generate_fifties_vs_hundreds_graph(data, output_directory, player_name):
-    years = []
-    fifties = []
-    hundreds = []
-
-    for stats_group in data["BATTING"]["summary"]["groups"]:
-        if stats_group["type"] == "YEAR":
-            for stat in stats_group["stats"]:
-                year = int(stat["tt"].split()[-1])
-                year_data = {terminology_mapping[key]: value for key, value in stat.items() if key in terminology_mapping}
-                year_data["Year"] = year
-                if year >= 2017 and year_data["fifties"] is not None and year_data["hundreds"] is not None:
-                    years.append(year)
-                    fifties.append(int(year_data["fifties"]))
-                    hundreds.append(int(year_data["hundreds"]))
+def generate_fifties_vs_hundreds_graph(stats, output_directory, player_name):
+    df_fifties_vs_hundreds = stats.select(player_name, "BATTING", "YEAR", ["fifties", "hundreds"], since=2017)
+    df_fifties_vs_hundreds = df_fifties_vs_hundreds.astype({"fifties": "int64", "hundreds": "int64"}).rename(columns={"fifties": "50s", "hundreds": "100s"})
+    years = df_fifties_vs_hundreds["key"].tolist()
 
     player_title = player_name.replace('_', ' ').title()
-    df_fifties_vs_hundreds = pd.DataFrame({
-        "Year": years,
-        "50s": fifties,
-        "100s": hundreds
-    })
-
-    fig_fifties_vs_hundreds = px.bar(df_fifties_vs_hundreds, x="Year", y=["50s", "100s"],
-                                      labels={"x": "Year", "value": "Count"}, barmode="group")
+    fig_fifties_vs_hundreds = px.bar(df_fifties_vs_hundreds, x="key", y=["50s", "100s"],
+                                      labels={"key": "Year", "value": "Count"}, barmode="group")
     fig_fifties_vs_hundreds.update_layout(title=f"{player_title}'s 50s vs 100s Over the Years (2017 and Beyond)")
     fig_fifties_vs_hundreds.update_xaxes(tickvals=years)
     image_file_path_fifties_vs_hundreds = os.path.join(output_directory, f"{player_name}_fifties_vs_hundreds.png")
-    fig_fifties_vs_hundreds.write_image(image_file_path_fifties_vs_hundreds)
+    return fig_fifties_vs_hundreds, image_file_path_fifties_vs_hundreds
 
 # function for generating wickets taken graph
-def generate_wickets_taken_graph(data, output_directory, player_name):
-    years = []
-    wickets_taken = []
-
-    for stats_group in data["BOWLING"]["summary"]["groups"]:
-        if stats_group["type"] == "YEAR":
-            for stat in stats_group["stats"]:
-                year = int(stat["tt"].split()[-1])
-                if year >= 2017:  # Filter data for years 2017 and beyond
-                    year_data = {terminology_mapping[key]: value for key, value in stat.items() if key in terminology_mapping}
-                    year_data["Year"] = year
-                    if year_data["wickets_taken"] is not None:
-                        years.append(year)
-                        wickets_taken.append(int(year_data["wickets_taken"]))
+def generate_wickets_taken_graph(stats, output_directory, player_name):
+    df_wickets = stats.select(player_name, "BOWLING", "YEAR", ["wickets_taken"], since=2017).astype({"wickets_taken": "int64"})
+    years = df_wickets["key"].tolist()
 
     player_title = player_name.replace('_', ' ').title()
-    df_wickets = pd.DataFrame({
-        "Year": years,
-        "Wickets Taken": wickets_taken
-    })
-
-    fig_wickets = px.bar(df_wickets, x="Year", y="Wickets Taken", color="Wickets Taken", labels={"x": "Year", "y": "Wickets Taken"})
+    fig_wickets = px.bar(df_wickets, x="key", y="wickets_taken", color="wickets_taken", labels={"key": "Year", "wickets_taken": "Wickets Taken"})
     fig_wickets.update_layout(title=f"{player_title}'s Wickets Taken Over the Years (2017 and Beyond)")
     fig_wickets.update_xaxes(title_text=None)
-    fig_wickets.update_xaxes(tickvals=years)  
+    fig_wickets.update_xaxes(tickvals=years)
     fig_wickets.add_annotation(
         text="Year",
         x=0.5,
@@ -260,34 +142,18 @@ def generate_wickets_taken_graph(data, output_directory, player_name):
         showarrow=False
     )
     image_file_path_wickets = os.path.join(output_directory, f"{player_name}_wickets.png")
-    fig_wickets.write_image(image_file_path_wickets)
+    return fig_wickets, image_file_path_wickets
 
 # function for generating average economy graph
-def generate_average_economy_graph(data, output_directory, player_name):
-    years = []
-    average_economy = []
-
-    for stats_group in data["BOWLING"]["summary"]["groups"]:
-        if stats_group["type"] == "YEAR":
-            for stat in stats_group["stats"]:
-                year = int(stat["tt"].split()[-1])
-                if year >= 2017:  # Filter data for years 2017 and beyond
-                    year_data = {terminology_mapping[key]: value for key, value in stat.items() if key in terminology_mapping}
-                    year_data["Year"] = year
-                    if year_data["average_economy"] is not None:
-                        years.append(year)
-                        average_economy.append(float(year_data["average_economy"]))
+def generate_average_economy_graph(stats, output_directory, player_name):
+    df_average_economy = stats.select(player_name, "BOWLING", "YEAR", ["average_economy"], since=2017)
+    years = df_average_economy["key"].tolist()
 
     player_title = player_name.replace('_', ' ').title()
-    df_average_economy = pd.DataFrame({
-        "Year": years,
-        "Average Economy": average_economy
-    })
-
-    fig_average_economy = px.line(df_average_economy, x="Year", y="Average Economy", labels={"x": "Year", "y": "Average Economy"})
+    fig_average_economy = px.line(df_average_economy, x="key", y="average_economy", labels={"key": "Year", "average_economy": "Average Economy"})
     fig_average_economy.update_layout(title=f"{player_title}'s Average Economy Over the Years (2017 and Beyond)")
     fig_average_economy.update_xaxes(title_text=None)
-    fig_average_economy.update_xaxes(tickvals=years) 
+    fig_average_economy.update_xaxes(tickvals=years)
     fig_average_economy.add_annotation(
         text="Year",
         x=0.5,
@@ -297,31 +163,15 @@ def generate_average_economy_graph(data, output_directory, player_name):
         showarrow=False
     )
     image_file_path_average_economy = os.path.join(output_directory, f"{player_name}_average_economy.png")
-    fig_average_economy.write_image(image_file_path_average_economy)
+    return fig_average_economy, image_file_path_average_economy
 
 # function for generating maiden overs graph
-def generate_maiden_overs_graph(data, output_directory, player_name):
-    years = []
-    maiden_overs = []
-
-    for stats_group in data["BOWLING"]["summary"]["groups"]:
-        if stats_group["type"] == "YEAR":
-            for stat in stats_group["stats"]:
-                year = int(stat["tt"].split()[-1])
-                if year >= 2017:  # Filter data for years 2017 and beyond
-                    year_data = {terminology_mapping[key]: value for key, value in stat.items() if key in terminology_mapping}
-                    year_data["Year"] = year
-                    if year_data["maiden_overs"] is not None:
-                        years.append(year)
-                        maiden_overs.append(int(year_data["maiden_overs"]))
+def generate_maiden_overs_graph(stats, output_directory, player_name):
+    df_maiden_overs = stats.select(player_name, "BOWLING", "YEAR", ["maiden_overs"], since=2017).astype({"maiden_overs": "int64"})
+    years = df_maiden_overs["key"].tolist()
 
     player_title = player_name.replace('_', ' ').title()
-    df_maiden_overs = pd.DataFrame({
-        "Year": years,
-        "Maiden Overs": maiden_overs
-    })
-
-    fig_maiden_overs = px.line(df_maiden_overs, x="Year", y="Maiden Overs", labels={"x": "Year", "y": "Maiden Overs"})
+    fig_maiden_overs = px.line(df_maiden_overs, x="key", y="maiden_overs", labels={"key": "Year", "maiden_overs": "Maiden Overs"})
     fig_maiden_overs.update_layout(title=f"{player_title}'s Maiden Overs Over the Years (2017 and Beyond)")
     fig_maiden_overs.update_xaxes(title_text=None)
     fig_maiden_overs.update_xaxes(tickvals=years)
@@ -334,31 +184,15 @@ def generate_maiden_overs_graph(data, output_directory, player_name):
         showarrow=False
     )
     image_file_path_maiden_overs = os.path.join(output_directory, f"{player_name}_maiden_overs.png")
-    fig_maiden_overs.write_image(image_file_path_maiden_overs)
+    return fig_maiden_overs, image_file_path_maiden_overs
 
 # function for generating bowling strike rate graph
-def generate_bowling_strike_rate_graph(data, output_directory, player_name):
-    years = []
-    bowling_strike_rates = []
-
-    for stats_group in data["BOWLING"]["summary"]["groups"]:
-        if stats_group["type"] == "YEAR":
-            for stat in stats_group["stats"]:
-                year = int(stat["tt"].split()[-1])
-                if year >= 2017:  # Filter data for years 2017 and beyond
-                    year_data = {terminology_mapping[key]: value for key, value in stat.items() if key in terminology_mapping}
-                    year_data["Year"] = year
-                    if year_data["bowling_strike_rate"] is not None:
-                        years.append(year)
-                        bowling_strike_rates.append(float(year_data["bowling_strike_rate"]))
+def generate_bowling_strike_rate_graph(stats, output_directory, player_name):
+    df_bowling_strike_rate = stats.select(player_name, "BOWLING", "YEAR", ["bowling_strike_rate"], since=2017)
+    years = df_bowling_strike_rate["key"].tolist()
 
     player_title = player_name.replace('_', ' ').title()
-    df_bowling_strike_rate = pd.DataFrame({
-        "Year": years,
-        "Bowling Strike Rate": bowling_strike_rates
-    })
-
-    fig_bowling_strike_rate = px.line(df_bowling_strike_rate, x="Year", y="Bowling Strike Rate", labels={"x": "Year", "y": "Bowling Strike Rate"})
+    fig_bowling_strike_rate = px.line(df_bowling_strike_rate, x="key", y="bowling_strike_rate", labels={"key": "Year", "bowling_strike_rate": "Bowling Strike Rate"})
     fig_bowling_strike_rate.update_layout(title=f"{player_title}'s Bowling Strike Rate Over the Years (2017 and Beyond)")
     fig_bowling_strike_rate.update_xaxes(title_text=None)
     fig_bowling_strike_rate.update_xaxes(tickvals=years)
@@ -371,251 +205,260 @@ def generate_bowling_strike_rate_graph(data, output_directory, player_name):
         showarrow=False
     )
     image_file_path_bowling_strike_rate = os.path.join(output_directory, f"{player_name}_bowling_strike_rate.png")
-    fig_bowling_strike_rate.write_image(image_file_path_bowling_strike_rate)
+    return fig_bowling_strike_rate, image_file_path_bowling_strike_rate
 
 # function for generating overs bowled graph
-def generate_overs_bowled_graph(data, output_directory, player_name):
-    years = []
-    total_overs_bowled = []
-
-    for stats_group in data["BOWLING"]["summary"]["groups"]:
-        if stats_group["type"] == "YEAR":
-            for stat in stats_group["stats"]:
-                year = int(stat["tt"].split()[-1])
-                if year >= 2017:  # Filter data for years 2017 and beyond
-                    year_data = {terminology_mapping[key]: value for key, value in stat.items() if key in terminology_mapping}
-                    year_data["Year"] = year
-                    if year_data["overs_bowled"] is not None:
-                        years.append(year)
-                        total_overs_bowled.append(float(year_data["overs_bowled"]))
+def generate_overs_bowled_graph(stats, output_directory, player_name):
+    df_overs_bowled = stats.select(player_name, "BOWLING", "YEAR", ["overs_bowled"], since=2017)
+    years = df_overs_bowled["key"].tolist()
+    total_overs_bowled = df_overs_bowled["overs_bowled"].tolist()
 
     player_title = player_name.replace('_', ' ').title()
     labels = [f"{year} ({overs} overs)" for year, overs in zip(years, total_overs_bowled)]
     fig_overs_bowled = go.Figure(data=[go.Pie(labels=labels, values=total_overs_bowled)])
     fig_overs_bowled.update_layout(title=f"{player_title}'s Total Overs Bowled Over the Years (2017 and Beyond)")
     image_file_path_overs_bowled = os.path.join(output_directory, f"{player_name}_overs_bowled.png")
-    fig_overs_bowled.write_image(image_file_path_overs_bowled)
+    return fig_overs_bowled, image_file_path_overs_bowled
 
 # function for generating runs scored against individual teams graph
-def generate_runs_scored_against_individual_teams_graph(player_data, output_directory, player_name):
-    for stats_group in data["BATTING"]["summary"]["groups"]:
-        if stats_group["type"] == "OPPOSITION_TEAM":
-            opposition_data = stats_group.get("stats", [])
-            break
-
-    runs_data = []
-    for opposition in opposition_data:
-        opposition_name = opposition.get("tt", "")
-        if(opposition_name in ["vs Australia", "vs England", "vs Pakistan", "vs New Zealand", "vs Sri Lanka", "vs Bangladesh", "vs West Indies", "vs Afghanistan"]):
-            runs_data.append({
-                "Opposition": opposition_name,
-                "Runs Scored": opposition.get("rn", 0),
-            })
-
-    df = pd.DataFrame(runs_data)
-    fig = px.bar(df, x="Opposition", y="Runs Scored", color="Runs Scored", labels={"x": "Opposition Team", "y": "Runs Scored"})
-    
+def generate_runs_scored_against_individual_teams_graph(stats, output_directory, player_name):
+    df = stats.select(player_name, "BATTING", "OPPOSITION_TEAM", ["runs"], keys=world_cup_oppositions).astype({"runs": "int64"})
+    fig = px.bar(df, x="key", y="runs", color="runs", labels={"key": "Opposition", "runs": "Runs Scored"})
+
     player_title = player_name.replace('_', ' ').title()
     fig.update_layout(title=f"{player_title}'s Runs Scored Against Individial Teams")
     image_file_path_runs_scored_against_individual_teams = os.path.join(output_directory, f"{player_name}_runs_scored_against_individual_teams.png")
-    fig.write_image(image_file_path_runs_scored_against_individual_teams)
-
-# function for generating batting strike rate against individual teams 
-def generate_batting_strike_rate_against_individual_teams_graph(player_data, output_directory, player_name):
-    for stats_group in data["BATTING"]["summary"]["groups"]:
-        if stats_group["type"] == "OPPOSITION_TEAM":
-            opposition_data = stats_group.get("stats", [])
-            break
-
-    runs_data = []
-    for opposition in opposition_data:
-        opposition_name = opposition.get("tt", "")
-        if(opposition_name in ["vs Australia", "vs England", "vs Pakistan", "vs New Zealand", "vs Sri Lanka", "vs Bangladesh", "vs West Indies", "vs Afghanistan"]):
-            runs_data.append({
-                "Opposition": opposition_name,
-                "Batting Strike Rate": opposition.get("btsr", 0),
-            })
-
-    df = pd.DataFrame(runs_data)
-    fig = px.bar(df, x="Opposition", y="Batting Strike Rate",color="Batting Strike Rate", labels={"x": "Opposition Team", "y": "Batting Strike Rate"})
-    
+    return fig, image_file_path_runs_scored_against_individual_teams
+
+# function for generating batting strike rate against individual teams
+def generate_batting_strike_rate_against_individual_teams_graph(stats, output_directory, player_name):
+    df = stats.select(player_name, "BATTING", "OPPOSITION_TEAM", ["batting_strike_rate"], keys=world_cup_oppositions)
+    fig = px.bar(df, x="key", y="batting_strike_rate", color="batting_strike_rate", labels={"key": "Opposition", "batting_strike_rate": "Batting Strike Rate"})
+
     player_title = player_name.replace('_', ' ').title()
     fig.update_layout(title=f"{player_title}'s Batting Strike Rate Against Individial Teams")
     image_file_path_batting_strike_rate_against_individual_teams = os.path.join(output_directory, f"{player_name}_batting_strike_rate_against_individual_teams.png")
-    fig.write_image(image_file_path_batting_strike_rate_against_individual_teams)
+    return fig, image_file_path_batting_strike_rate_against_individual_teams
 
 # function for generating not our percentages against individual teams graph
-def generate_not_out_percentages_against_individual_team_graph(player_data, output_directory, player_name):
-    for stats_group in data["BATTING"]["summary"]["groups"]:
-        if stats_group["type"] == "OPPOSITION_TEAM":
-            opposition_data = stats_group.get("stats", [])
-            break
-
-    runs_data = []
-    for opposition in opposition_data:
-        opposition_name = opposition.get("tt", "")
-        if(opposition_name in ["vs Australia", "vs England", "vs Pakistan", "vs New Zealand", "vs Sri Lanka", "vs Bangladesh", "vs West Indies", "vs Afghanistan"]):
-            runs_data.append({
-                "Opposition": opposition_name,
-                "Not Outs": opposition.get("no", 0),
-                "Total Matches": opposition.get("mt", 0),
-            })
-
-    df = pd.DataFrame(runs_data)
-    df["Not Out Percentages"] = (df["Not Outs"] / df["Total Matches"]) * 100 
+def generate_not_out_percentages_against_individual_team_graph(stats, output_directory, player_name):
+    df = stats.select(player_name, "BATTING", "OPPOSITION_TEAM", ["not_outs", "matches"], keys=world_cup_oppositions, dropna=False)
+    df = df.assign(not_out_percentages=(df["not_outs"] / df["matches"]) * 100)
     player_title = player_name.replace('_', ' ').title()
-    fig = px.pie(df, names="Opposition", values="Not Out Percentages", title=f"{player_title}'s Not Out Percentages Against Individual Teams")
+    fig = px.pie(df, names="key", values="not_out_percentages", labels={"key": "Opposition", "not_out_percentages": "Not Out Percentages"}, title=f"{player_title}'s Not Out Percentages Against Individual Teams")
     image_file_path_batting_strike_rate_against_individual_teams = os.path.join(output_directory, f"{player_name}_not_out_percentages_against_individual_teams.png")
-    fig.write_image(image_file_path_batting_strike_rate_against_individual_teams)
+    return fig, image_file_path_batting_strike_rate_against_individual_teams
 
 # function for generating wickets taken against individuyal teams graph
-def generate_wickets_taken_against_individual_teams_graph(player_data, output_directory, player_name):
-    opposition_data = None
-
-    for stats_group in player_data["BOWLING"]["summary"]["groups"]:
-        if stats_group["type"] == "OPPOSITION_TEAM":
-            opposition_data = stats_group.get("stats", [])
-            break
-
-    runs_data = []
-    for opposition in opposition_data:
-        opposition_name = opposition.get("tt", "")
-        if opposition_name in ["vs Australia", "vs England", "vs Pakistan", "vs New Zealand", "vs Sri Lanka", "vs Bangladesh", "vs West Indies", "vs Afghanistan"]:
-            runs_data.append({
-                "Opposition": opposition_name,
-                "Wickets": opposition.get("wk", 0),
-            })
-
-    df = pd.DataFrame(runs_data)
-    df = df.dropna(subset=["Wickets"])
-    
+def generate_wickets_taken_against_individual_teams_graph(stats, output_directory, player_name):
+    df = stats.select(player_name, "BOWLING", "OPPOSITION_TEAM", ["wickets_taken"], keys=world_cup_oppositions).astype({"wickets_taken": "int64"})
+
     player_title = player_name.replace('_', ' ').title()
-    fig = px.scatter(df, x="Opposition", y="Wickets", size="Wickets", color="Wickets", title=f"{player_title}'s Wickets Against Individual Teams")
+    fig = px.scatter(df, x="key", y="wickets_taken", size="wickets_taken", color="wickets_taken", labels={"key": "Opposition", "wickets_taken": "Wickets"}, title=f"{player_title}'s Wickets Against Individual Teams")
     image_file_path_wickets_taken_against_individual_teams = os.path.join(output_directory, f"{player_name}_wickets_taken_against_individual_teams.png")
-    fig.write_image(image_file_path_wickets_taken_against_individual_teams)
+    return fig, image_file_path_wickets_taken_against_individual_teams
 
 # functions for generating average economy against individual teams graph
-def generate_average_economy_against_individual_teams_graph(player_data, output_directory, player_name):
-    opposition_data = None
-    for stats_group in player_data["BOWLING"]["summary"]["groups"]:
-        if stats_group["type"] == "OPPOSITION_TEAM":
-            opposition_data = stats_group.get("stats", [])
-            break
-
-    bowling_economy_data = []
-    for opposition in opposition_data:
-        opposition_name = opposition.get("tt", "")
-        if opposition_name in ["vs Australia", "vs England", "vs Pakistan", "vs New Zealand", "vs Sri Lanka", "vs Bangladesh", "vs West Indies", "vs Afghanistan"]:
-            bowling_economy_data.append({
-                "Opposition": opposition_name,
-                "Average Economy": opposition.get("bwe", 0),
-            })
-
-    df = pd.DataFrame(bowling_economy_data)
-
-    # Drop rows with NaN values in the "Average Economy" column
-    df = df.dropna(subset=["Average Economy"])
+def generate_average_economy_against_individual_teams_graph(stats, output_directory, player_name):
+    df = stats.select(player_name, "BOWLING", "OPPOSITION_TEAM", ["average_economy"], keys=world_cup_oppositions)
+    # with nothing to draw the chart stays empty, without a colour scale for no values
+    if df.empty:
+        df = df.astype({"average_economy": object})
+
     player_title = player_name.replace('_', ' ').title()
-    fig = px.bar(df, x="Opposition", y="Average Economy", color="Average Economy", title=f"{player_title}'s Average Economy Against Individual Teams")
+    fig = px.bar(df, x="key", y="average_economy", color="average_economy", labels={"key": "Opposition", "average_economy": "Average Economy"}, title=f"{player_title}'s Average Economy Against Individual Teams")
     image_file_path_average_economy_against_individual_teams = os.path.join(output_directory, f"{player_name}_average_economy_against_individual_teams.png")
-    fig.write_image(image_file_path_average_economy_against_individual_teams)
+    return fig, image_file_path_average_economy_against_individual_teams
 
 # function for generating bowling strike rate against individual teams graph
-def generate_bowling_strike_rate_against_individual_teams_graph(player_data, output_directory, player_name):
-    opposition_data = None
-
-    for stats_group in player_data["BOWLING"]["summary"]["groups"]:
-        if stats_group["type"] == "OPPOSITION_TEAM":
-            opposition_data = stats_group.get("stats", [])
-            break
-
-    bowling_strike_rate = []
-    for opposition in opposition_data:
-        opposition_name = opposition.get("tt", "")
-        if opposition_name in ["vs Australia", "vs England", "vs Pakistan", "vs New Zealand", "vs Sri Lanka", "vs Bangladesh", "vs West Indies", "vs Afghanistan"]:
-            bowling_strike_rate.append({
-                "Opposition": opposition_name,
-                "Bowling Strike Rate": opposition.get("bwsr", 0),
-            })
-
-    df = pd.DataFrame(bowling_strike_rate)
-
-    # Drop rows with NaN values in the "Bowling Strike Rate" column
-    df = df.dropna(subset=["Bowling Strike Rate"])
+def generate_bowling_strike_rate_against_individual_teams_graph(stats, output_directory, player_name):
+    df = stats.select(player_name, "BOWLING", "OPPOSITION_TEAM", ["bowling_strike_rate"], keys=world_cup_oppositions)
+    # with nothing to draw the chart stays empty, without a colour scale for no values
+    if df.empty:
+        df = df.astype({"bowling_strike_rate": object})
+
     player_title = player_name.replace('_', ' ').title()
-    fig = px.bar(df, x="Opposition", y="Bowling Strike Rate", color="Bowling Strike Rate", title=f"{player_title}'s Bowling Strike Rate Against Individual Teams")
+    fig = px.bar(df, x="key", y="bowling_strike_rate", color="bowling_strike_rate", labels={"key": "Opposition", "bowling_strike_rate": "Bowling Strike Rate"}, title=f"{player_title}'s Bowling Strike Rate Against Individual Teams")
     image_file_path_bowling_strike_rate_against_individual_teams = os.path.join(output_directory, f"{player_name}_bowling_strike_rate_against_individual_teams.png")
-    fig.write_image(image_file_path_bowling_strike_rate_against_individual_teams)
-
-output_directory_strike_rates = os.path.abspath("./Overall_Player_Stats/Batting_Stats/Batting_Strike_Rates")
-output_directory_averages = os.path.abspath("./Overall_Player_Stats/Batting_Stats/Batting_Averages")
-output_directory_runs = os.path.abspath("./Overall_Player_Stats/Batting_Stats/Runs_Scored")
-output_directory_fifties_vs_hundreds = os.path.abspath("./Overall_Player_Stats/Batting_Stats/Fifties_vs_Hundreds")
-output_directory_not_out_percentages = os.path.abspath("./Overall_Player_Stats/Batting_Stats/Not_Out_Percentages")
-output_directory_generate_runs_scored_vs_batting_position = os.path.abspath("./Overall_Player_Stats/Batting_Stats/Runs_Scored_vs_Batting_Position")
-output_directory_generate_batting_strike_rate_vs_batting_position = os.path.abspath("./Overall_Player_Stats/Batting_Stats/Batting_Strike_Rate_vs_Batting_Position")
-output_directory_wickets_taken = os.path.abspath("./Overall_Player_Stats/Bowling_Stats/Wickets_Taken")
-output_directory_average_economy = os.path.abspath("./Overall_Player_Stats/Bowling_Stats/Average_Economy")
-output_directory_maiden_overs = os.path.abspath("./Overall_Player_Stats/Bowling_Stats/Maiden_Overs")
-output_directory_bowling_strike_rate = os.path.abspath("./Overall_Player_Stats/Bowling_Stats/Bowling_Strike_Rate")
-output_directory_overs_bowled = os.path.abspath("./Overall_Player_Stats/Bowling_Stats/Overs_Bowled")
-output_directory_runs_scored_against_individual_teams = os.path.abspath("./Vs_Other_Teams/Runs_Scored_Against_Individual_Teams")
-output_directory_batting_strike_rate_against_individual_teams = os.path.abspath("./Vs_Other_Teams/Batting_Strike_Rate_Against_Individual_Teams")
-output_directory_not_out_percentages_againt_individual_teams = os.path.abspath("./Vs_Other_Teams/Not_Out_Percentages_Against_Individual_Teams")
-output_directory_wickets_taken_against_individual_teams = os.path.abspath("./Vs_Other_Teams/Wickets_Taken_Against_Individual_Teams")
-output_directory_average_economy_against_individual_teams = os.path.abspath("./Vs_Other_Teams/Average_Economy_Against_Individual_Teams")
-output_directory_bowling_strike_rate_against_individual_teams = os.path.abspath("./Vs_Other_Teams/Bowling_Strike_Rate_Against_Individual_Teams")
-
-os.makedirs(output_directory_strike_rates, exist_ok=True)
-os.makedirs(output_directory_averages, exist_ok=True)
-os.makedirs(output_directory_runs, exist_ok=True)
-os.makedirs(output_directory_fifties_vs_hundreds, exist_ok=True)
-os.makedirs(output_directory_not_out_percentages, exist_ok=True)
-os.makedirs(output_directory_generate_runs_scored_vs_batting_position, exist_ok=True)
-os.makedirs(output_directory_generate_batting_strike_rate_vs_batting_position, exist_ok=True)
-os.makedirs(output_directory_wickets_taken, exist_ok=True)
-os.makedirs(output_directory_average_economy, exist_ok=True)
-os.makedirs(output_directory_maiden_overs, exist_ok=True)
-os.makedirs(output_directory_bowling_strike_rate, exist_ok=True)
-os.makedirs(output_directory_overs_bowled, exist_ok=True)
-os.makedirs(output_directory_runs_scored_against_individual_teams, exist_ok=True)
-os.makedirs(output_directory_batting_strike_rate_against_individual_teams, exist_ok=True)
-os.makedirs(output_directory_not_out_percentages_againt_individual_teams, exist_ok=True)
-os.makedirs(output_directory_wickets_taken_against_individual_teams, exist_ok=True)
-os.makedirs(output_directory_average_economy_against_individual_teams, exist_ok=True)
-os.makedirs(output_directory_bowling_strike_rate_against_individual_teams, exist_ok=True)
-
-json_file_path = os.path.abspath("../../data/players.json")
-
-with open(json_file_path, 'r') as json_file:
-    player_data = json.load(json_file)
-
-players = [player_name.replace(" ", "_").lower() for player_name in player_data.keys()]
-
-for player_name in players:
-    parent_directory = os.path.join("..", "..")
-    json_file_path = os.path.join(parent_directory, "data/players", f"{player_name}.json")
-
-    with open(json_file_path, "r") as json_file:
-        data = json.load(json_file)
-
-    generate_not_out_percentages_graph(data, output_directory_not_out_percentages, player_name)
-    generate_batting_strike_rate_graph(data, output_directory_strike_rates, player_name)
-    generate_batting_average_graph(data, output_directory_averages, player_name)
-    generate_runs_scored_graph(data, output_directory_runs, player_name)
-    generate_fifties_vs_hundreds_graph(data, output_directory_fifties_vs_hundreds, player_name)
-    generate_runs_scored_vs_batting_position_graph(data, output_directory_generate_runs_scored_vs_batting_position, player_name)
-    generate_batting_strike_rate_vs_batting_position_graph(data, output_directory_generate_batting_strike_rate_vs_batting_position, player_name)
-    generate_wickets_taken_graph(data, output_directory_wickets_taken, player_name)
-    generate_average_economy_graph(data, output_directory_average_economy, player_name)
-    generate_maiden_overs_graph(data, output_directory_maiden_overs, player_name)
-    generate_bowling_strike_rate_graph(data, output_directory_bowling_strike_rate, player_name)
-    generate_overs_bowled_graph(data, output_directory_overs_bowled, player_name)
-    generate_runs_scored_against_individual_teams_graph(data, output_directory_runs_scored_against_individual_teams, player_name)
-    generate_batting_strike_rate_against_individual_teams_graph(data, output_directory_batting_strike_rate_against_individual_teams, player_name)
-    generate_not_out_percentages_against_individual_team_graph(data, output_directory_not_out_percentages_againt_individual_teams, player_name)
-    generate_wickets_taken_against_individual_teams_graph(data, output_directory_wickets_taken_against_individual_teams, player_name)
-    generate_average_economy_against_individual_teams_graph(data, output_directory_average_economy_against_individual_teams, player_name)
-    generate_bowling_strike_rate_against_individual_teams_graph(data, output_directory_bowling_strike_rate_against_individual_teams, player_name)
-
-print("Graphs saved in their respective folders.")
\ No newline at end of file
+    return fig, image_file_path_bowling_strike_rate_against_individual_teams
+
+# chart name -> (generator, output directory, parts of the player file it reads), in the
+# order the charts are rendered
+charts = {
+    "not_out_percentages": (generate_not_out_percentages_graph, "./Overall_Player_Stats/Batting_Stats/Not_Out_Percentages", [("odi_matches",)]),
+    "batting_strike_rate": (generate_batting_strike_rate_graph, "./Overall_Player_Stats/Batting_Stats/Batting_Strike_Rates", [("BATTING", "YEAR")]),
+    "batting_average": (generate_batting_average_graph, "./Overall_Player_Stats/Batting_Stats/Batting_Averages", [("BATTING", "YEAR")]),
+    "runs_scored": (generate_runs_scored_graph, "./Overall_Player_Stats/Batting_Stats/Runs_Scored", [("BATTING", "YEAR")]),
+    "fifties_vs_hundreds": (generate_fifties_vs_hundreds_graph, "./Overall_Player_Stats/Batting_Stats/Fifties_vs_Hundreds", [("BATTING", "YEAR")]),
+    "runs_scored_vs_batting_position": (generate_runs_scored_vs_batting_position_graph, "./Overall_Player_Stats/Batting_Stats/Runs_Scored_vs_Batting_Position", [("BATTING", "BATTING_POSITION")]),
+    "batting_strike_rate_vs_batting_position": (generate_batting_strike_rate_vs_batting_position_graph, "./Overall_Player_Stats/Batting_Stats/Batting_Strike_Rate_vs_Batting_Position", [("BATTING", "BATTING_POSITION")]),
+    "wickets_taken": (generate_wickets_taken_graph, "./Overall_Player_Stats/Bowling_Stats/Wickets_Taken", [("BOWLING", "YEAR")]),
+    "average_economy": (generate_average_economy_graph, "./Overall_Player_Stats/Bowling_Stats/Average_Economy", [("BOWLING", "YEAR")]),
+    "maiden_overs": (generate_maiden_overs_graph, "./Overall_Player_Stats/Bowling_Stats/Maiden_Overs", [("BOWLING", "YEAR")]),
+    "bowling_strike_rate": (generate_bowling_strike_rate_graph, "./Overall_Player_Stats/Bowling_Stats/Bowling_Strike_Rate", [("BOWLING", "YEAR")]),
+    "overs_bowled": (generate_overs_bowled_graph, "./Overall_Player_Stats/Bowling_Stats/Overs_Bowled", [("BOWLING", "YEAR")]),
+    "runs_scored_against_individual_teams": (generate_runs_scored_against_individual_teams_graph, "./Vs_Other_Teams/Runs_Scored_Against_Individual_Teams", [("BATTING", "OPPOSITION_TEAM")]),
+    "batting_strike_rate_against_individual_teams": (generate_batting_strike_rate_against_individual_teams_graph, "./Vs_Other_Teams/Batting_Strike_Rate_Against_Individual_Teams", [("BATTING", "OPPOSITION_TEAM")]),
+    "not_out_percentages_against_individual_teams": (generate_not_out_percentages_against_individual_team_graph, "./Vs_Other_Teams/Not_Out_Percentages_Against_Individual_Teams", [("BATTING", "OPPOSITION_TEAM")]),
+    "wickets_taken_against_individual_teams": (generate_wickets_taken_against_individual_teams_graph, "./Vs_Other_Teams/Wickets_Taken_Against_Individual_Teams", [("BOWLING", "OPPOSITION_TEAM")]),
+    "average_economy_against_individual_teams": (generate_average_economy_against_individual_teams_graph, "./Vs_Other_Teams/Average_Economy_Against_Individual_Teams", [("BOWLING", "OPPOSITION_TEAM")]),
+    "bowling_strike_rate_against_individual_teams": (generate_bowling_strike_rate_against_individual_teams_graph, "./Vs_Other_Teams/Bowling_Strike_Rate_Against_Individual_Teams", [("BOWLING", "OPPOSITION_TEAM")]),
+}
+
+# the stats of every player being rendered, built once per run and handed to each worker
+# process when it starts
+roster_stats = None
+
+def set_roster_stats(stats):
+    global roster_stats
+    roster_stats = stats
+
+def build_chart(player_name, chart_name, output_root):
+    generate_graph, output_directory, _ = charts[chart_name]
+    return generate_graph(roster_stats, os.path.join(output_root, output_directory), player_name)
+
+# renders one chart for one player as a png or a json figure spec, or hands the figure back
+# for batch export or bundling; returns the error instead of raising so one bad player or
+# chart does not stop the rest
+def render_chart(player_name, chart_name, output_root, batch_export=False, output_format="png"):
+    try:
+        fig, image_file_path = build_chart(player_name, chart_name, output_root)
+        if output_format == "bundle":
+            return player_name, chart_name, get_bundle_path(output_root, player_name), get_figure_spec(fig), None
+        if output_format == "json":
+            image_file_path = get_spec_path(image_file_path)
+            write_json(image_file_path, get_figure_spec(fig))
+        elif batch_export:
+            return player_name, chart_name, image_file_path, fig.to_dict(), None
+        else:
+            fig.write_image(image_file_path)
+    except Exception:
+        return player_name, chart_name, None, None, traceback.format_exc()
+    return player_name, chart_name, image_file_path, None, None
+
+# the output format is part of the definition, so switching it rebuilds everything
+def get_chart_definition_hashes(output_format="png"):
+    import plotly
+    return {
+        chart_name: get_definition_hash(generate_graph, output_directory, stats_model, importlib.import_module("stats_frame"), plotly.__version__, output_format)
+        for chart_name, (generate_graph, output_directory, _) in charts.items()
+    }
+
+# the (player, chart) tasks whose image was not built from the same inputs and chart
+# definition, with the hashes to record for them once rebuilt
+def get_stale_tasks(player_data, chart_names, manifest, output_format="png"):
+    definition_hashes = get_chart_definition_hashes(output_format)
+    stale_tasks = []
+    hashes = {}
+    for player_name, data in player_data.items():
+        for chart_name in chart_names:
+            input_hash = get_input_hash(data, player_name, charts[chart_name][2])
+            definition_hash = definition_hashes[chart_name]
+            if not manifest.is_up_to_date(player_name, chart_name, input_hash, definition_hash):
+                stale_tasks.append((player_name, chart_name))
+                hashes[(player_name, chart_name)] = (input_hash, definition_hash)
+    return stale_tasks, hashes
+
+def render_all(players, data_directory, output_root=GRAPH_DIRECTORY, chart_names=None, workers=1, exporter=None, manifest=None, dataset_directory=None, output_format="png"):
+    chart_names = list(charts) if chart_names is None else chart_names
+    tasks = [(player_name, chart_name) for player_name in players for chart_name in chart_names]
+    player_data = None
+    hashes = None
+    if manifest is not None:
+        # input hashes are taken over the player files, so they are read either way
+        player_data = stats_frame.load_player_data(players, data_directory)
+        tasks, hashes = get_stale_tasks(player_data, chart_names, manifest, output_format)
+    # only players with something to render need to be in the frame
+    task_players = {player_name for player_name, _ in tasks}
+    stale_players = [player_name for player_name in players if player_name in task_players]
+    if dataset_directory is not None:
+        stats = stats_frame.read_stats_frame(stale_players, dataset_directory)
+    else:
+        if player_data is None:
+            player_data = stats_frame.load_player_data(stale_players, data_directory)
+        stats = stats_frame.build_stats_frame({player_name: player_data[player_name] for player_name in stale_players})
+    batch_export = exporter is not None
+    if workers <= 1:
+        set_roster_stats(stats)
+        results = (render_chart(player_name, chart_name, output_root, batch_export, output_format) for player_name, chart_name in tasks)
+        return collect_results(results, exporter, manifest, hashes)
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=set_roster_stats, initargs=(stats,)) as executor:
+        futures = [executor.submit(render_chart, player_name, chart_name, output_root, batch_export, output_format) for player_name, chart_name in tasks]
+        return collect_results((future.result() for future in as_completed(futures)), exporter, manifest, hashes)
+
+def collect_results(results, exporter, manifest=None, hashes=None):
+    errors = []
+    rendered = 0
+    # bundle path -> chart name -> figure spec, written once every chart is in
+    bundles = defaultdict(dict)
+    for player_name, chart_name, image_file_path, figure, error in results:
+        if error is not None:
+            errors.append((player_name, chart_name, error))
+            continue
+        if figure is not None and exporter is None:
+            bundles[image_file_path][chart_name] = figure
+        elif exporter is not None:
+            exporter.add(figure, image_file_path)
+        if manifest is not None:
+            manifest.record(player_name, chart_name, image_file_path, *hashes[(player_name, chart_name)])
+        rendered += 1
+    if exporter is not None:
+        exporter.flush()
+    for bundle_path, specs in bundles.items():
+        write_bundle(bundle_path, specs)
+    return rendered, errors
+
+def get_player_file_name(player_name):
+    return player_name.replace(" ", "_").lower()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate player stat graphs.")
+    parser.add_argument("--players", nargs="+", help="players to render, by name (\"Virat Kohli\") or file name (virat_kohli), defaults to everyone in players.json")
+    parser.add_argument("--charts", nargs="+", choices=list(charts), help="charts to render, defaults to all of them")
+    parser.add_argument("--data-dir", default=DATA_DIRECTORY, help="directory holding players.json and players/")
+    parser.add_argument("--output-dir", default=GRAPH_DIRECTORY, help="directory the chart folders are written under")
+    parser.add_argument("--dataset-dir", help="read stats from the parquet dataset exported by scraper/dataset.py instead of the player files")
+    parser.add_argument("--format", choices=OUTPUT_FORMATS, default="png", help=f"png images, a json figure spec next to where each image would go, or one json bundle per player in {FIGURE_DIRECTORY} for the dashboard to draw")
+    parser.add_argument("--workers", type=int, default=1, help="number of processes rendering charts in parallel")
+    parser.add_argument("--batch-export", action="store_true", help="export all figures through one long-lived renderer, in batches of --batch-size with kaleido 1.x and one at a time with kaleido 0.2")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--incremental", action="store_true", help=f"only rebuild images whose inputs or chart changed since the last run, tracked in {MANIFEST_FILE}")
+    args = parser.parse_args(argv)
+    # player files are decoded, and the parquet dataset read, with the scraper's modules
+    sys.path.append(SCRAPER_DIRECTORY)
+
+    with open(os.path.join(args.data_dir, "players.json"), 'r') as json_file:
+        player_data = json.load(json_file)
+    roster = [get_player_file_name(player_name) for player_name in player_data.keys()]
+    players = roster if args.players is None else [get_player_file_name(player_name) for player_name in args.players]
+    unknown_players = [player_name for player_name in players if player_name not in roster]
+    if unknown_players:
+        parser.error(f"players not in players.json: {', '.join(unknown_players)}")
+    if args.batch_export and args.format != "png":
+        parser.error("--batch-export only applies to --format png")
+    chart_names = list(charts) if args.charts is None else args.charts
+
+    if args.format != "bundle":
+        for chart_name in chart_names:
+            os.makedirs(os.path.join(args.output_dir, charts[chart_name][1]), exist_ok=True)
+    if args.format != "png":
+        os.makedirs(os.path.join(args.output_dir, FIGURE_DIRECTORY), exist_ok=True)
+        write_template(args.output_dir)
+
+    exporter = BatchExporter(args.batch_size) if args.batch_export else None
+    manifest = BuildManifest(os.path.join(args.output_dir, MANIFEST_FILE)) if args.incremental else None
+    rendered, errors = render_all(players, args.data_dir, args.output_dir, chart_names, args.workers, exporter, manifest, args.dataset_dir, args.format)
+    if manifest is not None:
+        for image_file_path in manifest.collect_garbage(roster, charts):
+            print(f"Removed {image_file_path}")
+        manifest.save()
+    for player_name, chart_name, error in errors:
+        print(f"Failed to render {chart_name} for {player_name}:\n{error}")
+    if exporter is not None:
+        print(exporter.report())
+
+    print(f"Graphs saved in their respective folders, {rendered} rendered, {len(errors)} failed.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+import hashlib
+import inspect
+import json
+import os
+
+MANIFEST_FILE = "graph_manifest.json"
+
+
+def hash_json(value):
+    return hashlib.sha256(
+        json.dumps(value, sort_keys=True, separators=(",", ":")).encode()
+    ).hexdigest()
+
+
+# the exact part of a player file a chart reads, e.g. ("BATTING", "YEAR") or ("odi_matches",)
+def get_input_slice(data, chart_input):
+    # data is a schema.PlayerDetails; slices go back to the file's own keys for hashing,
+    # its Number floats as plain floats. msgspec is only imported here, by then the player
+    # files have been decoded with it, so importing graph.py does not pay for it
+    import msgspec
+
+    if chart_input == ("odi_matches",):
+        return msgspec.to_builtins(data.odi_matches, enc_hook=float)
+    discipline, group_type = chart_input
+    for stats_group in data.get_stats_groups(discipline):
+        if stats_group.type == group_type:
+            return msgspec.to_builtins(stats_group.stats, enc_hook=float)
+    return None
+
+
+def get_input_hash(data, player_name, chart_inputs):
+    return hash_json(
+        [player_name]
+        + [get_input_slice(data, chart_input) for chart_input in chart_inputs]
+    )
+
+
+# anything that changes how a chart is drawn: its generator, where it goes, the stats
+# extraction and the plotting library
+def get_definition_hash(generate_graph, output_directory, *dependencies):
+    source = inspect.getsource(generate_graph) + output_directory
+    for dependency in dependencies:
+        source += (
+            inspect.getsource(dependency)
+            if inspect.ismodule(dependency)
+            else str(dependency)
+        )
+    return hashlib.sha256(source.encode()).hexdigest()
+
+
+class BuildManifest:
+    # records, per player and chart, the image written and the hashes it was built from;
+    # image paths are kept relative to the manifest so the output folder can move
+    def __init__(self, path=MANIFEST_FILE):
+        self.path = path
+        self.directory = os.path.dirname(os.path.abspath(path))
+        self.entries = {}
+        # images entries pointed at before record gave them a new one, e.g. after --format changed
+        self.replaced = []
+        if os.path.exists(path):
+            with open(path, "r") as manifest_file:
+                self.entries = json.load(manifest_file)
+
+    def is_up_to_date(self, player_name, chart_name, input_hash, definition_hash):
+        entry = self.entries.get(f"{player_name}/{chart_name}")
+        return (
+            entry is not None
+            and entry["input_hash"] == input_hash
+            and entry["definition_hash"] == definition_hash
+            and os.path.exists(os.path.join(self.directory, entry["image"]))
+        )
+
+    def record(
+        self, player_name, chart_name, image_file_path, input_hash, definition_hash
+    ):
+        key = f"{player_name}/{chart_name}"
+        image = os.path.relpath(image_file_path, self.directory)
+        if key in self.entries and self.entries[key]["image"] != image:
+            self.replaced.append(self.entries[key]["image"])
+        self.entries[key] = {
+            "player": player_name,
+            "chart": chart_name,
+            "image": image,
+            "input_hash": input_hash,
+            "definition_hash": definition_hash,
+        }
+
+    # deletes images of players or charts that no longer exist and images an entry no longer
+    # points at, returns their paths; a file shared with charts that are kept, like a
+    # player's figure bundle, stays
+    def collect_garbage(self, players, chart_names):
+        removed = self.replaced
+        self.replaced = []
+        for key, entry in list(self.entries.items()):
+            if entry["player"] not in players or entry["chart"] not in chart_names:
+                del self.entries[key]
+                removed.append(entry["image"])
+        kept = {entry["image"] for entry in self.entries.values()}
+        removed_paths = []
+        for image in dict.fromkeys(removed):
+            if image in kept:
+                continue
+            image_file_path = os.path.join(self.directory, image)
+            if os.path.exists(image_file_path):
+                os.remove(image_file_path)
+            removed_paths.append(image_file_path)
+        return removed_paths
+
+    def save(self):
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as manifest_file:
+            json.dump(self.entries, manifest_file, indent=4)
+        os.replace(tmp_path, self.path)
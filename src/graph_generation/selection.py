@@ -0,0 +1,330 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+import stats_frame
+
+GRAPH_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+DATA_DIRECTORY = os.path.join(GRAPH_DIRECTORY, "..", "..", "data")
+SCRAPER_DIRECTORY = os.path.join(GRAPH_DIRECTORY, "..", "scraper")
+OPTIMAL_TEAM_FILE = os.path.join(
+    GRAPH_DIRECTORY, "..", "dashboard", "optimal_team.json"
+)
+
+TEAM_SIZE = 11
+OPPOSITIONS = [
+    "Australia",
+    "England",
+    "Pakistan",
+    "New Zealand",
+    "South Africa",
+    "Sri Lanka",
+    "Bangladesh",
+    "West Indies",
+    "Afghanistan",
+]
+# recent form is judged on these years and on groups with at least this many innings
+RECENT_SINCE = 2019
+MIN_INNINGS = 3
+BATTING_METRICS = ["runs", "batting_average", "batting_strike_rate"]
+BOWLING_METRICS = ["wickets_taken", "average_economy", "bowling_strike_rate"]
+
+# role -> the parts of the side a player of that role covers, for every role in data/roles.json
+ROLE_SKILLS = {
+    "opening-batter": {"batter", "top_order"},
+    "top-order-batter": {"batter", "top_order"},
+    "batter": {"batter"},
+    "wicketkeeper-batter": {"batter", "wicketkeeper"},
+    "allrounder": {"batter", "bowler"},
+    "bowling-allrounder": {"bowler"},
+    "bowler": {"bowler", "specialist_bowler"},
+}
+# roles players.json spells differently from roles.json
+ROLE_ALIASES = {"bowling": "bowler"}
+# skill -> (fewest, most) players in the eleven who have it, None for no limit
+TEAM_CONSTRAINTS = {
+    "batter": (6, None),
+    "top_order": (3, None),
+    "wicketkeeper": (1, None),
+    "bowler": (5, None),
+    "specialist_bowler": (3, None),
+}
+SKILLS = list(TEAM_CONSTRAINTS)
+# the order players are listed in a team sheet
+ROLE_ORDER = [
+    "opening-batter",
+    "top-order-batter",
+    "wicketkeeper-batter",
+    "batter",
+    "allrounder",
+    "bowling-allrounder",
+    "bowler",
+]
+
+# how much a score leans on the record against the opposition rather than recent form,
+# and how much batting and bowling count
+DEFAULT_WEIGHTS = {"opposition": 0.5, "batting": 1.0, "bowling": 1.0}
+
+
+def get_player_file_name(player_name):
+    return player_name.replace(" ", "_").lower()
+
+
+def load_roles(data_directory):
+    # the roles a player may have, from roles.json; each one has to be known to the solver
+    with open(os.path.join(data_directory, "roles.json"), "r") as json_file:
+        roles = json.load(json_file)
+    unknown = [role for role in roles if role not in ROLE_SKILLS]
+    if unknown:
+        raise ValueError(
+            f"No team constraints for roles {', '.join(unknown)} in roles.json"
+        )
+    return roles
+
+
+def get_role(role, roles):
+    role = ROLE_ALIASES.get(role, role)
+    if role not in roles:
+        raise ValueError(f"Unknown role {role!r}, expected one of {', '.join(roles)}")
+    return role
+
+
+def get_percentiles(stats, discipline, group_type, metrics):
+    # mean roster percentile over metrics of every row with enough innings, keyed by row
+    summaries = stats.summaries
+    rows = summaries[
+        (summaries["discipline"] == discipline)
+        & (summaries["group_type"] == group_type)
+        & (summaries["innings"] >= MIN_INNINGS)
+    ]
+    ranks = stats_frame.StatsFrame(
+        rows.reset_index(drop=True), stats.matches
+    ).get_roster_ranks(metrics)
+    ranks["percentile"] = ranks[[f"{metric}_percentile" for metric in metrics]].mean(
+        axis=1
+    )
+    return ranks[["player", "key", "percentile"]]
+
+
+def get_components(stats, players):
+    # (oppositions x players x 4) of batting and bowling percentiles against each opposition
+    # and in recent years; a player with no record against a side counts at their recent form
+    components = np.zeros((len(OPPOSITIONS), len(players), 4))
+    index = {player_name: i for i, player_name in enumerate(players)}
+    for d, (discipline, metrics) in enumerate(
+        [("BATTING", BATTING_METRICS), ("BOWLING", BOWLING_METRICS)]
+    ):
+        recent = get_percentiles(stats, discipline, "YEAR", metrics)
+        recent = (
+            recent[recent["key"].astype(int) >= RECENT_SINCE]
+            .groupby("player", observed=True)["percentile"]
+            .mean()
+        )
+        recent_form = np.zeros(len(players))
+        for player_name, percentile in recent.items():
+            recent_form[index[player_name]] = percentile
+
+        opposition = get_percentiles(stats, discipline, "OPPOSITION_TEAM", metrics)
+        for o, opposition_name in enumerate(OPPOSITIONS):
+            record = recent_form.copy()
+            for player_name, percentile in opposition[
+                opposition["key"] == f"vs {opposition_name}"
+            ][["player", "percentile"]].itertuples(index=False):
+                record[index[player_name]] = percentile
+            components[o, :, 2 * d] = record
+            components[o, :, 2 * d + 1] = recent_form
+    return components
+
+
+def get_scores(components, scenarios):
+    # (scenarios x oppositions x players) for a list of weight dicts, all at once
+    weights = np.array(
+        [
+            [
+                scenario["batting"] * scenario["opposition"],
+                scenario["batting"] * (1 - scenario["opposition"]),
+                scenario["bowling"] * scenario["opposition"],
+                scenario["bowling"] * (1 - scenario["opposition"]),
+            ]
+            for scenario in scenarios
+        ]
+    )
+    return np.einsum("opc,sc->sop", components, weights)
+
+
+def get_compositions(limits, total):
+    # every way of taking total players with at most limits[j] from group j, most of the first group first
+    if not limits:
+        return [()] if total == 0 else []
+    return [
+        (taken,) + rest
+        for taken in range(min(limits[0], total), -1, -1)
+        for rest in get_compositions(limits[1:], total - taken)
+    ]
+
+
+def get_role_counts(roles, team_size=TEAM_SIZE, constraints=TEAM_CONSTRAINTS):
+    # the roles in the squad, and (ways x roles) of how many of each role a team can take and
+    # meet every constraint. Players of one role count the same towards the constraints, so
+    # this depends on the squad and not on the scores, and there are only a few hundred ways
+    # whatever the size of the squad
+    role_names = [role for role in ROLE_SKILLS if role in roles]
+    ways = np.array(
+        get_compositions([roles.count(role) for role in role_names], team_size),
+        dtype=int,
+    ).reshape(-1, len(role_names))
+    skills = ways @ np.array(
+        [[int(skill in ROLE_SKILLS[role]) for skill in SKILLS] for role in role_names]
+    )
+    minimums = np.array([constraints[skill][0] or 0 for skill in SKILLS])
+    maximums = np.array(
+        [
+            team_size if constraints[skill][1] is None else constraints[skill][1]
+            for skill in SKILLS
+        ]
+    )
+    return role_names, ways[((skills >= minimums) & (skills <= maximums)).all(axis=1)]
+
+
+def select_team(
+    scores, roles, team_size=TEAM_SIZE, constraints=TEAM_CONSTRAINTS, role_counts=None
+):
+    # the team_size players with the highest total score that meet every constraint, or
+    # None. The best team takes the best few of each role, so each way from get_role_counts
+    # is scored at once from running totals of every role's scores
+    role_names, ways = role_counts or get_role_counts(roles, team_size, constraints)
+    if len(ways) == 0:
+        return None
+    order = np.argsort(-scores, kind="stable").tolist()
+    role_players = [
+        [i for i in order if roles[i] == role][:team_size] for role in role_names
+    ]
+    role_scores = np.zeros((len(role_names), team_size + 1))
+    for j, players in enumerate(role_players):
+        role_scores[j, 1 : len(players) + 1] = np.cumsum(scores[players])
+    best = ways[np.argmax(role_scores[np.arange(len(role_names)), ways].sum(axis=1))]
+    return [
+        i
+        for players, taken in zip(role_players, best.tolist())
+        for i in players[:taken]
+    ]
+
+
+def select_teams(scores, roles):
+    # one team per scenario and opposition, for scores from get_scores; the ways of filling
+    # the side are the same for all of them
+    role_counts = get_role_counts(roles)
+    return [
+        [
+            select_team(opposition_scores, roles, role_counts=role_counts)
+            for opposition_scores in scenario_scores
+        ]
+        for scenario_scores in scores
+    ]
+
+
+def get_team_sheet(team, names, roles, scores):
+    return [
+        names[i]
+        for i in sorted(team, key=lambda i: (ROLE_ORDER.index(roles[i]), -scores[i]))
+    ]
+
+
+def load_roster(data_directory):
+    with open(os.path.join(data_directory, "players.json"), "r") as json_file:
+        player_data = json.load(json_file)
+    known_roles = load_roles(data_directory)
+    names = list(player_data)
+    roles = [get_role(player_data[name]["role"], known_roles) for name in names]
+    return names, roles
+
+
+def get_sweep_scenarios(steps):
+    # a grid over opposition weight and the batting to bowling balance
+    return [
+        {"opposition": opposition, "batting": balance, "bowling": 1 - balance}
+        for opposition in np.linspace(0, 1, steps)
+        for balance in np.linspace(0.2, 0.8, steps)
+    ]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Pick the best eleven against each opposition."
+    )
+    parser.add_argument(
+        "--data-dir",
+        default=DATA_DIRECTORY,
+        help="directory holding players.json and players/",
+    )
+    parser.add_argument(
+        "--dataset-dir",
+        help="read stats from the parquet dataset exported by scraper/dataset.py instead of the player files",
+    )
+    parser.add_argument(
+        "--output",
+        default=OPTIMAL_TEAM_FILE,
+        help="json file the dashboard reads the teams from",
+    )
+    parser.add_argument(
+        "--opposition-weight",
+        type=float,
+        default=DEFAULT_WEIGHTS["opposition"],
+        help="0 picks on recent form only, 1 on the record against the opposition only",
+    )
+    parser.add_argument(
+        "--sweep",
+        type=int,
+        default=0,
+        help="also solve a grid of this many by this many weightings and report the time taken",
+    )
+    args = parser.parse_args()
+    # player files are decoded, and the parquet dataset read, with the scraper's modules
+    sys.path.append(SCRAPER_DIRECTORY)
+
+    names, roles = load_roster(args.data_dir)
+    players = [get_player_file_name(name) for name in names]
+    if args.dataset_dir:
+        stats = stats_frame.read_stats_frame(players, args.dataset_dir)
+    else:
+        stats = stats_frame.load_stats_frame(players, args.data_dir)
+    components = get_components(stats, players)
+
+    weights = dict(DEFAULT_WEIGHTS, opposition=args.opposition_weight)
+    scores = get_scores(components, [weights])[0]
+    teams = {}
+    for opposition_name, opposition_scores in zip(OPPOSITIONS, scores):
+        team = select_team(opposition_scores, roles)
+        if team is None:
+            raise SystemExit(
+                f"No eleven against {opposition_name} meets the role constraints"
+            )
+        teams[opposition_name] = get_team_sheet(team, names, roles, opposition_scores)
+
+    tmp_path = args.output + ".tmp"
+    with open(tmp_path, "w") as json_file:
+        json.dump({"weights": weights, "teams": teams}, json_file, indent=4)
+    os.replace(tmp_path, args.output)
+    print(f"Optimal teams saved in {args.output}")
+
+    if args.sweep:
+        scenarios = get_sweep_scenarios(args.sweep)
+        start = time.perf_counter()
+        sweep_teams = select_teams(get_scores(components, scenarios), roles)
+        elapsed = time.perf_counter() - start
+        solves = len(scenarios) * len(OPPOSITIONS)
+        distinct = len(
+            {
+                tuple(sorted(team))
+                for scenario_teams in sweep_teams
+                for team in scenario_teams
+                if team is not None
+            }
+        )
+        print(
+            f"Solved {solves} teams ({len(scenarios)} weightings x {len(OPPOSITIONS)} oppositions) in {elapsed * 1000:.1f} ms, {distinct} distinct elevens"
+        )
@@ -0,0 +1,290 @@
+import argparse
+import json
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from statistics import NormalDist
+
+import numpy as np
+
+import stats_frame
+from selection import (
+    DATA_DIRECTORY,
+    OPPOSITIONS,
+    OPTIMAL_TEAM_FILE,
+    SCRAPER_DIRECTORY,
+    get_player_file_name,
+)
+
+DEFAULT_INNINGS = 100_000
+# innings are simulated in chunks of this many, each with its own random stream, so results
+# only depend on the seed and not on how many workers there are
+CHUNK_SIZE = 25_000
+CONFIDENCE = 0.95
+# below this many matches against a side, a player's whole record is used instead, scaled
+# by how their per innings numbers against that side compare
+MIN_OPPOSITION_MATCHES = 5
+SCALE_LIMITS = (0.5, 2.0)
+WICKETS_PER_INNINGS = 10
+
+
+def get_scale(stats, player_name, discipline, opposition_name, metric, pool):
+    # per innings metric against the opposition over the pool's per match mean, 1 without
+    # a record to go on
+    rows = stats.select(
+        player_name,
+        discipline,
+        "OPPOSITION_TEAM",
+        [metric, "innings"],
+        keys=[f"vs {opposition_name}"],
+    )
+    if rows.empty or rows["innings"].iloc[0] <= 0 or pool.size == 0 or pool.mean() <= 0:
+        return 1.0
+    return float(
+        np.clip(
+            rows[metric].iloc[0] / rows["innings"].iloc[0] / pool.mean(), *SCALE_LIMITS
+        )
+    )
+
+
+def get_pools(stats, players, opposition_name):
+    # the runs and wickets each player is drawn from against one opposition, as one flat
+    # array per column with offsets, lengths and scales per player
+    pools = {}
+    for column, discipline, metric in [
+        ("runs", "BATTING", "runs"),
+        ("wickets", "BOWLING", "wickets_taken"),
+    ]:
+        values, offsets, lengths, scales = [], [], [], []
+        offset = 0
+        for player_name in players:
+            matches = stats.select_matches(
+                player_name, columns=[column, "opposition"]
+            ).dropna(subset=[column])
+            against = matches[matches["opposition"] == f"v {opposition_name}"][
+                column
+            ].to_numpy()
+            if against.size >= MIN_OPPOSITION_MATCHES:
+                pool, scale = against, 1.0
+            else:
+                pool = matches[column].to_numpy()
+                scale = get_scale(
+                    stats, player_name, discipline, opposition_name, metric, pool
+                )
+            if pool.size == 0:
+                # never batted or bowled, always contributes nothing
+                pool = np.zeros(1)
+            values.append(pool)
+            offsets.append(offset)
+            lengths.append(pool.size)
+            scales.append(scale)
+            offset += pool.size
+        pools[column] = (
+            np.concatenate(values),
+            np.array(offsets),
+            np.array(lengths),
+            np.array(scales),
+        )
+    return pools
+
+
+def draw(pool, rng, innings):
+    # one bootstrapped performance per player per innings, summed over the team
+    values, offsets, lengths, scales = pool
+    picks = offsets + (rng.random((innings, len(offsets))) * lengths).astype(np.int64)
+    return (values[picks] * scales).sum(axis=1)
+
+
+def simulate_chunk(pools, innings, seed):
+    rng = np.random.default_rng(seed)
+    runs = draw(pools["runs"], rng, innings)
+    wickets = np.minimum(draw(pools["wickets"], rng, innings), WICKETS_PER_INNINGS)
+    return runs, wickets
+
+
+def summarize(values, confidence=CONFIDENCE):
+    # mean with a confidence interval for it, and the range confidence of innings fall in
+    tail = (1 - confidence) / 2
+    z = NormalDist().inv_cdf(1 - tail)
+    mean = float(values.mean())
+    std = float(values.std())
+    margin = z * std / np.sqrt(values.size)
+    low, high = np.quantile(values, [tail, 1 - tail])
+    return {
+        "mean": mean,
+        "mean_low": mean - margin,
+        "mean_high": mean + margin,
+        "std": std,
+        "low": float(low),
+        "high": float(high),
+    }
+
+
+def get_opposition_seed(entropy, opposition_name):
+    # keyed by the name, so an opposition's innings are the same for a seed whichever other
+    # oppositions are simulated with it and in whatever order
+    return np.random.SeedSequence(
+        entropy, spawn_key=(int.from_bytes(opposition_name.encode(), "little"),)
+    )
+
+
+def simulate(
+    stats, teams, innings=DEFAULT_INNINGS, seed=None, workers=1, confidence=CONFIDENCE
+):
+    # teams maps opposition name -> the player file names of the eleven; returns expected
+    # team runs and wickets against each
+    entropy = np.random.SeedSequence(seed).entropy
+    tasks = []
+    for opposition_name, players in teams.items():
+        pools = get_pools(stats, players, opposition_name)
+        seeds = iter(
+            get_opposition_seed(entropy, opposition_name).spawn(
+                -(-innings // CHUNK_SIZE)
+            )
+        )
+        for start in range(0, innings, CHUNK_SIZE):
+            tasks.append(
+                (opposition_name, pools, min(CHUNK_SIZE, innings - start), next(seeds))
+            )
+
+    if workers <= 1:
+        chunks = [
+            simulate_chunk(pools, chunk_innings, chunk_seed)
+            for _, pools, chunk_innings, chunk_seed in tasks
+        ]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            chunks = list(
+                executor.map(simulate_chunk, *zip(*[task[1:] for task in tasks]))
+            )
+
+    results = {}
+    for opposition_name in teams:
+        runs = np.concatenate(
+            [
+                chunk[0]
+                for task, chunk in zip(tasks, chunks)
+                if task[0] == opposition_name
+            ]
+        )
+        wickets = np.concatenate(
+            [
+                chunk[1]
+                for task, chunk in zip(tasks, chunks)
+                if task[0] == opposition_name
+            ]
+        )
+        results[opposition_name] = {
+            "runs": summarize(runs, confidence),
+            "wickets": summarize(wickets, confidence),
+        }
+    return results
+
+
+def load_teams(path):
+    with open(path, "r") as json_file:
+        teams = json.load(json_file)["teams"]
+    return {
+        opposition_name: [get_player_file_name(name) for name in names]
+        for opposition_name, names in teams.items()
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Estimate team runs and wickets against each opposition by simulation."
+    )
+    parser.add_argument(
+        "--data-dir",
+        default=DATA_DIRECTORY,
+        help="directory holding players.json and players/",
+    )
+    parser.add_argument(
+        "--dataset-dir",
+        help="read stats from the parquet dataset exported by scraper/dataset.py instead of the player files",
+    )
+    parser.add_argument(
+        "--teams",
+        default=OPTIMAL_TEAM_FILE,
+        help="optimal team json from selection.py, one eleven per opposition",
+    )
+    parser.add_argument(
+        "--players",
+        nargs="+",
+        help="simulate this eleven against every opposition instead",
+    )
+    parser.add_argument(
+        "--oppositions", nargs="+", choices=OPPOSITIONS, help="only these oppositions"
+    )
+    parser.add_argument(
+        "--innings",
+        type=int,
+        default=DEFAULT_INNINGS,
+        help="simulated innings per opposition",
+    )
+    parser.add_argument("--seed", type=int, help="seed for reproducible results")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="number of processes simulating in parallel",
+    )
+    parser.add_argument("--confidence", type=float, default=CONFIDENCE)
+    parser.add_argument("--output", help="write the results as json to this file")
+    args = parser.parse_args()
+    # player files are decoded, and the parquet dataset read, with the scraper's modules
+    sys.path.append(SCRAPER_DIRECTORY)
+
+    if args.players:
+        teams = {
+            opposition_name: [get_player_file_name(name) for name in args.players]
+            for opposition_name in OPPOSITIONS
+        }
+    else:
+        teams = load_teams(args.teams)
+    if args.oppositions:
+        teams = {
+            opposition_name: teams[opposition_name]
+            for opposition_name in args.oppositions
+        }
+
+    players = list(
+        dict.fromkeys(player_name for team in teams.values() for player_name in team)
+    )
+    if args.dataset_dir:
+        stats = stats_frame.read_stats_frame(players, args.dataset_dir)
+    else:
+        stats = stats_frame.load_stats_frame(players, args.data_dir)
+
+    start = time.perf_counter()
+    results = simulate(
+        stats, teams, args.innings, args.seed, args.workers, args.confidence
+    )
+    elapsed = time.perf_counter() - start
+
+    percent = f"{100 * args.confidence:g}%"
+    print(
+        f"{'opposition':<14}{'runs':>8}  {percent + ' of innings':<18}{'wickets':>8}  {percent + ' of innings':<18}"
+    )
+    for opposition_name, result in results.items():
+        runs, wickets = result["runs"], result["wickets"]
+        runs_range = "{low:.0f}-{high:.0f}".format(**runs)
+        wickets_range = "{low:.0f}-{high:.0f}".format(**wickets)
+        print(
+            f"{opposition_name:<14}{runs['mean']:>8.1f}  {runs_range:<18}{wickets['mean']:>8.2f}  {wickets_range:<18}"
+        )
+    print(
+        f"Simulated {args.innings} innings against {len(results)} oppositions in {elapsed:.2f}s"
+    )
+    if args.output:
+        with open(args.output, "w") as json_file:
+            json.dump(
+                {
+                    "innings": args.innings,
+                    "seed": args.seed,
+                    "confidence": args.confidence,
+                    "results": results,
+                },
+                json_file,
+                indent=4,
+            )
@@ -0,0 +1,228 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from stats_model import NUMERIC_KEYS, terminology_mapping
+
+METRICS = [terminology_mapping[key] for key in NUMERIC_KEYS]
+
+DISCIPLINES = ["BATTING", "BOWLING"]
+GROUP_TYPES = ["YEAR", "BATTING_POSITION", "OPPOSITION_TEAM"]
+
+# metrics where the smaller number is the better one, ranked the other way round
+LOWER_IS_BETTER = {"average_economy", "bowling_strike_rate", "ducks"}
+
+
+def load_player_data(players, data_directory):
+    # typed schema.PlayerDetails per player, numeric strings already decoded to numbers
+    # or NaN; a malformed file fails here with its name rather than somewhere in a chart.
+    # The schema is the scraper's, the one the files were written against, so the scraper
+    # directory has to be on sys.path as the command line entry points put it
+    from schema import load_player_details
+
+    player_data = {}
+    for player_name in players:
+        player_data[player_name] = load_player_details(
+            os.path.join(data_directory, "players", f"{player_name}.json")
+        )
+    return player_data
+
+
+def decode_numbers(values):
+    # decoded player files give numbers or None, which convert in one go; the parquet
+    # dataset and older callers may still hand over numeric strings ("264*")
+    try:
+        return np.asarray(values, dtype="float64")
+    except (TypeError, ValueError):
+        strings = pd.Series(values, dtype=object).astype(str).str.rstrip("*")
+        return pd.to_numeric(strings, errors="coerce").to_numpy(dtype="float64")
+
+
+def extract_summary_columns(player_data):
+    # the columns of make_summary_frame, one entry per stats row of every player: who,
+    # which group it came from, its key and every metric, gathered column by column
+    players, disciplines, group_types, labels = [], [], [], []
+    raw_metrics = {key: [] for key in NUMERIC_KEYS}
+    for player_name, data in player_data.items():
+        for discipline in DISCIPLINES:
+            for stats_group in data.get_stats_groups(discipline):
+                if stats_group.type not in GROUP_TYPES:
+                    continue
+                for stat in stats_group.stats:
+                    players.append(player_name)
+                    disciplines.append(discipline)
+                    group_types.append(stats_group.type)
+                    labels.append(stat.tt)
+                    for key, values in raw_metrics.items():
+                        values.append(getattr(stat, key))
+
+    metrics = {
+        terminology_mapping[key]: decode_numbers(values)
+        for key, values in raw_metrics.items()
+    }
+    return list(player_data), players, disciplines, group_types, labels, metrics
+
+
+def build_summary_frame(player_data):
+    return make_summary_frame(*extract_summary_columns(player_data))
+
+
+def make_summary_frame(roster, players, disciplines, group_types, labels, metrics):
+    group_type = pd.Categorical(group_types, categories=GROUP_TYPES)
+    # "year 2019" -> "2019", positions and oppositions are their own keys
+    keys = pd.Series(labels, dtype=object)
+    is_year = np.asarray(group_type == "YEAR")
+    keys[is_year] = keys[is_year].str.split().str[-1]
+
+    frame = pd.DataFrame(
+        {
+            "player": pd.Categorical(players, categories=roster),
+            "discipline": pd.Categorical(disciplines, categories=DISCIPLINES),
+            "group_type": group_type,
+            "key": keys.astype(str),
+        }
+    )
+    for metric, values in metrics.items():
+        frame[metric] = values
+    return frame
+
+
+def extract_match_columns(player_data):
+    # form.MatchHistory of every match of every player, its dates parsed and numbers
+    # decoded array by array, which make_match_frame turns into the match frame
+    import form
+
+    return form.build_match_history(player_data)
+
+
+def build_match_frame(player_data):
+    return make_match_frame(extract_match_columns(player_data))
+
+
+def make_match_frame(history):
+    # rows in the order the matches were read, as the charts list years in the order they
+    # first come; a row without a date has no year to chart it under, so it is left out
+    # rather than failing the whole frame. runs and wickets are NaN when they did not bat
+    # or bowl
+    rows = np.argsort(history.position)
+    rows = rows[~np.isnat(history.date[rows])]
+    return pd.DataFrame(
+        {
+            "player": pd.Categorical.from_codes(
+                history.player[rows], categories=history.players
+            ),
+            "year": history.date[rows].astype("datetime64[Y]").astype("int64") + 1970,
+            "not_out": history.not_out[rows].astype("int64"),
+            "runs": history.runs[rows],
+            "wickets": history.wickets[rows],
+            "opposition": pd.Categorical(
+                np.asarray(history.oppositions, dtype=object)[history.opposition[rows]]
+            ),
+        }
+    )
+
+
+class StatsFrame:
+    # the stats summaries and match records of a whole roster in two long format tables;
+    # every chart and analysis reads a filtered view of them
+    __slots__ = ("summaries", "matches", "summary_rows", "match_rows")
+
+    def __init__(self, summaries, matches):
+        self.summaries = summaries
+        self.matches = matches
+        # row positions of each (player, discipline, group type) and each player's matches,
+        # so a view is one take instead of a scan over the roster
+        self.summary_rows = summaries.groupby(
+            ["player", "discipline", "group_type"], observed=True, sort=False
+        ).indices
+        self.match_rows = matches.groupby("player", observed=True, sort=False).indices
+
+    @property
+    def players(self):
+        return list(self.summaries["player"].cat.categories)
+
+    def select(
+        self,
+        player_name,
+        discipline,
+        group_type,
+        columns,
+        since=None,
+        keys=None,
+        dropna=True,
+    ):
+        # (key, *columns) rows of one stats group, in file order, without rows missing a
+        # column unless dropna is off; YEAR keys come back as ints, since keeps keys >= since
+        # and keys keeps only those keys
+        rows = self.summaries[["key"] + columns].take(
+            self.summary_rows.get((player_name, discipline, group_type), [])
+        )
+        if group_type == "YEAR":
+            rows["key"] = rows["key"].astype("int64")
+        if since is not None:
+            rows = rows[rows["key"] >= since]
+        if keys is not None:
+            rows = rows[rows["key"].isin(keys)]
+        return rows.dropna(subset=columns) if dropna else rows
+
+    def select_matches(self, player_name, since=None, columns=("year", "not_out")):
+        rows = self.matches[list(columns)].take(self.match_rows.get(player_name, []))
+        if since is not None:
+            rows = rows[rows["year"] >= since]
+        return rows
+
+    def get_roster_ranks(self, metrics=METRICS):
+        # rank and percentile of every row against all players' rows with the same
+        # discipline, group type and key, e.g. runs in 2019 or strike rate at no. 4;
+        # rank 1 and percentile 1.0 are the best
+        groups = self.summaries.groupby(
+            ["discipline", "group_type", "key"], observed=True, sort=False
+        )
+        ranks = self.summaries[["player", "discipline", "group_type", "key"]].copy()
+        for metric in metrics:
+            ascending = metric in LOWER_IS_BETTER
+            ranks[f"{metric}_rank"] = groups[metric].rank(
+                method="min", ascending=ascending
+            )
+            ranks[f"{metric}_percentile"] = groups[metric].rank(
+                pct=True, ascending=not ascending
+            )
+        return ranks
+
+
+def build_stats_frame(player_data):
+    return StatsFrame(build_summary_frame(player_data), build_match_frame(player_data))
+
+
+def load_stats_frame(players, data_directory):
+    return build_stats_frame(load_player_data(players, data_directory))
+
+
+def read_stats_frame(players, dataset_directory):
+    # the same frame from the parquet dataset written by scraper/dataset.py, reading only
+    # the columns and players it needs instead of every player file
+    import form
+    from dataset import read_table
+
+    players = list(players)
+    summaries = read_table(
+        "player_summary",
+        columns=["player", "discipline", "group_type", "tt"] + NUMERIC_KEYS,
+        filters=[("player", "in", players), ("group_type", "in", GROUP_TYPES)],
+        dataset_dir=dataset_directory,
+    )
+    return StatsFrame(
+        make_summary_frame(
+            players,
+            summaries["player"].to_numpy(),
+            summaries["discipline"].to_numpy(),
+            summaries["group_type"].to_numpy(),
+            summaries["tt"].to_numpy(zero_copy_only=False),
+            {
+                terminology_mapping[key]: summaries[key].to_numpy(zero_copy_only=False)
+                for key in NUMERIC_KEYS
+            },
+        ),
+        make_match_frame(form.read_match_history(players, dataset_directory)),
+    )
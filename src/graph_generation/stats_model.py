@@ -0,0 +1,39 @@
+# terminolofy mapping for extracting data from json files
+terminology_mapping = {
+    "tt": "type",
+    "sp": "span",
+    "mt": "matches",
+    "in": "innings",
+    "pr": None,
+    "rn": "runs",
+    "fo": "fours",
+    "si": "sixes",
+    "ft": "fifties",
+    "hn": "hundreds",
+    "bf": "balls_faced",
+    "dk": "ducks",
+    "no": "not_outs",
+    "hs": "high_score",
+    "bta": "batting_average",
+    "btsr": "batting_strike_rate",
+    "wk": "wickets_taken",
+    "bwe": "average_economy",
+    "md": "maiden_overs",
+    "bwsr": "bowling_strike_rate",
+    "ov": "overs_bowled",
+}
+
+# keys that are labels rather than numbers
+LABEL_KEYS = {"tt", "sp", "pr"}
+NUMERIC_KEYS = [key for key in terminology_mapping if key not in LABEL_KEYS]
+
+world_cup_oppositions = [
+    "vs Australia",
+    "vs England",
+    "vs Pakistan",
+    "vs New Zealand",
+    "vs Sri Lanka",
+    "vs Bangladesh",
+    "vs West Indies",
+    "vs Afghanistan",
+]
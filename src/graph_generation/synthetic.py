@@ -0,0 +1,396 @@
+import argparse
+import json
+import os
+
+import msgspec
+import numpy as np
+
+from selection import ROLE_ORDER, get_player_file_name
+
+OPPOSITIONS = [
+    "Australia",
+    "England",
+    "Pakistan",
+    "New Zealand",
+    "South Africa",
+    "Sri Lanka",
+    "Bangladesh",
+    "West Indies",
+    "Afghanistan",
+    "Zimbabwe",
+    "Ireland",
+    "Netherlands",
+]
+GROUNDS = [
+    "Wankhede",
+    "Eden Gardens",
+    "Chinnaswamy",
+    "MCG",
+    "SCG",
+    "Lord's",
+    "The Oval",
+    "Gaddafi Stadium",
+    "Dubai",
+    "Hagley Oval",
+    "R Premadasa",
+    "Kensington Oval",
+]
+POSITIONS = [
+    "1st position",
+    "2nd position",
+    "3rd position",
+    "4th position",
+    "5th position",
+    "6th position",
+    "7th position",
+    "8th position",
+    "9th position",
+    "10th position",
+    "11th position",
+]
+MONTHS = [
+    "Jan",
+    "Feb",
+    "Mar",
+    "Apr",
+    "May",
+    "Jun",
+    "Jul",
+    "Aug",
+    "Sep",
+    "Oct",
+    "Nov",
+    "Dec",
+]
+FIRST_YEAR = 2004
+LAST_YEAR = 2023
+MIN_MATCHES = 10
+MAX_MATCHES = 300
+
+# role -> (highest and lowest batting position, mean runs an innings, strike rate, share of
+# innings not out)
+ROLE_BATTING = {
+    "opening-batter": (1, 2, 38, 88, 0.06),
+    "top-order-batter": (3, 4, 40, 85, 0.10),
+    "batter": (4, 6, 33, 86, 0.13),
+    "wicketkeeper-batter": (4, 7, 28, 92, 0.18),
+    "allrounder": (5, 7, 25, 95, 0.20),
+    "bowling-allrounder": (7, 9, 15, 85, 0.25),
+    "bowler": (8, 11, 6, 65, 0.35),
+}
+# role -> (share of matches bowled in, economy, chance of a wicket a ball)
+ROLE_BOWLING = {
+    "opening-batter": (0.02, 6.5, 0.010),
+    "top-order-batter": (0.05, 6.2, 0.012),
+    "batter": (0.10, 6.0, 0.015),
+    "wicketkeeper-batter": (0.0, 0.0, 0.0),
+    "allrounder": (0.80, 5.6, 0.020),
+    "bowling-allrounder": (0.95, 5.2, 0.024),
+    "bowler": (0.98, 5.1, 0.028),
+}
+# share of innings a side's batters at each position get to bat
+BATTING_CHANCE = np.array(
+    [0.99, 0.98, 0.96, 0.93, 0.88, 0.82, 0.74, 0.64, 0.55, 0.46, 0.40]
+)
+
+
+def draw_matches(role, rng):
+    # one career of match by match figures as arrays, in date order
+    count = int(rng.integers(MIN_MATCHES, MAX_MATCHES + 1))
+    debut = np.datetime64(f"{rng.integers(FIRST_YEAR, LAST_YEAR - 1)}-01-01")
+    days = np.sort(
+        rng.integers(
+            0, (np.datetime64(f"{LAST_YEAR}-12-31") - debut).astype(int), size=count
+        )
+    )
+    highest, lowest, mean_runs, strike_rate, not_out_rate = ROLE_BATTING[role]
+    bowl_rate, economy, wicket_rate = ROLE_BOWLING[role]
+
+    matches = {"date": debut + days.astype("timedelta64[D]")}
+    matches["year"] = matches["date"].astype("datetime64[Y]").astype(int) + 1970
+    matches["opposition"] = rng.integers(len(OPPOSITIONS), size=count)
+    matches["ground"] = rng.integers(len(GROUNDS), size=count)
+    matches["position"] = rng.integers(highest, lowest + 1, size=count)
+    batted = rng.random(count) < BATTING_CHANCE[matches["position"] - 1]
+    # runs are heavy tailed, mostly small scores and the odd hundred
+    runs = np.where(
+        batted, rng.negative_binomial(1, 1 / (1 + mean_runs), size=count), 0
+    )
+    balls = np.where(
+        batted,
+        np.maximum(
+            1,
+            np.round(runs * 100 / np.clip(rng.normal(strike_rate, 15, count), 30, 250)),
+        ),
+        0,
+    ).astype(int)
+    fours = rng.binomial(runs // 4, 0.4)
+    matches.update(
+        batted=batted,
+        runs=runs,
+        balls_faced=balls,
+        fours=fours,
+        sixes=rng.binomial((runs - 4 * fours) // 6, 0.2),
+    )
+    matches["not_out"] = batted & (rng.random(count) < not_out_rate)
+    # a side that did not bat at all is "TDNB", a player who did not is "DNB"
+    matches["team_did_not_bat"] = ~batted & (rng.random(count) < 0.05)
+
+    bowled = rng.random(count) < bowl_rate
+    balls_bowled = np.where(bowled, rng.integers(6, 61, size=count), 0)
+    matches.update(bowled=bowled, balls_bowled=balls_bowled)
+    matches["runs_conceded"] = rng.poisson(balls_bowled / 6 * economy)
+    matches["wickets"] = rng.binomial(balls_bowled, wicket_rate)
+    matches["maidens"] = rng.binomial(balls_bowled // 6, 0.06)
+    keeper = role == "wicketkeeper-batter"
+    matches["catches"] = rng.poisson(1.1 if keeper else 0.35, size=count)
+    matches["stumpings"] = (
+        rng.poisson(0.12, size=count) if keeper else np.zeros(count, dtype=int)
+    )
+    return matches
+
+
+def get_group_codes(matches, group_type):
+    # a code per match for the group it falls in, and the group labels as espncricinfo
+    # spells them
+    if group_type == "YEAR":
+        return matches["year"] - FIRST_YEAR, [
+            f"year {year}" for year in range(FIRST_YEAR, LAST_YEAR + 1)
+        ]
+    if group_type == "BATTING_POSITION":
+        return matches["position"] - 1, POSITIONS
+    return matches["opposition"], [f"vs {opposition}" for opposition in OPPOSITIONS]
+
+
+def get_spans(matches, codes, groups):
+    first = np.full(groups, LAST_YEAR)
+    last = np.full(groups, FIRST_YEAR)
+    np.minimum.at(first, codes, matches["year"])
+    np.maximum.at(last, codes, matches["year"])
+    return [f"{start}-{end}" for start, end in zip(first.tolist(), last.tolist())]
+
+
+def sum_by_group(codes, groups, where, values=None):
+    # totals of values, or counts without them, over the matches in where, by group
+    return (
+        np.bincount(
+            codes[where], None if values is None else values[where], minlength=groups
+        )
+        .astype(int)
+        .tolist()
+    )
+
+
+def divide(numerator, denominator, scale=1):
+    return round(numerator * scale / denominator, 2) if denominator else None
+
+
+def get_batting_stats(matches, group_type):
+    # per group totals by bincount over the group codes, then one stats row per group
+    # the player appeared in
+    codes, labels = get_group_codes(matches, group_type)
+    groups = len(labels)
+    batted = matches["batted"]
+    played = sum_by_group(codes, groups, np.ones(len(codes), dtype=bool))
+    innings = sum_by_group(codes, groups, batted)
+    runs, balls, fours, sixes = [
+        sum_by_group(codes, groups, batted, matches[name])
+        for name in ["runs", "balls_faced", "fours", "sixes"]
+    ]
+    not_outs = sum_by_group(codes, groups, matches["not_out"])
+    fifties = sum_by_group(
+        codes, groups, batted & (matches["runs"] >= 50) & (matches["runs"] < 100)
+    )
+    hundreds = sum_by_group(codes, groups, batted & (matches["runs"] >= 100))
+    ducks = sum_by_group(
+        codes, groups, batted & (matches["runs"] == 0) & ~matches["not_out"]
+    )
+    # the best score of a group wins ties by being not out
+    best = np.full(groups, -1)
+    np.maximum.at(
+        best, codes[batted], 2 * matches["runs"][batted] + matches["not_out"][batted]
+    )
+    spans = get_spans(matches, codes, groups)
+
+    stats = []
+    for code, label in enumerate(labels):
+        if not played[code]:
+            continue
+        high_score = None if best[code] < 0 else int(best[code] // 2)
+        stats.append(
+            {
+                "tt": label,
+                "sp": spans[code],
+                "mt": played[code],
+                "in": innings[code],
+                "pr": None,
+                "rn": runs[code],
+                "fo": fours[code],
+                "si": sixes[code],
+                "ft": fifties[code],
+                "hn": hundreds[code],
+                "bf": balls[code],
+                "dk": ducks[code],
+                "no": not_outs[code],
+                "hs": f"{high_score}*" if best[code] % 2 == 1 else high_score,
+                "bta": divide(runs[code], innings[code] - not_outs[code]),
+                "btsr": divide(runs[code], balls[code], 100),
+            }
+        )
+    return {"type": group_type, "stats": stats}
+
+
+def get_bowling_stats(matches, group_type):
+    codes, labels = get_group_codes(matches, group_type)
+    groups = len(labels)
+    bowled = matches["bowled"]
+    played = sum_by_group(codes, groups, np.ones(len(codes), dtype=bool))
+    innings = sum_by_group(codes, groups, bowled)
+    balls, conceded, wickets, maidens = [
+        sum_by_group(codes, groups, bowled, matches[name])
+        for name in ["balls_bowled", "runs_conceded", "wickets", "maidens"]
+    ]
+    spans = get_spans(matches, codes, groups)
+
+    stats = []
+    for code, label in enumerate(labels):
+        if not played[code]:
+            continue
+        stats.append(
+            {
+                "tt": label,
+                "sp": spans[code],
+                "mt": played[code],
+                "in": innings[code],
+                "pr": None,
+                # overs as cricket writes them, 54.3 for 54 overs and 3 balls
+                "ov": balls[code] // 6 + balls[code] % 6 / 10,
+                "md": maidens[code],
+                "rn": conceded[code],
+                "wk": wickets[code],
+                "bwe": divide(conceded[code], balls[code], 6),
+                "bwsr": divide(balls[code], wickets[code]),
+            }
+        )
+    return {"type": group_type, "stats": stats}
+
+
+def get_match_records(matches, first_match_id):
+    # the match by match list as the scraper saves it, every figure a string
+    records = []
+    dates = np.datetime_as_string(matches["date"]).tolist()
+    columns = {
+        name: values.tolist() for name, values in matches.items() if name != "date"
+    }
+    for index, date in enumerate(dates):
+        year, month, day = date.split("-")
+        if columns["batted"][index]:
+            runs = str(columns["runs"][index])
+        else:
+            runs = "TDNB" if columns["team_did_not_bat"][index] else "DNB"
+        bowled = columns["bowled"][index]
+        records.append(
+            {
+                "runs": runs,
+                "not_out": columns["not_out"][index],
+                "wickets": str(columns["wickets"][index]) if bowled else "-",
+                "runs_conceded": (
+                    str(columns["runs_conceded"][index]) if bowled else "-"
+                ),
+                "catches_taken": str(columns["catches"][index]),
+                "stumpings_made": str(columns["stumpings"][index]),
+                "opposition": f"v {OPPOSITIONS[columns['opposition'][index]]}",
+                "ground": GROUNDS[columns["ground"][index]],
+                "date": f"{int(day)} {MONTHS[int(month) - 1]} {year}",
+                "match_id": str(first_match_id + index),
+            }
+        )
+    return records
+
+
+def generate_player(player_name, player_id, role, rng):
+    # a player file shaped like one saved by scraper/player.py
+    matches = draw_matches(role, rng)
+    return {
+        "player_id": player_id,
+        "player": player_name,
+        "odi_matches": get_match_records(matches, player_id * 1000),
+        "BATTING": {
+            "summary": {
+                "groups": [
+                    get_batting_stats(matches, group_type)
+                    for group_type in ["YEAR", "BATTING_POSITION", "OPPOSITION_TEAM"]
+                ]
+            }
+        },
+        "BOWLING": {
+            "summary": {
+                "groups": [
+                    get_bowling_stats(matches, group_type)
+                    for group_type in ["YEAR", "OPPOSITION_TEAM"]
+                ]
+            }
+        },
+        "FIELDING": {"summary": {"groups": []}},
+        "ALLROUND": {"summary": {"groups": []}},
+    }
+
+
+def get_player_name(index):
+    return f"Synthetic Player {index + 1:05d}"
+
+
+def write_roster(output_directory, players, seed=0):
+    # players.json, roles.json and players/<file name>.json for a made-up roster; every player has their
+    # own seed, so a smaller roster is the start of a bigger one with the same seed
+    os.makedirs(os.path.join(output_directory, "players"), exist_ok=True)
+    roster = {}
+    for index, player_seed in enumerate(np.random.SeedSequence(seed).spawn(players)):
+        rng = np.random.default_rng(player_seed)
+        player_name = get_player_name(index)
+        player_id = index + 1
+        role = ROLE_ORDER[int(rng.integers(len(ROLE_ORDER)))]
+        slug = player_name.lower().replace(" ", "-")
+        roster[player_name] = {
+            "player_id": player_id,
+            "profile": f"https://www.espncricinfo.com/cricketers/{slug}-{player_id}",
+            "statistics": f"https://www.espncricinfo.com/cricketers/{slug}-{player_id}/bowling-batting-stats",
+            "odi_matches": f"https://stats.espncricinfo.com/ci/engine/player/{player_id}.html?class=2;template=results;type=allround;view=match",
+            "role": role,
+        }
+        # msgspec encodes and indents in C, json.dump with an indent falls back to python
+        content = msgspec.json.format(
+            msgspec.json.encode(generate_player(player_name, player_id, role, rng)),
+            indent=4,
+        )
+        with open(
+            os.path.join(
+                output_directory, "players", f"{get_player_file_name(player_name)}.json"
+            ),
+            "wb",
+        ) as json_file:
+            json_file.write(content)
+    with open(os.path.join(output_directory, "players.json"), "w") as json_file:
+        json.dump(roster, json_file, indent=4)
+    with open(os.path.join(output_directory, "roles.json"), "w") as json_file:
+        json.dump(ROLE_ORDER, json_file, indent=4)
+    return [get_player_file_name(player_name) for player_name in roster]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Write a made-up roster of player files for benchmarks."
+    )
+    parser.add_argument(
+        "--players", type=int, default=100, help="number of players in the roster"
+    )
+    parser.add_argument(
+        "--output-dir",
+        required=True,
+        help="directory to write players.json and players/ into",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    write_roster(args.output_dir, args.players, args.seed)
+    print(f"Wrote {args.players} players to {args.output_dir}")
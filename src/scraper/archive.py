@@ -0,0 +1,363 @@
+import argparse
+import json
+import mmap
+import os
+
+import numpy as np
+
+from dataset import (
+    MATCH_DETAIL_PARTS,
+    ODI_MATCHES_DIR,
+    PLAYER_DATA_DIR,
+    get_match_details_row,
+    get_match_rows,
+    iter_odi_matches_paths,
+    to_string,
+)
+from match import load_odi_match_details
+from match_store import MATCH_STORE_DIR
+from schema import load_player_details
+
+ARCHIVE_PATH = "./data/matches.archive"
+MAGIC = b"CWCARCH1"
+VERSION = 1
+# sections start on this boundary so every array view is aligned
+ALIGNMENT = 64
+
+# strings are codes into the archive's string table, 0 is the empty string; numbers a
+# payload does not have are -1
+INNINGS_DTYPE = np.dtype(
+    [
+        ("batting_team_id", "<i4"),
+        ("runs", "<i4"),
+        ("wickets", "<i2"),
+        ("overs", "<f4"),
+    ]
+)
+MATCH_DTYPE = np.dtype(
+    [
+        ("match_id", "<i8"),
+        ("date", "<M8[D]"),
+        ("ground_name", "<u4"),
+        ("town_name", "<u4"),
+        ("country_name", "<u4"),
+        ("team1_id", "<i4"),
+        ("team1_name", "<u4"),
+        ("team2_id", "<i4"),
+        ("team2_name", "<u4"),
+        ("toss_winner_team_id", "<i4"),
+        ("toss_decision_name", "<u4"),
+        ("winner_team_id", "<i4"),
+        ("result_name", "<u4"),
+        ("match_status", "<u4"),
+        ("innings", INNINGS_DTYPE, (2,)),
+    ]
+)
+# a player's part in a match, from their match list in data/players
+PLAYER_INNINGS_DTYPE = np.dtype(
+    [
+        ("player", "<u4"),
+        ("match", "<u4"),
+        ("runs", "<i4"),
+        ("not_out", "?"),
+        ("wickets", "<i2"),
+        ("runs_conceded", "<i4"),
+        ("catches_taken", "<i2"),
+        ("stumpings_made", "<i2"),
+        ("opposition", "<u4"),
+    ]
+)
+
+# section name -> dtype; matches are sorted by match_id, which match_ids repeats
+# contiguously for binary search, and player innings are grouped by match with
+# innings_offsets[i]:innings_offsets[i + 1] the rows of matches[i]
+SECTIONS = {
+    "matches": MATCH_DTYPE,
+    "match_ids": np.dtype("<i8"),
+    "player_innings": PLAYER_INNINGS_DTYPE,
+    "innings_offsets": np.dtype("<u4"),
+    "string_offsets": np.dtype("<u4"),
+    "strings": np.dtype("u1"),
+}
+STRING_FIELDS = [
+    name for name in MATCH_DTYPE.names if MATCH_DTYPE[name] == np.dtype("<u4")
+]
+
+
+class StringTable:
+    # interns strings as they are added, code 0 is None and ""
+    def __init__(self):
+        self.codes = {"": 0}
+        self.strings = [""]
+
+    def add(self, value):
+        value = "" if value is None else str(value)
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.strings)
+            self.strings.append(value)
+        return code
+
+    def to_arrays(self):
+        encoded = [string.encode("utf-8") for string in self.strings]
+        offsets = np.zeros(len(encoded) + 1, dtype="<u4")
+        np.cumsum([len(string) for string in encoded], out=offsets[1:])
+        return offsets, np.frombuffer(b"".join(encoded), dtype="u1")
+
+
+def get_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return -1
+
+
+def get_match_record(row, strings: StringTable):
+    # one MATCH_DTYPE record from a match details row of dataset.py
+    return (
+        get_int(row["match_id"]),
+        np.datetime64(row["date"], "D") if row["date"] else np.datetime64("NaT"),
+        strings.add(row["ground_name"]),
+        strings.add(row["town_name"]),
+        strings.add(row["country_name"]),
+        get_int(row["team1_id"]),
+        strings.add(row["team1_name"]),
+        get_int(row["team2_id"]),
+        strings.add(row["team2_name"]),
+        get_int(row["toss_winner_team_id"]),
+        strings.add(row["toss_decision_name"]),
+        get_int(row["winner_team_id"]),
+        strings.add(row["result_name"]),
+        strings.add(row["match_status"]),
+        [
+            (
+                get_int(row[f"innings_{number}_batting_team_id"]),
+                get_int(row[f"innings_{number}_runs"]),
+                get_int(row[f"innings_{number}_wickets"]),
+                (
+                    np.nan
+                    if row[f"innings_{number}_overs"] is None
+                    else row[f"innings_{number}_overs"]
+                ),
+            )
+            for number in (1, 2)
+        ],
+    )
+
+
+def write_sections(path: str, arrays):
+    # MAGIC, the header length as a little endian uint64, a json header giving each
+    # section's offset and length, then the sections, each aligned
+    offsets = {}
+    position = 0
+    for name, array in arrays.items():
+        offsets[name] = {"offset": position, "length": len(array)}
+        position += -(-array.nbytes // ALIGNMENT) * ALIGNMENT
+    header = json.dumps({"version": VERSION, "sections": offsets}).encode()
+    start = -(-(len(MAGIC) + 8 + len(header)) // ALIGNMENT) * ALIGNMENT
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as fp:
+        fp.write(MAGIC)
+        fp.write(len(header).to_bytes(8, "little"))
+        fp.write(header)
+        for name, array in arrays.items():
+            fp.write(b"\0" * (start + offsets[name]["offset"] - fp.tell()))
+            fp.write(np.ascontiguousarray(array, dtype=SECTIONS[name]).tobytes())
+    os.replace(tmp_path, path)
+
+
+def build_archive(
+    path: str = ARCHIVE_PATH,
+    player_data_dir: str = PLAYER_DATA_DIR,
+    odi_matches_dir: str = ODI_MATCHES_DIR,
+    store_dir: str = MATCH_STORE_DIR,
+):
+    # payloads are reduced to a record one at a time, so only the records are ever held
+    strings = StringTable()
+    records = dict()
+    for odi_matches_path in iter_odi_matches_paths(odi_matches_dir):
+        for match_details in load_odi_match_details(
+            odi_matches_path, store_dir, MATCH_DETAIL_PARTS
+        ):
+            match_id = to_string((match_details.get("match") or {}).get("match_id"))
+            if match_id is None or match_id in records:
+                continue
+            records[match_id] = get_match_record(
+                get_match_details_row(match_details), strings
+            )
+
+    matches = np.array(list(records.values()), dtype=MATCH_DTYPE)
+    matches.sort(order="match_id", kind="stable")
+    match_rows = {
+        int(match_id): row for row, match_id in enumerate(matches["match_id"])
+    }
+
+    player_innings = []
+    if os.path.isdir(player_data_dir):
+        for file_name in sorted(os.listdir(player_data_dir)):
+            if not file_name.endswith(".json"):
+                continue
+            player_details = load_player_details(
+                os.path.join(player_data_dir, file_name)
+            )
+            player = strings.add(file_name[: -len(".json")])
+            for row in get_match_rows(player, player_details):
+                match = match_rows.get(get_int(row["match_id"]))
+                if match is None:
+                    continue
+                player_innings.append(
+                    (
+                        player,
+                        match,
+                        -1 if row["runs"] is None else row["runs"],
+                        row["not_out"],
+                        -1 if row["wickets"] is None else row["wickets"],
+                        -1 if row["runs_conceded"] is None else row["runs_conceded"],
+                        -1 if row["catches_taken"] is None else row["catches_taken"],
+                        -1 if row["stumpings_made"] is None else row["stumpings_made"],
+                        strings.add(row["opposition"]),
+                    )
+                )
+    player_innings = np.array(player_innings, dtype=PLAYER_INNINGS_DTYPE)
+    player_innings.sort(order=["match", "player"], kind="stable")
+    innings_offsets = np.searchsorted(
+        player_innings["match"], np.arange(len(matches) + 1)
+    )
+
+    string_offsets, string_bytes = strings.to_arrays()
+    write_sections(
+        path,
+        {
+            "matches": matches,
+            "match_ids": matches["match_id"],
+            "player_innings": player_innings,
+            "innings_offsets": innings_offsets,
+            "string_offsets": string_offsets,
+            "strings": string_bytes,
+        },
+    )
+    return {"matches": len(matches), "player_innings": len(player_innings)}
+
+
+class MatchArchive:
+    # read only view of an archive written by build_archive; every section is a numpy
+    # array over the memory mapped file, so nothing is read until it is touched and
+    # pages are shared with the page cache instead of copied
+    def __init__(self, path: str = ARCHIVE_PATH):
+        with open(path, "rb") as fp:
+            self.mmap = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.mmap[: len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a match archive")
+        header_length = int.from_bytes(self.mmap[len(MAGIC) : len(MAGIC) + 8], "little")
+        header = json.loads(self.mmap[len(MAGIC) + 8 : len(MAGIC) + 8 + header_length])
+        if header["version"] != VERSION:
+            raise ValueError(f"{path} is version {header['version']}, not {VERSION}")
+        start = -(-(len(MAGIC) + 8 + header_length) // ALIGNMENT) * ALIGNMENT
+        for name, dtype in SECTIONS.items():
+            section = header["sections"][name]
+            setattr(
+                self,
+                name,
+                np.frombuffer(
+                    self.mmap,
+                    dtype=dtype,
+                    count=section["length"],
+                    offset=start + section["offset"],
+                ),
+            )
+
+    def __len__(self):
+        return len(self.matches)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        # views must not outlive the map
+        for name in SECTIONS:
+            setattr(self, name, None)
+        try:
+            self.mmap.close()
+        except BufferError:
+            # a record or slice handed out is still alive, the map closes with it
+            pass
+
+    def get_string(self, code):
+        start, end = self.string_offsets[code], self.string_offsets[code + 1]
+        return bytes(self.strings[start:end]).decode("utf-8")
+
+    def get_row(self, match_id):
+        # row of a match in matches by binary search, None if it is not archived
+        match_id = get_int(match_id)
+        row = int(np.searchsorted(self.match_ids, match_id))
+        if row < len(self.match_ids) and self.match_ids[row] == match_id:
+            return row
+        return None
+
+    def get_record(self, match_id):
+        # the raw record, a zero copy view into the archive
+        row = self.get_row(match_id)
+        return None if row is None else self.matches[row]
+
+    def get_player_innings(self, match_id):
+        row = self.get_row(match_id)
+        if row is None:
+            return self.player_innings[:0]
+        return self.player_innings[
+            self.innings_offsets[row] : self.innings_offsets[row + 1]
+        ]
+
+    def get_match(self, match_id):
+        # a match as a dict with its strings looked up, None if it is not archived
+        record = self.get_record(match_id)
+        if record is None:
+            return None
+        match = {}
+        for name in MATCH_DTYPE.names:
+            if name in STRING_FIELDS:
+                match[name] = self.get_string(record[name])
+            elif name == "innings":
+                match[name] = [
+                    dict(zip(INNINGS_DTYPE.names, innings.tolist()))
+                    for innings in record[name]
+                ]
+            elif name == "date":
+                match[name] = None if np.isnat(record[name]) else str(record[name])
+            else:
+                match[name] = int(record[name])
+        match["players"] = [
+            {
+                name: (
+                    self.get_string(value)
+                    if name in ("player", "opposition")
+                    else value
+                )
+                for name, value in zip(PLAYER_INNINGS_DTYPE.names, innings.tolist())
+                if name != "match"
+            }
+            for innings in self.get_player_innings(match_id)
+        ]
+        return match
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Reduce engine payloads to a compact memory mapped match archive."
+    )
+    parser.add_argument("--output", default=ARCHIVE_PATH)
+    parser.add_argument("--player-data-dir", default=PLAYER_DATA_DIR)
+    parser.add_argument("--odi-matches-dir", default=ODI_MATCHES_DIR)
+    parser.add_argument("--store-dir", default=MATCH_STORE_DIR)
+    args = parser.parse_args()
+
+    counts = build_archive(
+        args.output, args.player_data_dir, args.odi_matches_dir, args.store_dir
+    )
+    print(
+        f"{counts['matches']} matches and {counts['player_innings']} player innings, "
+        f"{os.path.getsize(args.output) / 1024:.1f} KiB in {args.output}"
+    )
@@ -0,0 +1,76 @@
+import argparse
+import os
+import time
+import tracemalloc
+
+import numpy as np
+
+from archive import ARCHIVE_PATH, MatchArchive
+from match_store import MATCH_STORE_DIR, load_match
+
+
+def scan_store(store_dir: str):
+    # what an analysis does today for a few fields: load every payload in full
+    totals = []
+    for file_name in sorted(os.listdir(store_dir)):
+        if file_name.endswith(".json"):
+            match_details = load_match(store_dir, file_name[: -len(".json")])
+            innings = match_details.get("innings") or []
+            totals.append(sum(int(inning.get("runs") or 0) for inning in innings[:2]))
+    return sum(totals)
+
+
+def scan_archive(archive_path: str):
+    with MatchArchive(archive_path) as archive:
+        runs = archive.matches["innings"]["runs"]
+        return int(np.where(runs > 0, runs, 0).sum())
+
+
+def lookup_archive(archive_path: str, match_ids):
+    with MatchArchive(archive_path) as archive:
+        for match_id in match_ids:
+            archive.get_record(match_id)
+
+
+def measure(function, repeat: int, *args):
+    # best time of repeat runs in seconds, and the peak python heap of one run in bytes
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(*args)
+        timings.append(time.perf_counter() - start)
+    tracemalloc.start()
+    function(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return min(timings), peak
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--archive", default=ARCHIVE_PATH)
+    parser.add_argument("--store-dir", default=MATCH_STORE_DIR)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    if not os.path.exists(args.archive):
+        raise SystemExit(f"No archive at {args.archive}, build it with archive.py")
+
+    match_ids = [
+        file_name[: -len(".json")]
+        for file_name in os.listdir(args.store_dir)
+        if file_name.endswith(".json")
+    ]
+    results = {
+        "json payloads, full scan": measure(scan_store, args.repeat, args.store_dir),
+        "archive, full scan": measure(scan_archive, args.repeat, args.archive),
+        f"archive, {len(match_ids)} lookups by match_id": measure(
+            lookup_archive, args.repeat, args.archive, match_ids
+        ),
+    }
+    json_time = results["json payloads, full scan"][0]
+    for name, (elapsed, peak) in results.items():
+        print(
+            f"{name}: {elapsed * 1000:.1f} ms, {json_time / elapsed:.1f}x, "
+            f"peak heap {peak / 1024:.0f} KiB"
+        )
@@ -0,0 +1,86 @@
+import argparse
+import json
+import os
+import time
+
+from dataset import (
+    DATASET_DIR,
+    ODI_MATCHES_DIR,
+    PLAYER_DATA_DIR,
+    iter_odi_matches_paths,
+    read_table,
+)
+from match import load_odi_match_details
+from match_store import MATCH_STORE_DIR
+
+
+def load_json(player_data_dir: str, odi_matches_dir: str, store_dir: str):
+    # what every consumer does today: parse each player file and every match payload
+    players = []
+    for file_name in sorted(os.listdir(player_data_dir)):
+        if file_name.endswith(".json"):
+            with open(os.path.join(player_data_dir, file_name), "r") as fp:
+                players.append(json.load(fp))
+    matches = []
+    for path in iter_odi_matches_paths(odi_matches_dir):
+        matches.extend(load_odi_match_details(path, store_dir))
+    return players, matches
+
+
+def load_dataset(dataset_dir: str):
+    return [
+        read_table(name, dataset_dir=dataset_dir)
+        for name in ("player_summary", "player_matches", "match_details")
+    ]
+
+
+def load_projected(dataset_dir: str):
+    # a typical chart query: two columns of recent matches against one opposition
+    return read_table(
+        "player_matches",
+        columns=["player", "runs"],
+        filters=[("year", ">=", 2017), ("opposition", "=", "v Australia")],
+        dataset_dir=dataset_dir,
+    )
+
+
+def time_load(load, repeat: int, *args):
+    # best of repeat runs, in seconds
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        load(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dataset-dir", default=DATASET_DIR)
+    parser.add_argument("--player-data-dir", default=PLAYER_DATA_DIR)
+    parser.add_argument("--odi-matches-dir", default=ODI_MATCHES_DIR)
+    parser.add_argument("--store-dir", default=MATCH_STORE_DIR)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.dataset_dir):
+        raise SystemExit(f"No dataset at {args.dataset_dir}, export it with dataset.py")
+
+    json_time = time_load(
+        load_json,
+        args.repeat,
+        args.player_data_dir,
+        args.odi_matches_dir,
+        args.store_dir,
+    )
+    dataset_time = time_load(load_dataset, args.repeat, args.dataset_dir)
+    projected_time = time_load(load_projected, args.repeat, args.dataset_dir)
+    print(f"json files: {json_time * 1000:.1f} ms")
+    print(
+        f"dataset, all tables: {dataset_time * 1000:.1f} ms, "
+        f"{json_time / dataset_time:.1f}x"
+    )
+    print(
+        f"dataset, projected and filtered: {projected_time * 1000:.1f} ms, "
+        f"{json_time / projected_time:.1f}x"
+    )
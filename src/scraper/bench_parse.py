@@ -0,0 +1,90 @@
+from bs4 import BeautifulSoup
+import argparse
+import glob
+import time
+
+from player import HTML_PARSER, parse_odi_match_records
+
+# save a page with e.g. curl -o data/fixtures/match_lists/34102.html "<odi_matches url>"
+FIXTURE_PAGES = "./data/fixtures/match_lists/*.html"
+
+
+# the parser get_odi_match_records used before the fast path, kept as the baseline
+def parse_odi_match_records_baseline(html: str):
+    matches = []
+    soup = BeautifulSoup(html, "html.parser")
+    tb = soup.find("caption", string="Match by match list").parent
+    tbody = tb.findChild("tbody")
+    trows = tbody.findChildren("tr")
+    for trow in trows:
+        tds = trow.findChildren("td")
+        runs_no = tds[0].text
+        runs = runs_no.replace("*", "")
+        no = str(runs_no).find("*") != -1
+        wickets = tds[1].text
+        runs_conceded = tds[2].text
+        catches_taken = tds[3].text
+        stumpings_made = tds[4].text
+        opposition = tds[6].text
+        ground = tds[7].text
+        date = tds[8].text
+        match_link = tds[9].findChild("a")
+        match_id = match_link["href"].split("/")[-1].split(".")[0]
+
+        match = {
+            "runs": runs,
+            "not_out": no,
+            "wickets": wickets,
+            "runs_conceded": runs_conceded,
+            "catches_taken": catches_taken,
+            "stumpings_made": stumpings_made,
+            "opposition": opposition,
+            "ground": ground,
+            "date": date,
+            "match_id": match_id,
+        }
+        matches.append(match)
+    return matches
+
+
+def time_parser(parse, html: str, repeat: int):
+    # best of repeat runs, in seconds
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        parse(html)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("pages", nargs="*", help="saved match list pages")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    pages = args.pages or sorted(glob.glob(FIXTURE_PAGES))
+    if not pages:
+        raise SystemExit(f"No fixture pages found at {FIXTURE_PAGES}")
+
+    print(f"Fast path parser backend: {HTML_PARSER}")
+    total_baseline = 0.0
+    total_fast = 0.0
+    for page in pages:
+        with open(page, "r", encoding="utf-8") as fp:
+            html = fp.read()
+        if parse_odi_match_records(html) != parse_odi_match_records_baseline(html):
+            raise SystemExit(f"Fast path output differs from the baseline on {page}")
+
+        baseline = time_parser(parse_odi_match_records_baseline, html, args.repeat)
+        fast = time_parser(parse_odi_match_records, html, args.repeat)
+        total_baseline += baseline
+        total_fast += fast
+        print(
+            f"{page}: baseline {baseline * 1000:.1f} ms, "
+            f"fast {fast * 1000:.1f} ms, {baseline / fast:.1f}x"
+        )
+    print(
+        f"Total: baseline {total_baseline * 1000:.1f} ms, "
+        f"fast {total_fast * 1000:.1f} ms, {total_baseline / total_fast:.1f}x"
+    )
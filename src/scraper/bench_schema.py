@@ -0,0 +1,152 @@
+import argparse
+import json
+import os
+
+import msgspec
+
+import schema
+from bench_archive import measure
+from dataset import (
+    DISCIPLINES,
+    PLAYER_DATA_DIR,
+    get_match_rows,
+    get_summary_rows,
+    parse_match_date,
+    to_string,
+)
+from match_store import MATCH_STORE_DIR
+
+
+def to_number(value, number_type=int):
+    # the conversion every reader repeated before the schema
+    if value is None or isinstance(value, bool):
+        return None
+    try:
+        return number_type(str(value).rstrip("*"))
+    except ValueError:
+        return None
+
+
+def get_summary_rows_json(player_name: str, player_details):
+    # dataset.py's rows from json.load's dicts, as it built them before the schema
+    for discipline in DISCIPLINES:
+        summary = player_details.get(discipline) or {}
+        for stats_group in (summary.get("summary") or {}).get("groups", []):
+            for stat in stats_group.get("stats", []):
+                row = {
+                    "player": player_name,
+                    "discipline": discipline,
+                    "group_type": stats_group["type"],
+                    "tt": to_string(stat.get("tt")),
+                    "sp": to_string(stat.get("sp")),
+                }
+                for key in schema.SUMMARY_STAT_KEYS:
+                    row[key] = to_number(stat.get(key), float)
+                yield row
+
+
+def get_match_rows_json(player_name: str, player_details):
+    for match in player_details.get("odi_matches", []):
+        date = parse_match_date(match.get("date"))
+        yield {
+            "player": player_name,
+            "match_id": match["match_id"],
+            "date": date,
+            "year": date.year if date else None,
+            "runs": to_number(match.get("runs")),
+            "not_out": bool(match.get("not_out")),
+            "wickets": to_number(match.get("wickets")),
+            "runs_conceded": to_number(match.get("runs_conceded")),
+            "catches_taken": to_number(match.get("catches_taken")),
+            "stumpings_made": to_number(match.get("stumpings_made")),
+            "opposition": match.get("opposition"),
+            "ground": match.get("ground"),
+        }
+
+
+def convert_match(match_details):
+    match = match_details.get("match") or {}
+    innings = match_details.get("innings") or []
+    return [str(match.get(field)) for field in schema.MATCH_DETAIL_FIELDS] + [
+        to_number(inning.get(field), float)
+        for inning in innings[:2]
+        for field in ("runs", "wickets", "overs")
+    ]
+
+
+def get_paths(directory: str):
+    return [
+        os.path.join(directory, file_name)
+        for file_name in sorted(os.listdir(directory))
+        if file_name.endswith(".json")
+    ]
+
+
+def load_players_json(paths):
+    for path in paths:
+        with open(path, "r") as fp:
+            player_details = json.load(fp)
+        list(get_summary_rows_json("", player_details))
+        list(get_match_rows_json("", player_details))
+
+
+def load_players_typed(paths):
+    for path in paths:
+        player_details = schema.load_player_details(path)
+        list(get_summary_rows("", player_details))
+        list(get_match_rows("", player_details))
+
+
+def load_players_typed_only(paths):
+    for path in paths:
+        schema.load_player_details(path)
+
+
+def load_matches_json(paths):
+    for path in paths:
+        with open(path, "r") as fp:
+            convert_match(json.load(fp))
+
+
+match_details_decoder = msgspec.json.Decoder(
+    schema.MatchDetails, strict=False, dec_hook=schema.dec_hook
+)
+
+
+def load_matches_typed(paths):
+    # unknown keys, the commentary most of all, are skipped without being built
+    for path in paths:
+        with open(path, "rb") as fp:
+            match_details_decoder.decode(fp.read())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--player-data-dir", default=PLAYER_DATA_DIR)
+    parser.add_argument("--store-dir", default=MATCH_STORE_DIR)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    player_paths = get_paths(args.player_data_dir)
+    runs = {
+        f"{len(player_paths)} player files, json.load and conversion": measure(
+            load_players_json, args.repeat, player_paths
+        ),
+        f"{len(player_paths)} player files, typed decode and rows": measure(
+            load_players_typed, args.repeat, player_paths
+        ),
+        f"{len(player_paths)} player files, typed decode": measure(
+            load_players_typed_only, args.repeat, player_paths
+        ),
+    }
+    if os.path.isdir(args.store_dir):
+        match_paths = get_paths(args.store_dir)
+        runs[f"{len(match_paths)} match payloads, json.load and conversion"] = measure(
+            load_matches_json, args.repeat, match_paths
+        )
+        runs[f"{len(match_paths)} match payloads, typed decode"] = measure(
+            load_matches_typed, args.repeat, match_paths
+        )
+
+    for name, (elapsed, peak) in runs.items():
+        print(f"{name}: {elapsed * 1000:.1f} ms, peak heap {peak / 1024:.0f} KiB")
@@ -0,0 +1,142 @@
+import argparse
+import json
+import os
+import tempfile
+import threading
+import time
+
+from cache import HttpCache
+from fetch import DEFAULT_MAX_WORKERS, RedirectSession, make_session
+from fixture_server import FIXTURE_DIR, FixtureServer, synthesize_fixtures
+from match import get_odi_matches_details
+from player import get_odi_match_records, get_odi_urls, get_summary_statistics
+from scheduler import RequestScheduler
+
+
+class InstrumentedSession:
+    # records latency and body size of every request that actually goes over the wire
+    def __init__(self, session):
+        self.session = session
+        self.latencies = []
+        self.bytes_transferred = 0
+        self.lock = threading.Lock()
+
+    def get(self, url: str, **kwargs):
+        start = time.perf_counter()
+        r = self.session.get(url, **kwargs)
+        elapsed = time.perf_counter() - start
+        with self.lock:
+            self.latencies.append(elapsed)
+            self.bytes_transferred += len(r.content)
+        return r
+
+
+def percentile(values, q: float):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q / 100 * len(values)))]
+
+
+def run_scrape(base_url: str, players_urls, workers: int, rate: float, cache_dir=None):
+    # the same requests player.py and match.py make, against the fixture server
+    instrumented = InstrumentedSession(RedirectSession(make_session(workers), base_url))
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        scheduler = RequestScheduler(
+            instrumented,
+            rate=rate,
+            burst=workers,
+            max_concurrency=workers,
+            failed_path=os.path.join(tmp_dir, "failed_urls.json"),
+        )
+        session = scheduler if cache_dir is None else HttpCache(scheduler, cache_dir)
+
+        start = time.perf_counter()
+        match_ids = dict()
+        for player_urls in players_urls.values():
+            odi_matches = get_odi_match_records(player_urls["odi_matches"], session)
+            for url in get_odi_urls(player_urls["player_id"]).values():
+                get_summary_statistics(url, session)
+            for match in odi_matches or []:
+                match_ids[match["match_id"]] = None
+        for _ in get_odi_matches_details(list(match_ids), session, workers):
+            pass
+        wall_time = time.perf_counter() - start
+        if cache_dir is not None:
+            session.save()
+
+    latencies = instrumented.latencies
+    return {
+        "requests": len(latencies),
+        "failed": len(scheduler.failed_urls),
+        "requests_per_sec": len(latencies) / wall_time,
+        "p50_latency_ms": percentile(latencies, 50) * 1000,
+        "p99_latency_ms": percentile(latencies, 99) * 1000,
+        "bytes_transferred": instrumented.bytes_transferred,
+        "wall_time_s": wall_time,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--fixture-dir", default=FIXTURE_DIR)
+    parser.add_argument(
+        "--synthesize",
+        action="store_true",
+        help="write made-up fixtures for the roster before running",
+    )
+    parser.add_argument("--workers", type=int, default=DEFAULT_MAX_WORKERS)
+    parser.add_argument(
+        "--latency", type=float, default=0.05, help="seconds per request"
+    )
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument(
+        "--rate-limit", type=float, default=None, help="server side cap"
+    )
+    parser.add_argument(
+        "--rate", type=float, default=1000.0, help="client side requests per second"
+    )
+    parser.add_argument("--output", help="write the results as json to this file")
+    args = parser.parse_args()
+
+    with open("./data/players.json", "r") as fp:
+        players_urls = json.load(fp)
+    if args.synthesize:
+        synthesize_fixtures(players_urls, args.fixture_dir)
+
+    server = FixtureServer(
+        args.fixture_dir,
+        latency=args.latency,
+        error_rate=args.error_rate,
+        rate_limit=args.rate_limit,
+    )
+    server.start()
+
+    results = dict()
+    with tempfile.TemporaryDirectory() as cache_dir:
+        scenarios = [
+            ("serial", 1, None),
+            ("concurrent", args.workers, None),
+            ("concurrent, cold cache", args.workers, cache_dir),
+            ("concurrent, warm cache", args.workers, cache_dir),
+        ]
+        for name, workers, scenario_cache_dir in scenarios:
+            results[name] = run_scrape(
+                server.base_url, players_urls, workers, args.rate, scenario_cache_dir
+            )
+    server.shutdown()
+
+    print(
+        f"{'scenario':<24}{'requests':>10}{'failed':>8}{'req/s':>10}"
+        f"{'p50 ms':>10}{'p99 ms':>10}{'MB':>10}{'wall s':>10}"
+    )
+    for name, result in results.items():
+        print(
+            f"{name:<24}{result['requests']:>10}{result['failed']:>8}"
+            f"{result['requests_per_sec']:>10.1f}{result['p50_latency_ms']:>10.1f}"
+            f"{result['p99_latency_ms']:>10.1f}"
+            f"{result['bytes_transferred'] / 1e6:>10.1f}{result['wall_time_s']:>10.2f}"
+        )
+    if args.output:
+        with open(args.output, "w") as fp:
+            json.dump(results, fp, indent=4)
@@ -0,0 +1,106 @@
+import argparse
+import json
+import os
+import random
+import tempfile
+
+import stream
+from bench_archive import measure
+
+PROJECTION = ["match.match_id", "match.ground_name", "match.winner_team_id", "innings"]
+
+
+def make_match(match_id: int, balls: int):
+    # shaped like an engine payload: a small match header and innings totals next to a
+    # large ball by ball commentary that most analyses never read
+    return {
+        "match": {
+            "match_id": str(match_id),
+            "start_date_raw": f"20{10 + match_id % 14}-0{1 + match_id % 9}-1{match_id % 10}",
+            "ground_name": random.choice(["Lord's", "Eden Gardens", "MCG", "Wankhede"]),
+            "team1_id": "6",
+            "team1_name": "India",
+            "team2_id": str(random.randint(1, 9)),
+            "team2_name": "Opposition",
+            "winner_team_id": "6",
+            "result_name": "won",
+        },
+        "innings": [
+            {
+                "batting_team_id": team_id,
+                "runs": str(random.randint(150, 400)),
+                "wickets": str(random.randint(3, 10)),
+                "overs": "50.0",
+            }
+            for team_id in ("6", "2")
+        ],
+        "comms": [
+            {
+                "over": ball // 6,
+                "ball": ball % 6 + 1,
+                "runs": random.choice([0, 0, 1, 1, 2, 4, 6]),
+                "text": "full on off stump, driven firmly to mid off for a single",
+            }
+            for ball in range(balls)
+        ],
+    }
+
+
+def write_player_file(path: str, matches: int, balls: int):
+    # the inline format odi_matches files had before the match store, pretty printed
+    stats = {
+        "player_id": 1,
+        "player": "synthetic_player",
+        "odi_matches": [make_match(1000 + i, balls) for i in range(matches)],
+    }
+    with open(path, "w") as fp:
+        json.dump(stats, fp, indent=4)
+
+
+def load_whole(path: str):
+    with open(path, "r") as fp:
+        return sum(1 for _ in json.load(fp)["odi_matches"])
+
+
+def load_streamed(path: str, fields=None):
+    return sum(1 for _ in stream.iter_json_array(path, "odi_matches", fields))
+
+
+def load_streamed_without_ijson(path: str, fields=None):
+    ijson, stream.ijson = stream.ijson, None
+    try:
+        return load_streamed(path, fields)
+    finally:
+        stream.ijson = ijson
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--matches", type=int, default=500)
+    parser.add_argument(
+        "--balls", type=int, default=600, help="commentary entries per match"
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "synthetic_player.json")
+        random.seed(0)
+        write_player_file(path, args.matches, args.balls)
+        print(f"{args.matches} matches, {os.path.getsize(path) / 1024 ** 2:.1f} MiB")
+
+        runs = {"json.load": measure(load_whole, args.repeat, path)}
+        if stream.ijson is not None:
+            runs["ijson, whole matches"] = measure(load_streamed, args.repeat, path)
+            runs["ijson, projected"] = measure(
+                load_streamed, args.repeat, path, PROJECTION
+            )
+        runs["raw_decode, whole matches"] = measure(
+            load_streamed_without_ijson, args.repeat, path
+        )
+        runs["raw_decode, projected"] = measure(
+            load_streamed_without_ijson, args.repeat, path, PROJECTION
+        )
+
+    for name, (elapsed, peak) in runs.items():
+        print(f"{name}: {elapsed * 1000:.0f} ms, peak heap {peak / 1024 ** 2:.1f} MiB")
@@ -0,0 +1,193 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+CACHE_DIR = "./data/http_cache"
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+DAY = 24 * 60 * 60
+
+# time to live in seconds for each class of url, matched by prefix, None never expires.
+# Finished matches never change, but a player's stats summary and match list grow with
+# every match played, so those are revalidated on every run, a 304 when nothing changed
+DEFAULT_TTLS = [
+    ("https://www.espncricinfo.com/matches/engine/match/", None),
+    ("https://hs-consumer-api.espncricinfo.com/v1/pages/player/stats/summary", 0),
+    ("https://stats.espncricinfo.com/ci/engine/player/", 0),
+]
+DEFAULT_TTL = DAY
+
+# index is flushed to disk after this many new responses
+SAVE_EVERY = 50
+
+
+class CachedResponse:
+    def __init__(self, url: str, status_code: int, content: bytes, headers: dict):
+        self.url = url
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers
+        self.from_cache = True
+
+    @property
+    def text(self):
+        return self.content.decode(get_charset(self.headers))
+
+    def json(self):
+        return json.loads(self.content)
+
+
+def get_charset(headers: dict):
+    content_type = headers.get("Content-Type", "")
+    for param in content_type.split(";")[1:]:
+        key, _, value = param.strip().partition("=")
+        if key.lower() == "charset" and value:
+            return value.strip('"')
+    return "utf-8"
+
+
+def get_ttl(url: str, ttls=DEFAULT_TTLS):
+    for prefix, ttl in ttls:
+        if url.startswith(prefix):
+            return ttl
+    return DEFAULT_TTL
+
+
+class HttpCache:
+    # content-addressed response cache that can stand in for a requests session
+    def __init__(
+        self,
+        session,
+        cache_dir: str = CACHE_DIR,
+        ttls=DEFAULT_TTLS,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ):
+        self.session = session
+        self.cache_dir = cache_dir
+        self.ttls = ttls
+        self.max_bytes = max_bytes
+        self.index_path = os.path.join(cache_dir, "index.json")
+        self.lock = threading.Lock()
+        self.unsaved = 0
+        os.makedirs(os.path.join(cache_dir, "blobs"), exist_ok=True)
+        self.index = dict()
+        if os.path.exists(self.index_path):
+            with open(self.index_path, "r") as fp:
+                self.index = json.load(fp)
+
+    def get_blob_path(self, digest: str):
+        return os.path.join(self.cache_dir, "blobs", digest[:2], digest)
+
+    def read_entry(self, url: str, entry: dict):
+        try:
+            with open(self.get_blob_path(entry["digest"]), "rb") as fp:
+                content = fp.read()
+        except FileNotFoundError:
+            return None
+        return CachedResponse(url, entry["status_code"], content, entry["headers"])
+
+    def is_fresh(self, url: str, entry: dict):
+        ttl = get_ttl(url, self.ttls)
+        return ttl is None or time.time() - entry["fetched_at"] < ttl
+
+    def get(self, url: str, headers=None):
+        with self.lock:
+            entry = self.index.get(url)
+        cached = self.read_entry(url, entry) if entry is not None else None
+
+        if cached is not None and self.is_fresh(url, entry):
+            self.touch(url)
+            return cached
+
+        request_headers = dict(headers or {})
+        if cached is not None:
+            if "ETag" in entry["headers"]:
+                request_headers["If-None-Match"] = entry["headers"]["ETag"]
+            if "Last-Modified" in entry["headers"]:
+                request_headers["If-Modified-Since"] = entry["headers"]["Last-Modified"]
+
+        r = self.session.get(url, headers=request_headers)
+        if r.status_code == 304 and cached is not None:
+            self.touch(url, revalidated=True)
+            return cached
+        if r.status_code == 200:
+            self.store(url, r)
+            return r
+        # serve the stale copy rather than leaving a hole in the data
+        if cached is not None:
+            return cached
+        return r
+
+    def touch(self, url: str, revalidated: bool = False):
+        with self.lock:
+            entry = self.index.get(url)
+            if entry is None:
+                return
+            entry["accessed_at"] = time.time()
+            if revalidated:
+                entry["fetched_at"] = entry["accessed_at"]
+
+    def store(self, url: str, r):
+        content = r.content
+        digest = hashlib.sha256(content).hexdigest()
+        blob_path = self.get_blob_path(digest)
+        if not os.path.exists(blob_path):
+            os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+            tmp_path = f"{blob_path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as fp:
+                fp.write(content)
+            os.replace(tmp_path, blob_path)
+
+        headers = {
+            key: r.headers[key]
+            for key in ("Content-Type", "ETag", "Last-Modified")
+            if key in r.headers
+        }
+        now = time.time()
+        with self.lock:
+            self.index[url] = {
+                "digest": digest,
+                "size": len(content),
+                "status_code": r.status_code,
+                "headers": headers,
+                "fetched_at": now,
+                "accessed_at": now,
+            }
+            self.unsaved += 1
+            should_save = self.unsaved >= SAVE_EVERY
+        if should_save:
+            self.save()
+
+    def evict(self):
+        # drops least recently used entries until the unique blobs fit in max_bytes
+        sizes = {entry["digest"]: entry["size"] for entry in self.index.values()}
+        total = sum(sizes.values())
+        if total <= self.max_bytes:
+            return
+        references = dict()
+        for entry in self.index.values():
+            references[entry["digest"]] = references.get(entry["digest"], 0) + 1
+
+        by_access = sorted(self.index.items(), key=lambda item: item[1]["accessed_at"])
+        for url, entry in by_access:
+            if total <= self.max_bytes:
+                break
+            del self.index[url]
+            digest = entry["digest"]
+            references[digest] -= 1
+            if references[digest] == 0:
+                total -= sizes[digest]
+                try:
+                    os.remove(self.get_blob_path(digest))
+                except FileNotFoundError:
+                    pass
+
+    def save(self):
+        with self.lock:
+            self.evict()
+            tmp_path = self.index_path + ".tmp"
+            with open(tmp_path, "w") as fp:
+                json.dump(self.index, fp)
+            os.replace(tmp_path, self.index_path)
+            self.unsaved = 0
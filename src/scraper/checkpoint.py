@@ -0,0 +1,42 @@
+import json
+import os
+
+
+class Journal:
+    # append-only record of finished work, so an interrupted run can pick up where it stopped
+    def __init__(self, path: str):
+        self.path = path
+        self.done = set()
+        if not os.path.exists(path):
+            return
+        is_truncated = False
+        with open(path, "r") as fp:
+            for line in fp:
+                # the last line may be cut short if the process was killed mid-write
+                try:
+                    self.done.add(tuple(json.loads(line)))
+                except json.JSONDecodeError:
+                    is_truncated = True
+        if is_truncated:
+            with open(path, "w") as fp:
+                for key in self.done:
+                    fp.write(json.dumps(key) + "\n")
+
+    def is_resuming(self):
+        return len(self.done) > 0
+
+    def is_done(self, *key):
+        return key in self.done
+
+    def mark_done(self, *key):
+        with open(self.path, "a") as fp:
+            fp.write(json.dumps(key) + "\n")
+            fp.flush()
+            os.fsync(fp.fileno())
+        self.done.add(key)
+
+    def clear(self):
+        # called once a run finishes so the next one starts from the top
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        self.done = set()
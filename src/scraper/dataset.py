@@ -0,0 +1,271 @@
+import argparse
+import os
+import shutil
+from datetime import datetime
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from match import load_odi_match_details
+from match_store import MATCH_STORE_DIR
+from ndjson import is_ndjson_path
+from schema import (
+    MATCH_DETAIL_FIELDS,
+    SUMMARY_STAT_KEYS,
+    get_number,
+    load_player_details,
+    to_match_details,
+)
+
+DATASET_DIR = "./data/dataset"
+PLAYER_DATA_DIR = "./data/players"
+ODI_MATCHES_DIR = "./data/odi_matches"
+
+DISCIPLINES = ["BATTING", "BOWLING"]
+
+# fields kept from each of an engine payload's first two innings, next to
+# MATCH_DETAIL_FIELDS from its "match" object
+INNINGS_FIELDS = {
+    "batting_team_id": pa.string(),
+    "runs": pa.int32(),
+    "wickets": pa.int32(),
+    "overs": pa.float64(),
+}
+INNINGS_COUNT = 2
+# the parts of a payload the fields above come from, the rest is never kept
+MATCH_DETAIL_PARTS = ["match", "innings"]
+
+PLAYER_SUMMARY_SCHEMA = pa.schema(
+    [
+        ("player", pa.string()),
+        ("discipline", pa.string()),
+        ("group_type", pa.string()),
+        ("tt", pa.string()),
+        ("sp", pa.string()),
+    ]
+    + [(key, pa.float64()) for key in SUMMARY_STAT_KEYS]
+)
+PLAYER_MATCHES_SCHEMA = pa.schema(
+    [
+        ("player", pa.string()),
+        ("match_id", pa.string()),
+        ("date", pa.date32()),
+        ("year", pa.int16()),
+        ("runs", pa.int32()),
+        ("not_out", pa.bool_()),
+        ("wickets", pa.int32()),
+        ("runs_conceded", pa.int32()),
+        ("catches_taken", pa.int32()),
+        ("stumpings_made", pa.int32()),
+        ("opposition", pa.string()),
+        ("ground", pa.string()),
+    ]
+)
+MATCH_DETAILS_SCHEMA = pa.schema(
+    [("match_id", pa.string()), ("date", pa.date32()), ("year", pa.int16())]
+    + [(field, pa.string()) for field in MATCH_DETAIL_FIELDS]
+    + [
+        (f"innings_{number}_{field}", field_type)
+        for number in range(1, INNINGS_COUNT + 1)
+        for field, field_type in INNINGS_FIELDS.items()
+    ]
+)
+
+# table name -> (schema, partition columns, sort order); partitions are hive style
+# directories, e.g. player_matches/year=2019/, so filters on them skip whole directories
+TABLES = {
+    "player_summary": (PLAYER_SUMMARY_SCHEMA, ["discipline"], ["player", "group_type"]),
+    "player_matches": (PLAYER_MATCHES_SCHEMA, ["year"], ["player", "date"]),
+    "match_details": (MATCH_DETAILS_SCHEMA, ["year"], ["date", "match_id"]),
+}
+
+
+def to_string(value):
+    return None if value is None else str(value)
+
+
+def parse_match_date(date: str):
+    # "20 Oct 2021" in match lists, "2021-10-20" in engine payloads
+    for date_format in ("%d %b %Y", "%Y-%m-%d"):
+        try:
+            return datetime.strptime(date, date_format).date()
+        except (TypeError, ValueError):
+            continue
+    return None
+
+
+def get_summary_rows(player_name: str, player_details):
+    for discipline in DISCIPLINES:
+        for stats_group in player_details.get_stats_groups(discipline):
+            for stat in stats_group.stats:
+                row = {
+                    "player": player_name,
+                    "discipline": discipline,
+                    "group_type": stats_group.type,
+                    "tt": to_string(stat.tt),
+                    "sp": to_string(stat.sp),
+                }
+                for key in SUMMARY_STAT_KEYS:
+                    row[key] = get_number(getattr(stat, key), float)
+                yield row
+
+
+def get_match_rows(player_name: str, player_details):
+    for match in player_details.odi_matches:
+        date = parse_match_date(match.date)
+        yield {
+            "player": player_name,
+            "match_id": to_string(match.match_id),
+            "date": date,
+            "year": date.year if date else None,
+            "runs": get_number(match.runs),
+            "not_out": match.not_out,
+            "wickets": get_number(match.wickets),
+            "runs_conceded": get_number(match.runs_conceded),
+            "catches_taken": get_number(match.catches_taken),
+            "stumpings_made": get_number(match.stumpings_made),
+            "opposition": match.opposition,
+            "ground": match.ground,
+        }
+
+
+def get_match_details_row(match_details, fallback_date=None):
+    # flattens the parts of an engine payload worth querying, the rest is left behind
+    match_details = to_match_details(match_details)
+    match = match_details.match
+    date = (parse_match_date(match.start_date_raw) if match else None) or fallback_date
+    row = {
+        "match_id": to_string(match.match_id) if match else None,
+        "date": date,
+        "year": date.year if date else None,
+    }
+    for field in MATCH_DETAIL_FIELDS:
+        row[field] = to_string(getattr(match, field)) if match else None
+    innings = match_details.innings or []
+    for number in range(1, INNINGS_COUNT + 1):
+        inning = innings[number - 1] if len(innings) >= number else None
+        for field, field_type in INNINGS_FIELDS.items():
+            value = getattr(inning, field) if inning else None
+            if field_type == pa.string():
+                row[f"innings_{number}_{field}"] = to_string(value)
+            else:
+                row[f"innings_{number}_{field}"] = get_number(
+                    value, int if field_type == pa.int32() else float
+                )
+    return row
+
+
+def iter_odi_matches_paths(odi_matches_dir: str):
+    if not os.path.isdir(odi_matches_dir):
+        return
+    for file_name in sorted(os.listdir(odi_matches_dir)):
+        if file_name.endswith(".json") or is_ndjson_path(file_name):
+            yield os.path.join(odi_matches_dir, file_name)
+
+
+def write_table(dataset_dir: str, name: str, rows):
+    schema, partitioning, sort_order = TABLES[name]
+    table = pa.Table.from_pylist(rows, schema=schema)
+    table = table.sort_by([(column, "ascending") for column in sort_order])
+    table_dir = os.path.join(dataset_dir, name)
+    if table.num_rows == 0:
+        # write_dataset writes nothing at all for no rows, so readers would find no table;
+        # an empty file keeps the directory, the partition columns come from its path
+        os.makedirs(table_dir, exist_ok=True)
+        pq.write_table(
+            table.drop_columns(partitioning), os.path.join(table_dir, "part-0.parquet")
+        )
+        return 0
+    ds.write_dataset(
+        table,
+        table_dir,
+        format="parquet",
+        partitioning=partitioning,
+        partitioning_flavor="hive",
+        # row groups small enough that their column statistics let filters skip data
+        max_rows_per_group=64 * 1024,
+        existing_data_behavior="overwrite_or_ignore",
+    )
+    return table.num_rows
+
+
+def export_dataset(
+    dataset_dir: str = DATASET_DIR,
+    player_data_dir: str = PLAYER_DATA_DIR,
+    odi_matches_dir: str = ODI_MATCHES_DIR,
+    store_dir: str = MATCH_STORE_DIR,
+):
+    summary_rows = []
+    match_rows = []
+    match_dates = dict()
+    for file_name in sorted(os.listdir(player_data_dir)):
+        if not file_name.endswith(".json"):
+            continue
+        player_details = load_player_details(os.path.join(player_data_dir, file_name))
+        player_name = file_name[: -len(".json")]
+        summary_rows.extend(get_summary_rows(player_name, player_details))
+        for row in get_match_rows(player_name, player_details):
+            match_rows.append(row)
+            match_dates[row["match_id"]] = row["date"]
+
+    # a match appears in the file of every player who played it, keep it once
+    details_rows = dict()
+    for path in iter_odi_matches_paths(odi_matches_dir):
+        for match_details in load_odi_match_details(
+            path, store_dir, MATCH_DETAIL_PARTS
+        ):
+            match_id = to_string((match_details.get("match") or {}).get("match_id"))
+            if match_id is None or match_id in details_rows:
+                continue
+            details_rows[match_id] = get_match_details_row(
+                match_details, match_dates.get(match_id)
+            )
+
+    # written next to the old dataset and swapped in, so readers never see half of one
+    tmp_dir = dataset_dir + ".tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    counts = {
+        "player_summary": write_table(tmp_dir, "player_summary", summary_rows),
+        "player_matches": write_table(tmp_dir, "player_matches", match_rows),
+        "match_details": write_table(
+            tmp_dir, "match_details", list(details_rows.values())
+        ),
+    }
+    shutil.rmtree(dataset_dir, ignore_errors=True)
+    os.replace(tmp_dir, dataset_dir)
+    return counts
+
+
+def read_table(name: str, columns=None, filters=None, dataset_dir: str = DATASET_DIR):
+    # columns projects, only those column chunks are read; filters are pushed down, e.g.
+    # [("year", ">=", 2017)] skips whole partitions and [("opposition", "=", "v Australia")]
+    # skips row groups whose statistics rule it out
+    schema, partitioning, _ = TABLES[name]
+    return pq.read_table(
+        os.path.join(dataset_dir, name),
+        columns=columns,
+        filters=filters,
+        schema=schema,
+        partitioning=ds.partitioning(
+            pa.schema([schema.field(column) for column in partitioning]), flavor="hive"
+        ),
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Export player and match json into a partitioned parquet dataset."
+    )
+    parser.add_argument("--output", default=DATASET_DIR)
+    parser.add_argument("--player-data-dir", default=PLAYER_DATA_DIR)
+    parser.add_argument("--odi-matches-dir", default=ODI_MATCHES_DIR)
+    parser.add_argument("--store-dir", default=MATCH_STORE_DIR)
+    args = parser.parse_args()
+
+    counts = export_dataset(
+        args.output, args.player_data_dir, args.odi_matches_dir, args.store_dir
+    )
+    for name, count in counts.items():
+        print(f"{name}: {count} rows")
+    print(f"Dataset saved in {args.output}")
@@ -0,0 +1,46 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit, urlunsplit
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_MAX_WORKERS = 8
+
+
+def make_session(pool_size: int = DEFAULT_MAX_WORKERS):
+    # one keep-alive pool shared by every worker thread
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+class RedirectSession:
+    # sends every request to base_url instead of the original host, e.g. a fixture server
+    def __init__(self, session, base_url: str):
+        self.session = session
+        self.base_url = urlsplit(base_url)
+
+    def get(self, url: str, **kwargs):
+        url = urlsplit(url)._replace(
+            scheme=self.base_url.scheme, netloc=self.base_url.netloc
+        )
+        return self.session.get(urlunsplit(url), **kwargs)
+
+
+def map_ordered(fn, items, max_workers: int = DEFAULT_MAX_WORKERS):
+    # yields fn(item) in input order, keeping at most max_workers calls in flight
+    if max_workers <= 1:
+        for item in items:
+            yield fn(item)
+        return
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = deque()
+        for item in items:
+            pending.append(executor.submit(fn, item))
+            if len(pending) >= max_workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
@@ -0,0 +1,415 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+import argparse
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+
+FIXTURE_DIR = "./data/fixtures"
+
+# recorded responses, laid out by the endpoint they stand in for
+SUMMARY_PATH = "summaries/{player_id}_{stat_type}.json"
+MATCH_LIST_PATH = "match_lists/{player_id}.html"
+MATCH_PATH = "matches/{match_id}.json"
+
+SUMMARY_ROUTE = "/v1/pages/player/stats/summary"
+MATCH_LIST_ROUTE = re.compile(r"^/ci/engine/player/(\d+)\.html$")
+MATCH_ROUTE = re.compile(r"^/matches/engine/match/(\d+)\.json$")
+
+# what synthesized matches are drawn from
+SYNTHETIC_OPPOSITIONS = [
+    "Australia",
+    "England",
+    "Pakistan",
+    "New Zealand",
+    "South Africa",
+    "Sri Lanka",
+    "Bangladesh",
+    "West Indies",
+    "Afghanistan",
+]
+SYNTHETIC_GROUNDS = ["Mumbai", "Kolkata", "Melbourne", "Lord's", "Dubai", "Colombo"]
+MONTHS = [
+    "Jan",
+    "Feb",
+    "Mar",
+    "Apr",
+    "May",
+    "Jun",
+    "Jul",
+    "Aug",
+    "Sep",
+    "Oct",
+    "Nov",
+    "Dec",
+]
+POSITION_LABELS = [
+    f"{position}{'st' if position == 1 else 'nd' if position == 2 else 'rd' if position == 3 else 'th'} position"
+    for position in range(1, 12)
+]
+
+
+def get_fixture_path(path: str, query: str):
+    # maps a request to the recorded file that answers it, None if it is not a known route
+    if path == SUMMARY_ROUTE:
+        params = parse_qs(query)
+        return SUMMARY_PATH.format(
+            player_id=params.get("playerId", [""])[0],
+            stat_type=params.get("type", [""])[0],
+        )
+    match = MATCH_LIST_ROUTE.match(path)
+    if match:
+        return MATCH_LIST_PATH.format(player_id=match.group(1))
+    match = MATCH_ROUTE.match(path)
+    if match:
+        return MATCH_PATH.format(match_id=match.group(1))
+    return None
+
+
+class Throttle:
+    # server side token bucket, requests over the rate get a 429
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.tokens = rate
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def try_acquire(self):
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(
+                self.rate, self.tokens + (now - self.updated_at) * self.rate
+            )
+            self.updated_at = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+
+class FixtureRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        server = self.server
+        if server.latency:
+            time.sleep(random.uniform(0.5, 1.5) * server.latency)
+        if server.throttle is not None and not server.throttle.try_acquire():
+            return self.send_empty(429, {"Retry-After": "1"})
+        if random.random() < server.error_rate:
+            return self.send_empty(503)
+
+        url = urlsplit(self.path)
+        fixture_path = get_fixture_path(url.path, url.query)
+        if fixture_path is None:
+            return self.send_empty(404)
+        try:
+            with open(os.path.join(server.fixture_dir, fixture_path), "rb") as fp:
+                body = fp.read()
+        except FileNotFoundError:
+            return self.send_empty(404)
+
+        etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+        if self.headers.get("If-None-Match") == etag:
+            return self.send_empty(304, {"ETag": etag})
+        content_type = (
+            "text/html" if fixture_path.endswith(".html") else "application/json"
+        )
+        self.send_response(200)
+        self.send_header("Content-Type", content_type + "; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_empty(self, status_code: int, headers=None):
+        self.send_response(status_code)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FixtureServer(ThreadingHTTPServer):
+    # replays recorded espncricinfo responses for any host, with optional latency,
+    # random 503s and a requests-per-second cap
+    daemon_threads = True
+
+    def __init__(
+        self,
+        fixture_dir: str = FIXTURE_DIR,
+        port: int = 0,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        rate_limit: float = None,
+    ):
+        super().__init__(("127.0.0.1", port), FixtureRequestHandler)
+        self.fixture_dir = fixture_dir
+        self.latency = latency
+        self.error_rate = error_rate
+        self.throttle = Throttle(rate_limit) if rate_limit else None
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def start(self):
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return thread
+
+
+def write_fixture(fixture_dir: str, fixture_path: str, body: bytes):
+    path = os.path.join(fixture_dir, fixture_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as fp:
+        fp.write(body)
+
+
+def record_fixtures(players_urls, fixture_dir: str = FIXTURE_DIR, max_matches=None):
+    # saves live responses for every player in the roster into the fixture layout
+    from fetch import make_session
+    from match import MATCH_URL
+    from player import get_odi_urls, parse_odi_match_records
+
+    session = make_session()
+    for player_name, player_urls in players_urls.items():
+        print(f"Recording: {player_name}")
+        match_ids = []
+        for url in [
+            player_urls["odi_matches"],
+            *get_odi_urls(player_urls["player_id"]).values(),
+        ]:
+            r = session.get(url)
+            if r.status_code != 200:
+                print(f"Skipping {url}: {r.status_code}")
+                continue
+            url_parts = urlsplit(url)
+            write_fixture(
+                fixture_dir,
+                get_fixture_path(url_parts.path, url_parts.query),
+                r.content,
+            )
+            if url == player_urls["odi_matches"]:
+                match_ids = [
+                    match["match_id"] for match in parse_odi_match_records(r.text)
+                ][:max_matches]
+
+        for match_id in match_ids:
+            fixture_path = MATCH_PATH.format(match_id=match_id)
+            if os.path.exists(os.path.join(fixture_dir, fixture_path)):
+                continue
+            r = session.get(MATCH_URL.format(match_id=match_id))
+            if r.status_code == 200:
+                write_fixture(fixture_dir, fixture_path, r.content)
+
+
+def draw_match(rng, match_id: int):
+    # one made-up match of a player, with what both the match list row and the summary
+    # stats are made from
+    runs = rng.randint(0, 150)
+    balls_bowled = rng.choice([0, rng.randint(6, 60)])
+    return {
+        "match_id": match_id,
+        "runs": runs,
+        "not_out": rng.random() < 0.15,
+        "balls_faced": max(1, round(runs * 100 / rng.randint(60, 130))),
+        "fours": runs // 12,
+        "sixes": runs // 40,
+        "balls_bowled": balls_bowled,
+        "wickets": rng.randint(0, 4) if balls_bowled else 0,
+        "runs_conceded": round(balls_bowled * rng.uniform(0.6, 1.2)),
+        "maidens": rng.randint(0, balls_bowled // 30),
+        "catches": rng.randint(0, 2),
+        "position": rng.randint(1, 11),
+        "opposition": rng.choice(SYNTHETIC_OPPOSITIONS),
+        "ground": rng.choice(SYNTHETIC_GROUNDS),
+        "date": f"{rng.randint(1, 28)} {rng.choice(MONTHS)} {rng.randint(2008, 2023)}",
+    }
+
+
+def get_match_row(match):
+    # a match list row as statsguru writes it
+    bowled = match["balls_bowled"] > 0
+    return (
+        "<tr class='data1'>"
+        f"<td>{match['runs']}{'*' if match['not_out'] else ''}</td>"
+        f"<td>{match['wickets'] if bowled else '-'}</td>"
+        f"<td>{match['runs_conceded'] if bowled else '-'}</td>"
+        f"<td>{match['catches']}</td><td>0</td><td></td>"
+        f"<td><a href='/ci/content/team/2.html'>v {match['opposition']}</a></td>"
+        f"<td><a href='/ci/engine/ground/1.html'>{match['ground']}</a></td>"
+        f"<td><b>{match['date']}</b></td>"
+        f"<td><a href='/ci/engine/match/{match['match_id']}.html'>ODI</a></td></tr>"
+    )
+
+
+def get_group_label(match, group_type: str):
+    if group_type == "YEAR":
+        return f"year {match['date'].split()[-1]}"
+    if group_type == "BATTING_POSITION":
+        return POSITION_LABELS[match["position"] - 1]
+    return f"vs {match['opposition']}"
+
+
+def get_span(matches):
+    years = [int(match["date"].split()[-1]) for match in matches]
+    return f"{min(years)}-{max(years)}"
+
+
+def get_batting_stat(label: str, matches):
+    runs = sum(match["runs"] for match in matches)
+    balls = sum(match["balls_faced"] for match in matches)
+    not_outs = sum(match["not_out"] for match in matches)
+    best = max(matches, key=lambda match: (match["runs"], match["not_out"]))
+    return {
+        "tt": label,
+        "sp": get_span(matches),
+        "mt": len(matches),
+        "in": len(matches),
+        "pr": None,
+        "rn": runs,
+        "fo": sum(match["fours"] for match in matches),
+        "si": sum(match["sixes"] for match in matches),
+        "ft": sum(50 <= match["runs"] < 100 for match in matches),
+        "hn": sum(match["runs"] >= 100 for match in matches),
+        "bf": balls,
+        "dk": sum(match["runs"] == 0 and not match["not_out"] for match in matches),
+        "no": not_outs,
+        "hs": f"{best['runs']}*" if best["not_out"] else best["runs"],
+        "bta": (
+            round(runs / (len(matches) - not_outs), 2)
+            if len(matches) > not_outs
+            else None
+        ),
+        "btsr": round(runs * 100 / balls, 2),
+    }
+
+
+def get_bowling_stat(label: str, matches):
+    balls = sum(match["balls_bowled"] for match in matches)
+    runs_conceded = sum(match["runs_conceded"] for match in matches)
+    wickets = sum(match["wickets"] for match in matches)
+    return {
+        "tt": label,
+        "sp": get_span(matches),
+        "mt": len(matches),
+        "in": sum(match["balls_bowled"] > 0 for match in matches),
+        "pr": None,
+        # overs as cricket writes them, 54.3 for 54 overs and 3 balls
+        "ov": balls // 6 + balls % 6 / 10,
+        "md": sum(match["maidens"] for match in matches),
+        "rn": runs_conceded,
+        "wk": wickets,
+        "bwe": round(runs_conceded * 6 / balls, 2) if balls else None,
+        "bwsr": round(balls / wickets, 2) if wickets else None,
+    }
+
+
+# stat type -> how a group's row is made and the groups the summary has
+SUMMARY_GROUPS = {
+    "BATTING": (get_batting_stat, ["YEAR", "BATTING_POSITION", "OPPOSITION_TEAM"]),
+    "BOWLING": (get_bowling_stat, ["YEAR", "OPPOSITION_TEAM"]),
+    "FIELDING": (None, []),
+    "ALLROUND": (None, []),
+}
+
+
+def get_summary(matches, stat_type: str):
+    # a stats summary response with one row per group the matches fall in
+    get_stat, group_types = SUMMARY_GROUPS[stat_type]
+    groups = []
+    for group_type in group_types:
+        grouped = {}
+        for match in matches:
+            grouped.setdefault(get_group_label(match, group_type), []).append(match)
+        stats = [get_stat(label, rows) for label, rows in sorted(grouped.items())]
+        groups.append({"type": group_type, "stats": stats})
+    return {"summary": {"groups": groups}}
+
+
+def synthesize_fixtures(
+    players_urls,
+    fixture_dir: str = FIXTURE_DIR,
+    matches_per_player: int = 150,
+    match_pool_size: int = 400,
+    match_size: int = 200_000,
+    seed: int = 0,
+):
+    # writes made-up fixtures with the shape of the real ones, for offline benchmarks; the
+    # stats summaries add up the match list, so every stage after the scrape has data.
+    # Players draw their matches from a shared pool so most matches are shared, as in a squad
+    rng = random.Random(seed)
+    padding = "x" * match_size
+    match_pool = list(range(1_000_000, 1_000_000 + match_pool_size))
+    for player_urls in players_urls.values():
+        player_id = player_urls["player_id"]
+        match_ids = sorted(
+            rng.sample(match_pool, min(matches_per_player, match_pool_size))
+        )
+        matches = [draw_match(rng, match_id) for match_id in match_ids]
+        rows = "".join(get_match_row(match) for match in reversed(matches))
+        html = (
+            "<html><body><table class='engineTable'><caption>Match by match list</caption>"
+            f"<thead><tr><th>Bat</th></tr></thead><tbody>{rows}</tbody></table></body></html>"
+        )
+        write_fixture(
+            fixture_dir, MATCH_LIST_PATH.format(player_id=player_id), html.encode()
+        )
+        for stat_type in SUMMARY_GROUPS:
+            write_fixture(
+                fixture_dir,
+                SUMMARY_PATH.format(player_id=player_id, stat_type=stat_type),
+                json.dumps(get_summary(matches, stat_type)).encode(),
+            )
+        for match_id in match_ids:
+            match = {"match": {"match_id": str(match_id)}, "padding": padding}
+            write_fixture(
+                fixture_dir,
+                MATCH_PATH.format(match_id=match_id),
+                json.dumps(match).encode(),
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--fixture-dir", default=FIXTURE_DIR)
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="seconds per request"
+    )
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of 503s")
+    parser.add_argument(
+        "--rate-limit", type=float, default=None, help="requests per second"
+    )
+    parser.add_argument(
+        "--record",
+        action="store_true",
+        help="record live responses for the roster first",
+    )
+    parser.add_argument(
+        "--synthesize",
+        action="store_true",
+        help="write made-up fixtures for the roster first",
+    )
+    args = parser.parse_args()
+
+    with open("./data/players.json", "r") as fp:
+        players_urls = json.load(fp)
+    if args.record:
+        record_fixtures(players_urls, args.fixture_dir)
+    if args.synthesize:
+        synthesize_fixtures(players_urls, args.fixture_dir)
+
+    server = FixtureServer(
+        args.fixture_dir, args.port, args.latency, args.error_rate, args.rate_limit
+    )
+    print(f"Serving {args.fixture_dir} on {server.base_url}")
+    server.serve_forever()
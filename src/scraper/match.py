@@ -1,7 +1,22 @@
 from bs4 import BeautifulSoup
+import argparse
 import json
+import os
 import requests
 
+from cache import HttpCache
+from checkpoint import Journal
+from fetch import DEFAULT_MAX_WORKERS, RedirectSession, make_session, map_ordered
+from match_store import (
+    MATCH_STORE_DIR,
+    get_missing_match_ids,
+    iter_matches,
+    save_match,
+)
+from ndjson import NDJSONWriter, get_ndjson_path
+from scheduler import RequestScheduler
+from stream import iter_odi_match_details
+
 MATCH_URL = "https://www.espncricinfo.com/matches/engine/match/{match_id}.json"
 
 
@@ -10,14 +25,44 @@ def get_filename_from_player_name(player_name: str):
     return player_name
 
 
-def get_odi_match_details(url: str):
-    r = requests.get(url)
+def get_odi_match_details(url: str, session=requests):
+    r = session.get(url)
     if r.status_code != 200:
         return {}
     stats = r.json()
     return stats
 
 
+def get_odi_matches_details(
+    match_ids, session=requests, max_workers: int = DEFAULT_MAX_WORKERS
+):
+    # fetches match details concurrently, yielding them in the order of match_ids
+    def fetch(match_id):
+        return get_odi_match_details(MATCH_URL.format(match_id=match_id), session)
+
+    return map_ordered(fetch, match_ids, max_workers)
+
+
+def get_player_match_ids(player_details):
+    # match list is newest first, details are stored oldest first
+    return [match["match_id"] for match in reversed(player_details["odi_matches"])]
+
+
+def write_odi_match_details_ndjson(
+    path: str, match_ids, store_dir: str = MATCH_STORE_DIR
+):
+    # streams matches from the store one at a time, so memory stays flat
+    with NDJSONWriter(path) as writer:
+        for match_details in iter_matches(store_dir, match_ids):
+            writer.write(match_details)
+
+
+def load_odi_match_details(path: str, store_dir: str = MATCH_STORE_DIR, fields=None):
+    # yields a player's match details one at a time, resolving match_id references from
+    # the store; fields, e.g. ["match", "innings"], keeps only those parts of each
+    return iter_odi_match_details(path, store_dir, fields)
+
+
 def load_player_urls(path: str):
     with open(path, "r") as fp:
         player_urls = json.load(fp)
@@ -31,35 +76,111 @@ def load_player_details(path: str):
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_MAX_WORKERS,
+        help="number of matches fetched concurrently (1 fetches serially)",
+    )
+    parser.add_argument(
+        "--no-cache", action="store_true", help="bypass the on-disk http cache"
+    )
+    parser.add_argument(
+        "--base-url",
+        help="send every request to this host instead, e.g. a local fixture server",
+    )
+    parser.add_argument(
+        "--restart",
+        action="store_true",
+        help="ignore the checkpoint journal of an interrupted run",
+    )
+    parser.add_argument(
+        "--format",
+        choices=["refs", "ndjson"],
+        default="refs",
+        help="per-player files hold match_id references or the full matches as ndjson",
+    )
+    parser.add_argument(
+        "--compression",
+        choices=["none", "gzip", "zstd"],
+        default="none",
+        help="compression of ndjson files",
+    )
+    args = parser.parse_args()
+
     save_dir = "./data/odi_matches"
+    store_dir = MATCH_STORE_DIR
     player_data_dir = "./data/players"
     players_urls_path = "./data/players.json"
     players_urls = load_player_urls(players_urls_path)
+    session = make_session(args.workers)
+    if args.base_url:
+        session = RedirectSession(session, args.base_url)
+    scheduler = RequestScheduler(session, max_concurrency=args.workers)
+    session = scheduler if args.no_cache else HttpCache(scheduler)
+    os.makedirs(store_dir, exist_ok=True)
+
+    journal = Journal(save_dir + "/.checkpoint")
+    if args.restart:
+        journal.clear()
+    elif journal.is_resuming():
+        print("Resuming interrupted run")
 
+    # the store doubles as a per-match checkpoint: matches already saved, whether by
+    # an earlier run or for another player, are never fetched again
     for player_name in players_urls:
+        if journal.is_done("player", player_name):
+            continue
         print(f"Scrapping information on: {player_name}")
 
         player_details = load_player_details(
             player_data_dir + "/" + get_filename_from_player_name(player_name) + ".json"
         )
         player_id = player_details["player_id"]
-        odi_matches = player_details["odi_matches"]
+        match_ids = get_player_match_ids(player_details)
+        missing_match_ids = get_missing_match_ids(store_dir, match_ids)
+        print(
+            f"Number of matches: {len(match_ids)}, to fetch: {len(missing_match_ids)}"
+        )
 
-        odi_match_details = list()
-        print(f"Number of matches: {len(odi_matches)}")
-        for match in odi_matches:
+        failed_match_ids = set()
+        for match_id, match_details in zip(
+            missing_match_ids,
+            get_odi_matches_details(missing_match_ids, session, args.workers),
+        ):
             print(".", end="", sep="", flush=True)
-            match_id = match["match_id"]
-            match_details = get_odi_match_details(MATCH_URL.format(match_id=match_id))
-            odi_match_details.append(match_details)
+            if not match_details:
+                failed_match_ids.add(match_id)
+                continue
+            save_match(store_dir, match_id, match_details)
         print("")
-        odi_match_details.reverse()
-        stats = dict()
-        stats["player_id"] = player_id
-        stats["player"] = player_name
-        stats["odi_matches"] = odi_match_details
-
-        with open(
-            save_dir + f"/{get_filename_from_player_name(player_name)}.json", "w"
-        ) as fp:
-            json.dump(stats, fp, indent=4)
+        if failed_match_ids:
+            print(
+                f"Failed to fetch {len(failed_match_ids)} matches: {failed_match_ids}"
+            )
+
+        match_ids = [
+            match_id for match_id in match_ids if match_id not in failed_match_ids
+        ]
+        save_path = save_dir + f"/{get_filename_from_player_name(player_name)}"
+        if args.format == "ndjson":
+            write_odi_match_details_ndjson(
+                get_ndjson_path(save_path, args.compression), match_ids, store_dir
+            )
+        else:
+            stats = dict()
+            stats["player_id"] = player_id
+            stats["player"] = player_name
+            stats["match_ids"] = match_ids
+
+            with open(save_path + ".json", "w") as fp:
+                json.dump(stats, fp, indent=4)
+        journal.mark_done("player", player_name)
+
+    if not args.no_cache:
+        session.save()
+    failed_urls = scheduler.save_failed()
+    if failed_urls:
+        print(f"{len(failed_urls)} urls failed, retry them with scheduler.py")
+    journal.clear()
@@ -0,0 +1,41 @@
+import json
+import os
+
+MATCH_STORE_DIR = "./data/matches"
+
+
+def get_match_path(store_dir: str, match_id):
+    return os.path.join(store_dir, f"{match_id}.json")
+
+
+def has_match(store_dir: str, match_id):
+    return os.path.exists(get_match_path(store_dir, match_id))
+
+
+def save_match(store_dir: str, match_id, match_details):
+    # write to a temp file first so a crash never leaves a truncated match behind
+    path = get_match_path(store_dir, match_id)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as fp:
+        json.dump(match_details, fp, separators=(",", ":"))
+    os.replace(tmp_path, path)
+
+
+def load_match(store_dir: str, match_id):
+    with open(get_match_path(store_dir, match_id), "r") as fp:
+        match_details = json.load(fp)
+    return match_details
+
+
+def iter_matches(store_dir: str, match_ids):
+    for match_id in match_ids:
+        yield load_match(store_dir, match_id)
+
+
+def get_missing_match_ids(store_dir: str, match_ids):
+    # unique ids, first-seen order, that are not in the store yet
+    missing = dict()
+    for match_id in match_ids:
+        if match_id not in missing and not has_match(store_dir, match_id):
+            missing[match_id] = None
+    return list(missing)
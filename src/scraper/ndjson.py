@@ -0,0 +1,64 @@
+import gzip
+import json
+import os
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+COMPRESSION_SUFFIXES = {"none": "", "gzip": ".gz", "zstd": ".zst"}
+
+
+def get_ndjson_path(path_without_suffix: str, compression: str = "none"):
+    return path_without_suffix + ".ndjson" + COMPRESSION_SUFFIXES[compression]
+
+
+def is_ndjson_path(path: str):
+    return any(
+        path.endswith(".ndjson" + suffix) for suffix in COMPRESSION_SUFFIXES.values()
+    )
+
+
+def open_ndjson(path: str, mode: str):
+    # mode is "r" or "w", the compression is picked from the file suffix
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    if path.endswith(".zst"):
+        if zstandard is None:
+            raise ImportError("zstandard is required for .zst files")
+        return zstandard.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+class NDJSONWriter:
+    # writes one compact json record per line, the file only appears once closed cleanly
+    def __init__(self, path: str):
+        self.path = path
+        self.tmp_path = path + ".tmp" + os.path.splitext(path)[1]
+        self.fp = open_ndjson(self.tmp_path, "w")
+
+    def write(self, record):
+        self.fp.write(json.dumps(record, separators=(",", ":")))
+        self.fp.write("\n")
+
+    def close(self):
+        self.fp.close()
+        os.replace(self.tmp_path, self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.fp.close()
+            os.remove(self.tmp_path)
+
+
+def iter_ndjson(path: str):
+    with open_ndjson(path, "r") as fp:
+        for line in fp:
+            if line.strip():
+                yield json.loads(line)
@@ -1,11 +1,27 @@
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
+import argparse
 import json
+import os
 import requests
 
+from cache import HttpCache
+from checkpoint import Journal
+from fetch import RedirectSession, make_session
+from scheduler import RequestScheduler
+
 STAT_TYPES = ["BATTING", "BOWLING", "FIELDING", "ALLROUND"]
 RECORD_CLASS_ID = {"TEST": 1, "ODI": 2, "TEST": 3}
 STATS_URL = "https://hs-consumer-api.espncricinfo.com/v1/pages/player/stats/summary?playerId={player_id}&recordClassId={record_class}&type={stat_type}"
 DNB = "Didn't Bat"
+MATCH_LIST_CAPTION = "Match by match list"
+
+# lxml builds the tree several times faster than the pure python parser
+try:
+    import lxml  # noqa: F401
+
+    HTML_PARSER = "lxml"
+except ImportError:
+    HTML_PARSER = "html.parser"
 
 
 def get_filename_from_player_name(player_name: str):
@@ -25,37 +41,36 @@ def get_odi_urls(player_id):
     return urls
 
 
-def get_summary_statistics(url: str):
-    r = requests.get(url)
+def get_summary_statistics(url: str, session=requests):
+    r = session.get(url)
     if r.status_code != 200:
         return {}
     stats = r.json()
     return stats
 
 
-def get_odi_match_records(url: str):
-    r = requests.get(url)
-    if r.status_code != 200:
-        return {}
+def parse_odi_match_records(html: str):
+    # only the page's tables are built into a tree, the caption picks the one we need
+    soup = BeautifulSoup(html, HTML_PARSER, parse_only=SoupStrainer("table"))
+    caption = soup.find("caption", string=MATCH_LIST_CAPTION)
+    if caption is None:
+        return []
 
     matches = []
-    soup = BeautifulSoup(r.text, "html.parser")
-    tb = soup.find("caption", string="Match by match list").parent
-    tbody = tb.findChild("tbody")
-    trows = tbody.findChildren("tr")
-    for trow in trows:
-        tds = trow.findChildren("td")
-        runs_no = tds[0].text
+    tbody = caption.parent.find("tbody")
+    for trow in tbody.find_all("tr", recursive=False):
+        tds = trow.find_all("td", recursive=False)
+        runs_no = tds[0].get_text()
         runs = runs_no.replace("*", "")
-        no = str(runs_no).find("*") != -1
-        wickets = tds[1].text
-        runs_conceded = tds[2].text
-        catches_taken = tds[3].text
-        stumpings_made = tds[4].text
-        opposition = tds[6].text
-        ground = tds[7].text
-        date = tds[8].text
-        match_link = tds[9].findChild("a")
+        no = runs_no.find("*") != -1
+        wickets = tds[1].get_text()
+        runs_conceded = tds[2].get_text()
+        catches_taken = tds[3].get_text()
+        stumpings_made = tds[4].get_text()
+        opposition = tds[6].get_text()
+        ground = tds[7].get_text()
+        date = tds[8].get_text()
+        match_link = tds[9].find("a")
         match_id = match_link["href"].split("/")[-1].split(".")[0]
 
         match = {
@@ -74,6 +89,34 @@ def get_odi_match_records(url: str):
     return matches
 
 
+def get_odi_match_records(url: str, session=requests):
+    r = session.get(url)
+    if r.status_code != 200:
+        return {}
+    return parse_odi_match_records(r.text)
+
+
+def get_new_match_ids(odi_matches, saved_stats):
+    saved_match_ids = {match["match_id"] for match in saved_stats["odi_matches"]}
+    return [
+        match["match_id"]
+        for match in odi_matches
+        if match["match_id"] not in saved_match_ids
+    ]
+
+
+def has_all_summaries(saved_stats):
+    return all(saved_stats.get(stat_type) for stat_type in STAT_TYPES)
+
+
+def load_saved_stats(path: str):
+    if not os.path.exists(path):
+        return None
+    with open(path, "r") as fp:
+        saved_stats = json.load(fp)
+    return saved_stats
+
+
 def load_player_urls(path: str):
     with open(path, "r") as fp:
         player_urls = json.load(fp)
@@ -81,18 +124,66 @@ def load_player_urls(path: str):
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--no-cache", action="store_true", help="bypass the on-disk http cache"
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="only refresh players whose match list has new matches",
+    )
+    parser.add_argument(
+        "--base-url",
+        help="send every request to this host instead, e.g. a local fixture server",
+    )
+    parser.add_argument(
+        "--restart",
+        action="store_true",
+        help="ignore the checkpoint journal of an interrupted run",
+    )
+    args = parser.parse_args()
+
     save_dir = "./data/players"
     players_urls_path = "./data/players.json"
     players_urls = load_player_urls(players_urls_path)
+    session = make_session()
+    if args.base_url:
+        session = RedirectSession(session, args.base_url)
+    scheduler = RequestScheduler(session)
+    session = scheduler if args.no_cache else HttpCache(scheduler)
+
+    journal = Journal(save_dir + "/.checkpoint")
+    if args.restart:
+        journal.clear()
+    elif journal.is_resuming():
+        print("Resuming interrupted run")
 
     for player_name in players_urls:
+        if journal.is_done("player", player_name):
+            continue
         print(f"Scrapping information on: {player_name}")
         player_id = players_urls[player_name]["player_id"]
         profile_url = players_urls[player_name]["profile"]
         statistics_url = players_urls[player_name]["statistics"]
         odi_matches_url = players_urls[player_name]["odi_matches"]
-
-        odi_matches = get_odi_match_records(odi_matches_url)
+        save_path = save_dir + f"/{get_filename_from_player_name(player_name)}.json"
+
+        odi_matches = get_odi_match_records(odi_matches_url, session)
+
+        saved_stats = load_saved_stats(save_path) if args.incremental else None
+        if saved_stats is not None:
+            if not odi_matches:
+                print("Could not fetch the match list, keeping saved data")
+                journal.mark_done("player", player_name)
+                continue
+            new_match_ids = get_new_match_ids(odi_matches, saved_stats)
+            # summaries only move when a new match is played
+            if not new_match_ids and has_all_summaries(saved_stats):
+                print("No new matches")
+                journal.mark_done("player", player_name)
+                continue
+            print(f"New matches: {new_match_ids}")
 
         urls = get_odi_urls(player_id)
         stats = dict()
@@ -101,10 +192,16 @@ if __name__ == "__main__":
         stats["odi_matches"] = odi_matches
 
         for stat_type, url in urls.items():
-            stat = get_summary_statistics(url)
+            stat = get_summary_statistics(url, session)
             stats[stat_type] = stat
 
-        with open(
-            save_dir + f"/{get_filename_from_player_name(player_name)}.json", "w"
-        ) as fp:
+        with open(save_path, "w") as fp:
             json.dump(stats, fp, indent=4)
+        journal.mark_done("player", player_name)
+
+    if not args.no_cache:
+        session.save()
+    failed_urls = scheduler.save_failed()
+    if failed_urls:
+        print(f"{len(failed_urls)} urls failed, retry them with scheduler.py")
+    journal.clear()
@@ -0,0 +1,192 @@
+import argparse
+import json
+import os
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+import requests
+
+from fetch import DEFAULT_MAX_WORKERS
+
+FAILED_URLS_PATH = "./data/failed_urls.json"
+DEFAULT_RATE = 5.0  # requests per second per host
+DEFAULT_BURST = 5
+DEFAULT_MAX_RETRIES = 5
+DEFAULT_TIMEOUT = 30
+BASE_BACKOFF = 1.0
+MAX_BACKOFF = 60.0
+
+
+class FailedResponse:
+    # returned when a request raised on every attempt, callers only look at status_code
+    def __init__(self, url: str, error: Exception):
+        self.url = url
+        self.status_code = 0
+        self.error = error
+        self.headers = {}
+        self.content = b""
+        self.text = ""
+
+
+def is_retryable(status_code: int):
+    return status_code == 429 or status_code >= 500 or status_code == 0
+
+
+def get_backoff(attempt: int, retry_after=None):
+    # exponential backoff with full jitter, never shorter than the server asked for
+    delay = random.uniform(0, min(MAX_BACKOFF, BASE_BACKOFF * 2**attempt))
+    if retry_after is not None:
+        try:
+            delay = max(delay, float(retry_after))
+        except ValueError:
+            pass
+    return delay
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(
+                    self.capacity, self.tokens + (now - self.updated_at) * self.rate
+                )
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class AdaptiveLimit:
+    # AIMD concurrency limit: grows by one per window of successes, halves when throttled
+    def __init__(self, max_limit: int, initial_limit: int = 2):
+        self.max_limit = max_limit
+        self.limit = float(min(initial_limit, max_limit))
+        self.in_flight = 0
+        self.condition = threading.Condition()
+
+    def acquire(self):
+        with self.condition:
+            while self.in_flight >= int(self.limit):
+                self.condition.wait()
+            self.in_flight += 1
+
+    def release(self, throttled: bool):
+        with self.condition:
+            self.in_flight -= 1
+            if throttled:
+                self.limit = max(1.0, self.limit / 2)
+            else:
+                self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            self.condition.notify_all()
+
+
+class RequestScheduler:
+    # rate limits, retries and adapts concurrency per host, stands in for a requests session
+    def __init__(
+        self,
+        session,
+        rate: float = DEFAULT_RATE,
+        burst: int = DEFAULT_BURST,
+        max_concurrency: int = DEFAULT_MAX_WORKERS,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        failed_path: str = FAILED_URLS_PATH,
+    ):
+        self.session = session
+        self.rate = rate
+        self.burst = burst
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.failed_path = failed_path
+        self.buckets = dict()
+        self.limits = dict()
+        self.failed_urls = set(load_failed_urls(failed_path))
+        self.lock = threading.Lock()
+
+    def get_host_controls(self, url: str):
+        host = urlsplit(url).netloc
+        with self.lock:
+            if host not in self.buckets:
+                self.buckets[host] = TokenBucket(self.rate, self.burst)
+                self.limits[host] = AdaptiveLimit(self.max_concurrency)
+            return self.buckets[host], self.limits[host]
+
+    def get(self, url: str, headers=None):
+        bucket, limit = self.get_host_controls(url)
+        for attempt in range(self.max_retries + 1):
+            limit.acquire()
+            bucket.acquire()
+            try:
+                r = self.session.get(url, headers=headers, timeout=DEFAULT_TIMEOUT)
+            except requests.RequestException as e:
+                r = FailedResponse(url, e)
+            throttled = is_retryable(r.status_code)
+            limit.release(throttled)
+            if not throttled:
+                with self.lock:
+                    self.failed_urls.discard(url)
+                return r
+            if attempt < self.max_retries:
+                time.sleep(get_backoff(attempt, r.headers.get("Retry-After")))
+
+        with self.lock:
+            self.failed_urls.add(url)
+        return r
+
+    def save_failed(self):
+        with self.lock:
+            failed_urls = sorted(self.failed_urls)
+        save_failed_urls(self.failed_path, failed_urls)
+        return failed_urls
+
+
+def load_failed_urls(path: str = FAILED_URLS_PATH):
+    if not os.path.exists(path):
+        return []
+    with open(path, "r") as fp:
+        failed_urls = json.load(fp)
+    return failed_urls
+
+
+def save_failed_urls(path: str, failed_urls):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as fp:
+        json.dump(failed_urls, fp, indent=4)
+    os.replace(tmp_path, path)
+
+
+if __name__ == "__main__":
+    # retries the failed-url queue on its own; successes land in the http cache, so the
+    # next incremental scrape fills its holes without going back to the network
+    from cache import HttpCache
+    from fetch import make_session, map_ordered
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=DEFAULT_MAX_WORKERS)
+    args = parser.parse_args()
+
+    scheduler = RequestScheduler(
+        make_session(args.workers), max_concurrency=args.workers
+    )
+    session = HttpCache(scheduler)
+    failed_urls = sorted(scheduler.failed_urls)
+    print(f"Retrying {len(failed_urls)} failed urls")
+    for url, r in zip(failed_urls, map_ordered(session.get, failed_urls, args.workers)):
+        print(".", end="", sep="", flush=True)
+        # a fresh cache hit never reaches the scheduler
+        if r.status_code == 200:
+            scheduler.failed_urls.discard(url)
+    print("")
+    session.save()
+    failed_urls = scheduler.save_failed()
+    print(f"Still failing: {len(failed_urls)}")
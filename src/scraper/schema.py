@@ -0,0 +1,173 @@
+# typed schemas of the files the scrapers write, shared with graph_generation so every
+# reader validates a player file and decodes its numbers the same way, in one pass
+from typing import Optional, Union
+
+import msgspec
+
+# stats summary keys as scraped, see data/player_stat_mapping.json for their meaning
+SUMMARY_STAT_KEYS = [
+    "mt",
+    "in",
+    "rn",
+    "fo",
+    "si",
+    "ft",
+    "hn",
+    "bf",
+    "dk",
+    "no",
+    "hs",
+    "bta",
+    "btsr",
+    "wk",
+    "bwe",
+    "md",
+    "bwsr",
+    "ov",
+]
+# fields kept from an engine payload's "match" object
+MATCH_DETAIL_FIELDS = [
+    "start_date_raw",
+    "ground_name",
+    "town_name",
+    "country_name",
+    "team1_id",
+    "team1_name",
+    "team2_id",
+    "team2_name",
+    "toss_winner_team_id",
+    "toss_decision_name",
+    "winner_team_id",
+    "result_name",
+    "match_status",
+]
+
+
+class Number(float):
+    # a scraped number: a json number or a numeric string, "264*" for a not out score;
+    # anything else, "-", "DNB" or "TDNB", decodes to NaN
+    pass
+
+
+NAN = Number("nan")
+
+
+def dec_hook(type, value):
+    # called for every Number, so the common case, a json number or a plain numeric
+    # string, is a single float()
+    if type is Number:
+        try:
+            return NAN if value.__class__ is bool else Number(value)
+        except (TypeError, ValueError):
+            pass
+        try:
+            return Number(str(value).rstrip("*"))
+        except ValueError:
+            return NAN
+    raise NotImplementedError(f"Cannot decode {type}")
+
+
+def get_number(value: Optional[Number], number_type=int):
+    # None for a number that was missing or not a number
+    if value is None or value != value:
+        return None
+    return number_type(value)
+
+
+# a row of a stats group under its scraped keys, read with getattr(stat, "in") and the like
+Stat = msgspec.defstruct(
+    "Stat",
+    [("tt", Union[str, int, None], None), ("sp", Union[str, int, None], None)]
+    + [(key, Optional[Number], None) for key in SUMMARY_STAT_KEYS],
+)
+
+
+class StatsGroup(msgspec.Struct):
+    type: str
+    stats: list[Stat] = []
+
+
+class Summary(msgspec.Struct):
+    groups: list[StatsGroup] = []
+
+
+class DisciplineSummary(msgspec.Struct):
+    # a failed scrape saves {}, which decodes with summary None
+    summary: Optional[Summary] = None
+
+
+class MatchRecord(msgspec.Struct):
+    match_id: Union[str, int]
+    date: Optional[str] = None
+    runs: Optional[Number] = None
+    not_out: bool = False
+    wickets: Optional[Number] = None
+    runs_conceded: Optional[Number] = None
+    catches_taken: Optional[Number] = None
+    stumpings_made: Optional[Number] = None
+    opposition: Optional[str] = None
+    ground: Optional[str] = None
+
+
+class PlayerDetails(msgspec.Struct):
+    player_id: Union[int, str, None] = None
+    player: str = ""
+    odi_matches: list[MatchRecord] = []
+    BATTING: Optional[DisciplineSummary] = None
+    BOWLING: Optional[DisciplineSummary] = None
+    FIELDING: Optional[DisciplineSummary] = None
+    ALLROUND: Optional[DisciplineSummary] = None
+
+    def get_stats_groups(self, discipline: str):
+        summary = getattr(self, discipline)
+        if summary is None or summary.summary is None:
+            return []
+        return summary.summary.groups
+
+
+# the parts of an engine payload that are read, every field optional since payloads of
+# abandoned or old matches leave out whatever they did not have
+MatchInfo = msgspec.defstruct(
+    "MatchInfo",
+    [("match_id", Union[str, int, None], None)]
+    + [(field, Union[str, int, None], None) for field in MATCH_DETAIL_FIELDS],
+)
+
+
+class Innings(msgspec.Struct):
+    batting_team_id: Union[str, int, None] = None
+    runs: Optional[Number] = None
+    wickets: Optional[Number] = None
+    overs: Optional[Number] = None
+
+
+class MatchDetails(msgspec.Struct):
+    match: Optional[MatchInfo] = None
+    innings: Optional[list[Innings]] = None
+
+
+# strict=False also takes "true" for a bool, as the scrapes do
+player_details_decoder = msgspec.json.Decoder(
+    PlayerDetails, strict=False, dec_hook=dec_hook
+)
+
+
+def load_player_details(path: str) -> PlayerDetails:
+    # a typed player file, or a ValueError naming the file and where in it the problem is
+    with open(path, "rb") as fp:
+        content = fp.read()
+    try:
+        return player_details_decoder.decode(content)
+    except (msgspec.ValidationError, msgspec.DecodeError) as error:
+        raise ValueError(f"Malformed {path}: {error}") from None
+
+
+def to_match_details(match_details) -> MatchDetails:
+    # engine payloads reach here already decoded, from the store or a stream, so they
+    # are converted rather than decoded
+    try:
+        return msgspec.convert(
+            match_details, MatchDetails, strict=False, dec_hook=dec_hook
+        )
+    except msgspec.ValidationError as error:
+        raise ValueError(f"Malformed match payload: {error}") from None
@@ -0,0 +1,233 @@
+import json
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+from match_store import MATCH_STORE_DIR, iter_matches
+from ndjson import is_ndjson_path, iter_ndjson
+
+# text read per refill; a match larger than this grows the buffer until it fits
+CHUNK_SIZE = 64 * 1024
+WHITESPACE = " \t\n\r"
+
+
+def get_field_tree(fields):
+    # ["match.ground_name", "innings"] -> {"match": {"ground_name": None}, "innings": None},
+    # None marking a field kept whole; paths go through objects, an array is kept whole
+    tree = {}
+    for field in fields:
+        node = tree
+        *parents, leaf = field.split(".")
+        for parent in parents:
+            child = node.get(parent, {})
+            if child is None:
+                break
+            node = node.setdefault(parent, child)
+        else:
+            node[leaf] = None
+    return tree
+
+
+def project(value, tree):
+    # the parts of a decoded match named by a field tree, missing ones left out
+    if tree is None or not isinstance(value, dict):
+        return value
+    return {
+        key: project(value[key], child) for key, child in tree.items() if key in value
+    }
+
+
+class JsonStream:
+    # pulls json values one at a time out of a text file through a bounded buffer, with
+    # the standard library decoder; a value is only ever decoded whole, so memory is
+    # bounded by the largest value plus a chunk
+    def __init__(self, fp, chunk_size: int = CHUNK_SIZE):
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.position = 0
+        # characters dropped from the front of the buffer so far
+        self.offset = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def fill(self, size: int):
+        # drops what has been consumed and reads at least size more characters
+        self.offset += self.position
+        self.buffer = self.buffer[self.position :]
+        self.position = 0
+        while not self.eof and size > 0:
+            chunk = self.fp.read(max(size, self.chunk_size))
+            if not chunk:
+                self.eof = True
+                break
+            self.buffer += chunk
+            size -= len(chunk)
+
+    def peek(self):
+        # the next character that is not whitespace, "" at the end of the file
+        while True:
+            while self.position < len(self.buffer):
+                if self.buffer[self.position] not in WHITESPACE:
+                    return self.buffer[self.position]
+                self.position += 1
+            if self.eof:
+                return ""
+            self.fill(self.chunk_size)
+
+    def expect(self, characters: str):
+        character = self.peek()
+        if character == "" or character not in characters:
+            raise json.JSONDecodeError(
+                f"Expected one of {characters!r}", self.buffer, self.position
+            )
+        self.position += 1
+        return character
+
+    def decode(self):
+        # the next whole value; a value running up to the end of the buffer may be cut
+        # short, e.g. a number, so the buffer grows until the value ends before it
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.position)
+                if end < len(self.buffer) or self.eof:
+                    self.position = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self.fill(len(self.buffer) - self.position + self.chunk_size)
+
+    def iter_object(self):
+        # (key, stream) for each member of the object at the stream; the caller
+        # either decodes the value or leaves it to be decoded here
+        self.expect("{")
+        if self.peek() == "}":
+            self.position += 1
+            return
+        while True:
+            key = self.decode()
+            self.expect(":")
+            start = self.offset + self.position
+            yield key
+            if self.offset + self.position == start:
+                self.decode()
+            if self.expect(",}") == "}":
+                return
+
+    def iter_array(self):
+        self.expect("[")
+        if self.peek() == "]":
+            self.position += 1
+            return
+        while True:
+            yield self.decode()
+            if self.expect(",]") == "]":
+                return
+
+
+def skip_value(events, event: str):
+    # passes over the rest of a value whose first event was event, building nothing
+    if event not in ("start_map", "start_array"):
+        return
+    depth = 1
+    for event, _ in events:
+        if event in ("start_map", "start_array"):
+            depth += 1
+        elif event in ("end_map", "end_array"):
+            depth -= 1
+            if depth == 0:
+                return
+
+
+def build_value(events, event: str, value, tree):
+    # the value whose first event was event, with only the members a field tree names
+    # built; like project, anything that is not an object under the tree is kept whole
+    if event == "start_map" and tree is not None:
+        built = {}
+        for event, key in events:
+            if event == "end_map":
+                return built
+            event, value = next(events)
+            if key in tree:
+                built[key] = build_value(events, event, value, tree[key])
+            else:
+                skip_value(events, event)
+    if event not in ("start_map", "start_array"):
+        return value
+    builder = ijson.ObjectBuilder()
+    builder.event(event, value)
+    depth = 1
+    for event, value in events:
+        builder.event(event, value)
+        if event in ("start_map", "start_array"):
+            depth += 1
+        elif event in ("end_map", "end_array"):
+            depth -= 1
+            if depth == 0:
+                return builder.value
+
+
+def iter_projected_items(events, key: str, tree):
+    # items of the array under a top level key out of ijson's basic parse events, with
+    # only the fields of the tree ever built, so the unread parts of a match are parsed
+    # but never turned into objects
+    events = iter(events)
+    if next(events, (None, None))[0] != "start_map":
+        return
+    for event, member in events:
+        if event == "end_map":
+            return
+        event, value = next(events)
+        if member != key or event != "start_array":
+            skip_value(events, event)
+            continue
+        for event, value in events:
+            if event == "end_array":
+                break
+            yield build_value(events, event, value, tree)
+
+
+def iter_json_array(path: str, key: str, fields=None):
+    # items of the array under a top level key of a json file, one at a time
+    tree = None if fields is None else get_field_tree(fields)
+    if ijson is not None:
+        with open(path, "rb") as fp:
+            if tree is None:
+                yield from ijson.items(fp, key + ".item", use_float=True)
+            else:
+                events = ijson.basic_parse(fp, use_float=True)
+                yield from iter_projected_items(events, key, tree)
+        return
+    with open(path, "r") as fp:
+        stream = JsonStream(fp)
+        for member in stream.iter_object():
+            if member == key:
+                for item in stream.iter_array():
+                    yield project(item, tree)
+
+
+def get_list_key(path: str, keys=("match_ids", "odi_matches")):
+    # the first of keys at the top level of a json file, reading no further than it
+    with open(path, "r") as fp:
+        for member in JsonStream(fp).iter_object():
+            if member in keys:
+                return member
+    return None
+
+
+def iter_odi_match_details(path: str, store_dir: str = MATCH_STORE_DIR, fields=None):
+    # a player's matches one at a time whatever the file format, each with only fields,
+    # e.g. ["match.match_id", "innings"], when given
+    tree = None if fields is None else get_field_tree(fields)
+    if is_ndjson_path(path):
+        return (project(match, tree) for match in iter_ndjson(path))
+    if get_list_key(path) == "match_ids":
+        with open(path, "r") as fp:
+            match_ids = json.load(fp)["match_ids"]
+        return (project(match, tree) for match in iter_matches(store_dir, match_ids))
+    # files written before the match store hold the full payloads inline
+    return iter_json_array(path, "odi_matches", fields)